@@ -0,0 +1,231 @@
+import asyncio
+import logging
+import re
+from collections import deque
+from uuid import uuid4
+from typing import Any, AsyncIterator, Deque, Dict, FrozenSet, Iterable, List, Optional, Pattern, Tuple, TYPE_CHECKING
+
+from pydantic_core import to_json
+
+from src.shared.config import settings
+from src.shared.constants import AGENT_STATUS_TOPIC
+
+if TYPE_CHECKING:
+    from src.core.bus.bus import MessageBus, MessageEnvelope
+
+logger = logging.getLogger(__name__)
+
+# (event id, encoded JSON)
+StreamEvent = Tuple[str, str]
+
+class SlowClientError(Exception):
+    """Raised to a stream client whose buffer overflowed."""
+    pass
+
+class StreamFilter:
+    """
+    Server-side event filter.
+    Topics follow the bus convention: names containing '*' are regular expressions
+    matched against the full topic, anything else must match exactly.
+    """
+
+    __slots__ = ("topics", "patterns", "goal_id")
+
+    def __init__(self, topics: Optional[Iterable[str]] = None, goal_id: Optional[str] = None) -> None:
+        names = list(topics) if topics is not None else None
+        self.topics: Optional[FrozenSet[str]] = None
+        self.patterns: List[Pattern[str]] = []
+        if names is not None:
+            self.topics = frozenset(t for t in names if "*" not in t)
+            try:
+                self.patterns = [re.compile(t) for t in names if "*" in t]
+            except re.error as e:
+                raise ValueError(f"Invalid topic pattern: {e}")
+        self.goal_id: Optional[str] = goal_id
+
+    def matches(self, topic: str, goal_id: Optional[str]) -> bool:
+        if self.goal_id is not None and goal_id != self.goal_id:
+            return False
+        if self.topics is None:
+            return True
+        return topic in self.topics or any(p.fullmatch(topic) for p in self.patterns)
+
+class StreamClient:
+    """
+    One connected WS/SSE consumer: a bounded buffer of pre-encoded events.
+    A client that lets its buffer fill up is closed instead of growing without bound.
+    `gap` is set when a resume point was already evicted from the replay ring.
+    """
+
+    __slots__ = ("filter", "max_pending", "_pending", "_ready", "closed", "overflowed", "gap")
+
+    def __init__(self, stream_filter: StreamFilter, max_pending: int) -> None:
+        self.filter: StreamFilter = stream_filter
+        self.max_pending: int = max_pending
+        self._pending: Deque[StreamEvent] = deque()
+        self._ready: asyncio.Event = asyncio.Event()
+        self.closed: bool = False
+        self.overflowed: bool = False
+        self.gap: bool = False
+
+    def offer(self, event: StreamEvent, topic: str, goal_id: Optional[str]) -> None:
+        if self.closed or not self.filter.matches(topic, goal_id):
+            return
+        if len(self._pending) >= self.max_pending:
+            self.overflowed = True
+            self.close()
+            return
+        self._pending.append(event)
+        self._ready.set()
+
+    def close(self) -> None:
+        self.closed = True
+        self._pending.clear()
+        self._ready.set()
+
+    async def __aiter__(self) -> AsyncIterator[StreamEvent]:
+        while True:
+            while self._pending:
+                yield self._pending.popleft()
+            if self.closed:
+                break
+            self._ready.clear()
+            await self._ready.wait()
+        if self.overflowed:
+            raise SlowClientError("stream client fell behind and was disconnected")
+
+class StreamHub:
+    """
+    Fan-out broadcaster for the stream endpoints.
+    Subscribes to the bus once, encodes each envelope to JSON once, and hands the
+    same string to every connected client, so a message costs one bus callback and
+    one encoding regardless of how many dashboards are attached.
+
+    Raw agent heartbeats are not streamed; the registry's status deltas and
+    snapshots carry the same information at a fraction of the volume.
+
+    Every event gets an id "<epoch>-<sequence>" and is kept in a bounded replay
+    ring, so a client reconnecting with Last-Event-ID receives what it missed. The
+    epoch is unique to this hub: ids are only meaningful to the process that issued
+    them. A resume point from another worker or from before a restart cannot be
+    matched to anything here, so it is reported as a gap rather than replayed.
+    """
+
+    def __init__(
+        self,
+        bus: "MessageBus",
+        client_buffer: int = settings.STREAM_CLIENT_BUFFER,
+        max_clients: int = settings.STREAM_MAX_CLIENTS,
+        replay_size: int = settings.STREAM_REPLAY_SIZE
+    ) -> None:
+        self.bus: "MessageBus" = bus
+        self.client_buffer: int = client_buffer
+        self.max_clients: int = max_clients
+        self._clients: Dict[int, StreamClient] = {}
+        self._replay: Deque[Tuple[int, StreamEvent, str, Optional[str]]] = deque(maxlen=replay_size)
+        self.epoch: str = uuid4().hex[:12]
+        self._sequence: int = 0
+        self._started: bool = False
+
+        self.published: int = 0
+        self.disconnected_slow: int = 0
+
+    async def start(self) -> None:
+        if not self._started:
+            self._started = True
+            await self.bus.subscribe(".*", self.publish)
+
+    def connect(
+        self,
+        topics: Optional[Iterable[str]] = None,
+        goal_id: Optional[str] = None,
+        last_event_id: Optional[str] = None
+    ) -> StreamClient:
+        """
+        Registers a client, replaying buffered events newer than last_event_id.
+        Raises ValueError for an invalid topic pattern and RuntimeError when the hub is at capacity.
+        """
+        stream_filter = StreamFilter(topics, goal_id)
+        if len(self._clients) >= self.max_clients:
+            raise RuntimeError(f"Stream client limit reached ({self.max_clients})")
+        client = StreamClient(stream_filter, self.client_buffer)
+
+        if last_event_id is not None:
+            resume = self._parse(last_event_id)
+            if resume is None:
+                # Issued elsewhere: no position in this hub's ring corresponds to it
+                client.gap = True
+                missed = []
+            else:
+                oldest = self._replay[0][0] if self._replay else self._sequence + 1
+                client.gap = resume < oldest - 1 or resume > self._sequence
+                missed = [
+                    (event, topic, gid) for sequence, event, topic, gid in self._replay
+                    if sequence > resume and client.filter.matches(topic, gid)
+                ]
+            # The backlog is already bounded by the ring; don't count it against live traffic.
+            client.max_pending += len(missed)
+            for event, topic, gid in missed:
+                client.offer(event, topic, gid)
+
+        self._clients[id(client)] = client
+        return client
+
+    def disconnect(self, client: StreamClient) -> None:
+        client.close()
+        self._clients.pop(id(client), None)
+
+    @property
+    def client_count(self) -> int:
+        return len(self._clients)
+
+    @property
+    def last_event_id(self) -> str:
+        return self.event_id(self._sequence)
+
+    def event_id(self, sequence: int) -> str:
+        return f"{self.epoch}-{sequence}"
+
+    def _parse(self, event_id: str) -> Optional[int]:
+        """The sequence number of an id this hub issued, else None."""
+        epoch, _, sequence = event_id.rpartition("-")
+        return int(sequence) if epoch == self.epoch and sequence.isdigit() else None
+
+    @staticmethod
+    def encode(event_id: str, envelope: "MessageEnvelope") -> str:
+        return to_json({
+            "id": event_id,
+            "topic": envelope.topic,
+            "payload": envelope.payload,
+            "timestamp": envelope.timestamp.isoformat(),
+            "source": envelope.source_id
+        }, fallback=str).decode("utf-8")
+
+    async def publish(self, envelope: "MessageEnvelope") -> None:
+        """Bus callback: assigns the next id, encodes once and offers the event to every client."""
+        if envelope.topic == AGENT_STATUS_TOPIC:
+            return
+        self._sequence += 1
+        event_id = self.event_id(self._sequence)
+        event: StreamEvent = (event_id, self.encode(event_id, envelope))
+        goal_id = _goal_id_of(envelope.payload)
+        self._replay.append((self._sequence, event, envelope.topic, goal_id))
+        self.published += 1
+
+        for key, client in list(self._clients.items()):
+            client.offer(event, envelope.topic, goal_id)
+            if client.overflowed:
+                del self._clients[key]
+                self.disconnected_slow += 1
+                logger.warning("Disconnected slow stream client (%s pending events)", client.max_pending)
+
+def _goal_id_of(payload: Any) -> Optional[str]:
+    if isinstance(payload, dict) and payload.get("goal_id") is not None:
+        return str(payload["goal_id"])
+    return None
+
+def parse_topics(value: Optional[str]) -> Optional[List[str]]:
+    """Splits a comma-separated `topics` query parameter; None/empty means all topics."""
+    if not value:
+        return None
+    return [t.strip() for t in value.split(",") if t.strip()]
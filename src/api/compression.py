@@ -0,0 +1,119 @@
+import asyncio
+import gzip
+from typing import FrozenSet, Optional
+
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from src.shared.config import settings
+
+try:
+    import brotli
+except ImportError: # Optional: pip install .[compression]
+    brotli = None
+
+COMPRESSIBLE_TYPES: FrozenSet[str] = frozenset({
+    "application/json",
+    "application/x-ndjson",
+    "application/javascript",
+    "application/xml",
+})
+THREAD_MINIMUM_SIZE = 256 * 1024
+
+def _accepted(accept_encoding: str) -> FrozenSet[str]:
+    """Codings from Accept-Encoding, excluding those explicitly refused with q=0."""
+    codings = set()
+    for part in accept_encoding.split(","):
+        coding, _, params = part.strip().partition(";")
+        if params.replace(" ", "").lower() in ("q=0", "q=0.0", "q=0.00", "q=0.000"):
+            continue
+        if coding:
+            codings.add(coding.strip().lower())
+    return frozenset(codings)
+
+def _compressible(media_type: str) -> bool:
+    media_type = media_type.partition(";")[0].strip().lower()
+    if media_type == "text/event-stream":
+        return False
+    return media_type.startswith("text/") or media_type in COMPRESSIBLE_TYPES
+
+class CompressionMiddleware:
+    """
+    Compresses complete (non-streaming) text/JSON responses above a size threshold,
+    preferring brotli when it is installed and accepted, otherwise gzip.
+    Streaming bodies (SSE, ranged artifact downloads) pass through untouched so
+    events are never held back in a compressor buffer.
+    """
+
+    def __init__(
+        self,
+        app: ASGIApp,
+        minimum_size: int = settings.COMPRESSION_MIN_SIZE,
+        gzip_level: int = 6,
+        brotli_quality: int = 4
+    ) -> None:
+        self.app = app
+        self.minimum_size = minimum_size
+        self.gzip_level = gzip_level
+        self.brotli_quality = brotli_quality
+
+    def _choose(self, scope: Scope) -> Optional[str]:
+        accepted = _accepted(Headers(scope=scope).get("accept-encoding", ""))
+        if brotli is not None and "br" in accepted:
+            return "br"
+        if "gzip" in accepted:
+            return "gzip"
+        return None
+
+    def _compress(self, encoding: str, body: bytes) -> bytes:
+        if encoding == "br":
+            compressed: bytes = brotli.compress(body, quality=self.brotli_quality)
+            return compressed
+        return gzip.compress(body, compresslevel=self.gzip_level)
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        encoding = self._choose(scope) if scope["type"] == "http" else None
+        if encoding is None:
+            await self.app(scope, receive, send)
+            return
+
+        start: Optional[Message] = None
+        passthrough = False
+
+        async def send_wrapper(message: Message) -> None:
+            nonlocal start, passthrough
+            if message["type"] == "http.response.start":
+                start = message
+                return
+            if start is None or passthrough or message["type"] != "http.response.body":
+                if start is not None and not passthrough:
+                    passthrough = True
+                    await send(start)
+                await send(message)
+                return
+
+            body: bytes = message.get("body", b"")
+            headers = MutableHeaders(raw=start["headers"])
+            if (
+                message.get("more_body", False)
+                or len(body) < self.minimum_size
+                or start["status"] == 206
+                or "content-encoding" in headers
+                or not _compressible(headers.get("content-type", ""))
+            ):
+                passthrough = True
+                await send(start)
+                await send(message)
+                return
+
+            if len(body) >= THREAD_MINIMUM_SIZE:
+                compressed = await asyncio.to_thread(self._compress, encoding, body)
+            else:
+                compressed = self._compress(encoding, body)
+            headers["Content-Encoding"] = encoding
+            headers["Content-Length"] = str(len(compressed))
+            headers.add_vary_header("Accept-Encoding")
+            await send(start)
+            await send({"type": "http.response.body", "body": compressed, "more_body": False})
+
+        await self.app(scope, receive, send_wrapper)
@@ -1,13 +1,31 @@
 from src.core.bus.bus import MessageBus, InMemoryMessageBus
 from src.core.workflow.engine import WorkflowEngine
+from src.core.workflow.admission import AdmissionController
+from src.core.workflow.history import WorkflowHistory
+from src.core.workflow.timers import WorkflowTimers
+from src.core.cluster.sharding import ShardCoordinator
+from src.core.workflow.speculation import SpeculationPolicy
 from src.core.db.session import AsyncSessionLocal
+from src.core.artifacts.service import ArtifactService
+from src.api.broadcast import StreamHub
+from src.api.responses import TaskResponseCache
+from src.core.logs.index import LogIndex
 
 from src.core.llm.service import LLMService
 
 # Global Singletons
-_bus: MessageBus = InMemoryMessageBus()
-_engine: WorkflowEngine = WorkflowEngine(bus=_bus, session_factory=AsyncSessionLocal)
+_bus: InMemoryMessageBus = InMemoryMessageBus()
+_history: WorkflowHistory = WorkflowHistory(session_factory=AsyncSessionLocal)
+_engine: WorkflowEngine = WorkflowEngine(bus=_bus, session_factory=AsyncSessionLocal, history=_history)
+_timers: WorkflowTimers = WorkflowTimers(bus=_bus, engine=_engine)
+_shards: ShardCoordinator = ShardCoordinator(_bus)
+_speculation: SpeculationPolicy = SpeculationPolicy()
 _llm: LLMService = LLMService()
+_artifacts: ArtifactService = ArtifactService(session_factory=AsyncSessionLocal)
+_hub: StreamHub = StreamHub(_bus)
+_admission: AdmissionController = AdmissionController(_bus, session_factory=AsyncSessionLocal)
+_logs: LogIndex = LogIndex(_bus)
+_task_responses: TaskResponseCache = TaskResponseCache()
 
 def get_bus() -> MessageBus:
     """Provides the singular message bus instance."""
@@ -17,6 +35,42 @@ def get_engine() -> WorkflowEngine:
     """Provides the singular workflow engine instance."""
     return _engine
 
+def get_history() -> WorkflowHistory:
+    """Provides the goal transition event store."""
+    return _history
+
+def get_timers() -> WorkflowTimers:
+    """Provides the workflow timeout/lease/retry scheduler."""
+    return _timers
+
+def get_shards() -> ShardCoordinator:
+    """Provides this process's Director shards and the goal ring."""
+    return _shards
+
+def get_speculation() -> SpeculationPolicy:
+    """Provides the speculative execution policy and task latency statistics."""
+    return _speculation
+
 def get_llm() -> LLMService:
     """Provides the singular LLM service instance."""
     return _llm
+
+def get_artifacts() -> ArtifactService:
+    """Provides the singular artifact storage service."""
+    return _artifacts
+
+def get_hub() -> StreamHub:
+    """Provides the shared fan-out hub behind the WS/SSE endpoints."""
+    return _hub
+
+def get_log_index() -> LogIndex:
+    """Provides the in-memory agent log index."""
+    return _logs
+
+def get_admission() -> AdmissionController:
+    """Provides the goal admission controller."""
+    return _admission
+
+def get_task_responses() -> TaskResponseCache:
+    """Provides the cache of pre-serialized completed tasks."""
+    return _task_responses
@@ -1,14 +1,20 @@
-from contextlib import asynccontextmanager
-from typing import AsyncGenerator
+from contextlib import asynccontextmanager, AsyncExitStack
+from typing import AsyncGenerator, List, Optional
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
-from src.api.routers import workflow, agents, logs, stream
-from src.api.deps import _bus, _engine, _llm
+from src.api.routers import workflow, agents, logs, stream, artifacts
+from src.api.compression import CompressionMiddleware
+from src.api.responses import ORJSONResponse
+from src.api.deps import _bus, _engine, _llm, _hub, _logs, _admission, _timers, _shards, _speculation
 from src.core.db.session import create_tables
 from src.api.routers.agents import AgentRegistryService
+from src.core.audit.writer import AuditWriter
 from src.core.agents.director import DirectorAgent
 from src.core.agents.lyra import LyraAgent
 from src.core.agents.gptase import GPTASeAgent
+from src.core.agents.base import BaseAgent
+from src.core.cluster import ClusterMember, file_lock
+from src.shared.config import settings
 
 @asynccontextmanager
 async def lifespan(app: FastAPI) -> AsyncGenerator[None, None]:
@@ -16,30 +22,66 @@ async def lifespan(app: FastAPI) -> AsyncGenerator[None, None]:
     print("--- LIFESPAN STARTUP ---")
     # Startup
     registry = AgentRegistryService(_bus)
-    await create_tables()
+    async with AsyncExitStack() as stack:
+        if settings.MULTI_WORKER:
+            # Serialize schema creation across workers
+            await stack.enter_async_context(file_lock(settings.CLUSTER_DIR / "init.lock"))
+        await create_tables()
     await registry.start_listening()
+    await _admission.start()
     
-    # Initialize Core Agents
-    director = DirectorAgent(bus=_bus, engine=_engine)
-    await director.start()
+    await _hub.start()
+    await _logs.start()
+    
+    agents: List[BaseAgent] = []
+    audit = AuditWriter(_bus)
     
-    lyra = LyraAgent(bus=_bus, llm=_llm)
-    await lyra.start()
+    async def start_agents() -> None:
+        """Runs in exactly one process: the agents and the audit writer would duplicate work otherwise."""
+        await audit.start()
+        
+        # Initialize Core Agents
+        agents.extend([
+            LyraAgent(bus=_bus, llm=_llm),
+            GPTASeAgent(bus=_bus, llm=_llm),
+        ])
+        for agent in agents:
+            await agent.start()
+        await _timers.start()
     
-    gptase = GPTASeAgent(bus=_bus, llm=_llm)
-    await gptase.start()
+    member: Optional[ClusterMember] = None
+    if settings.MULTI_WORKER:
+        member = ClusterMember(_bus, on_elected=start_agents)
+        await member.start()
+    else:
+        await start_agents()
+    
+    # Every process runs Director shards; the shard ring decides which goals each one handles.
+    # Started once the bus bridge is up, so the first membership announcement reaches the peers.
+    director = DirectorAgent(bus=_bus, engine=_engine, shards=_shards, speculation=_speculation)
+    await _shards.start()
+    await director.start()
     
     yield
     print("--- LIFESPAN SHUTDOWN ---")
     # Shutdown
-    await gptase.stop()
-    await lyra.stop()
+    for agent in reversed(agents):
+        await agent.stop()
+    if agents:
+        await _timers.stop()
+        await audit.stop()
     await director.stop()
+    await _shards.stop()
+    if member:
+        await member.stop()
+    await _logs.stop()
+    await registry.stop()
 
 app = FastAPI(
     title="Orion Collective System (OCS)",
     version="0.1.0",
-    lifespan=lifespan
+    lifespan=lifespan,
+    default_response_class=ORJSONResponse
 )
 
 # Enable CORS for frontend
@@ -51,10 +93,14 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# Compress large JSON bodies (after CORS headers are set, so they are part of the compressed response)
+app.add_middleware(CompressionMiddleware)
+
 app.include_router(workflow.router, prefix="/api/v1/workflow", tags=["workflow"])
 app.include_router(agents.router, prefix="/api/v1/agents", tags=["agents"])
 app.include_router(logs.router, prefix="/api/v1/logs", tags=["logs"])
 app.include_router(stream.router, prefix="/api/v1/stream", tags=["stream"])
+app.include_router(artifacts.router, prefix="/api/v1/artifacts", tags=["artifacts"])
 
 @app.get("/health")
 async def health_check() -> dict[str, str]:
@@ -0,0 +1,61 @@
+from collections import OrderedDict
+from datetime import datetime
+from typing import Any, Dict, Iterable, Optional, Tuple
+from uuid import UUID
+
+import orjson
+from sqlalchemy import inspect as sa_inspect
+from starlette.responses import JSONResponse, Response
+
+from src.core.db.models import Task
+from src.shared.config import settings
+from src.shared.models import TaskState
+
+class ORJSONResponse(JSONResponse):
+    """JSON response rendered with orjson (UUIDs, datetimes and non-str keys handled natively)."""
+
+    def render(self, content: Any) -> bytes:
+        return orjson.dumps(content, option=orjson.OPT_NON_STR_KEYS)
+
+def task_to_dict(task: Task) -> Dict[str, Any]:
+    """Column values of a Task, as returned by the task endpoints."""
+    return {attr.key: getattr(task, attr.key) for attr in sa_inspect(Task).column_attrs}
+
+class TaskResponseCache:
+    """
+    Pre-serialized JSON for completed tasks.
+    A completed task's result never changes, so its (often large) LLM output is
+    encoded once and reused; entries are keyed by (id, updated_at) so a row that
+    is modified after all is simply re-encoded.
+    """
+
+    def __init__(self, max_entries: int = settings.TASK_RESPONSE_CACHE_SIZE) -> None:
+        self.max_entries: int = max_entries
+        self._entries: "OrderedDict[UUID, Tuple[Optional[datetime], bytes]]" = OrderedDict()
+        self.hits: int = 0
+        self.misses: int = 0
+
+    def encode(self, task: Task) -> bytes:
+        if task.status != TaskState.COMPLETED.value:
+            return orjson.dumps(task_to_dict(task), option=orjson.OPT_NON_STR_KEYS)
+
+        entry = self._entries.get(task.id)
+        if entry is not None and entry[0] == task.updated_at:
+            self.hits += 1
+            self._entries.move_to_end(task.id)
+            return entry[1]
+
+        self.misses += 1
+        data = orjson.dumps(task_to_dict(task), option=orjson.OPT_NON_STR_KEYS)
+        self._entries[task.id] = (task.updated_at, data)
+        self._entries.move_to_end(task.id)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+        return data
+
+    def response(self, task: Task) -> Response:
+        return Response(self.encode(task), media_type="application/json")
+
+    def list_response(self, tasks: Iterable[Task]) -> Response:
+        """A JSON array assembled from per-task fragments, without re-encoding cached ones."""
+        return Response(b"[" + b",".join(self.encode(t) for t in tasks) + b"]", media_type="application/json")
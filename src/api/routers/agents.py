@@ -1,42 +1,180 @@
-from typing import Annotated, List, Dict
+import asyncio
+import logging
+import time
+from datetime import datetime
+from typing import Annotated, Any, List, Dict, Optional
 from fastapi import APIRouter, Depends
 from src.core.bus.bus import MessageBus, MessageEnvelope
+from src.core.agents.base import BaseAgent
 from src.api.deps import get_bus
-from src.shared.models import AgentHeartbeat
+from src.shared.config import settings
+from src.shared.constants import AGENT_STATUS_TOPIC, AGENT_STATUS_DELTA_TOPIC, AGENT_SNAPSHOT_TOPIC, CLUSTER_PEER_JOINED_TOPIC
+from src.shared.models import AgentHeartbeat, AgentStatus
 
 router = APIRouter()
+logger = logging.getLogger(__name__)
 
-# In-memory store for latest heartbeats (simple implementation for MVP)
-_agent_registry: Dict[str, AgentHeartbeat] = {}
+class AgentRecord:
+    """Latest known state of one agent, plus its liveness deadline (monotonic seconds)."""
+
+    __slots__ = ("agent_id", "status", "current_task_id", "interval", "last_seen", "last_seen_at", "deadline")
+
+    def __init__(self, agent_id: str) -> None:
+        self.agent_id: str = agent_id
+        self.status: AgentStatus = AgentStatus.IDLE
+        self.current_task_id: Optional[str] = None
+        self.interval: float = BaseAgent.HEARTBEAT_DEFAULT_INTERVAL
+        self.last_seen: float = 0.0
+        self.last_seen_at: Optional[datetime] = None
+        self.deadline: float = 0.0
+
+    def to_heartbeat(self) -> AgentHeartbeat:
+        hb = AgentHeartbeat(
+            agent_id=self.agent_id,
+            status=self.status,
+            current_task_id=self.current_task_id,
+            interval=self.interval
+        )
+        if self.last_seen_at is not None:
+            hb.timestamp = self.last_seen_at
+        return hb
+
+    def to_delta(self) -> Dict[str, Any]:
+        return {"agent_id": self.agent_id, "status": self.status.value, "current_task_id": self.current_task_id}
+
+# In-memory store for the latest agent states
+_agent_registry: Dict[str, AgentRecord] = {}
 
 class AgentRegistryService:
-    def __init__(self, bus: MessageBus):
+    """
+    Tracks agent liveness from heartbeats.
+    Only status changes are re-published (AGENT_STATUS_DELTA_TOPIC), plus a compact
+    snapshot of all agents every AGENT_SNAPSHOT_INTERVAL. An agent that misses
+    AGENT_STALL_MISSED_BEATS heartbeat intervals is marked STALLED.
+    In multi-worker mode, a worker that joins late seeds its registry from the
+    snapshot the owner sends when the worker connects.
+    """
+
+    def __init__(
+        self,
+        bus: MessageBus,
+        sweep_interval: float = 1.0,
+        snapshot_interval: float = settings.AGENT_SNAPSHOT_INTERVAL,
+        missed_beats: int = settings.AGENT_STALL_MISSED_BEATS
+    ):
         self.bus = bus
+        self.sweep_interval = sweep_interval
+        self.snapshot_interval = snapshot_interval
+        self.missed_beats = missed_beats
+        self._sweep_task: Optional[asyncio.Task[None]] = None
     
     async def start_listening(self) -> None:
-        await self.bus.subscribe("system.heartbeat", self._update_heartbeat)
+        await self.bus.subscribe(AGENT_STATUS_TOPIC, self._update_heartbeat)
+        await self.bus.subscribe(AGENT_SNAPSHOT_TOPIC, self._seed_from_snapshot)
+        await self.bus.subscribe(CLUSTER_PEER_JOINED_TOPIC, self._on_peer_joined)
+        self._sweep_task = asyncio.create_task(self._sweep_loop())
+
+    async def stop(self) -> None:
+        if self._sweep_task:
+            self._sweep_task.cancel()
+            try:
+                await self._sweep_task
+            except asyncio.CancelledError:
+                pass
+            self._sweep_task = None
 
     async def _update_heartbeat(self, envelope: MessageEnvelope) -> None:
         """Update the internal registry with the latest heartbeat from an agent."""
         data = envelope.payload
-        if isinstance(data, dict):
+        if isinstance(data, AgentHeartbeat):
+            hb = data
+        elif isinstance(data, dict):
             # If payload is a dict, attempt to parse as AgentHeartbeat
             try:
                 hb = AgentHeartbeat(**data)
             except Exception:
                 # Fallback if parsing fails
                 return
-        elif isinstance(data, AgentHeartbeat):
-            hb = data
         else:
             # Unsupported payload type
             return
         
-        _agent_registry[hb.agent_id] = hb
+        record = _agent_registry.get(hb.agent_id)
+        changed = record is None
+        if record is None:
+            record = _agent_registry[hb.agent_id] = AgentRecord(hb.agent_id)
+        elif record.status != hb.status or record.current_task_id != hb.current_task_id:
+            changed = True
+
+        now = time.monotonic()
+        record.status = hb.status
+        record.current_task_id = hb.current_task_id
+        record.interval = hb.interval or record.interval
+        record.last_seen = now
+        record.last_seen_at = hb.timestamp
+        record.deadline = now + record.interval * self.missed_beats
+
+        if changed:
+            await self.bus.publish(AGENT_STATUS_DELTA_TOPIC, record.to_delta())
+
+    async def _seed_from_snapshot(self, envelope: MessageEnvelope) -> None:
+        """Adds agents this process has not heard from yet; known agents keep their own liveness."""
+        agents = envelope.payload.get("agents", []) if isinstance(envelope.payload, dict) else []
+        now = time.monotonic()
+        for entry in agents:
+            if entry.get("agent_id") in _agent_registry:
+                continue
+            try:
+                record = AgentRecord(entry["agent_id"])
+                record.status = AgentStatus(entry["status"])
+            except (KeyError, ValueError):
+                continue
+            record.current_task_id = entry.get("current_task_id")
+            record.interval = entry.get("interval") or record.interval
+            record.last_seen = now
+            record.last_seen_at = envelope.timestamp
+            record.deadline = now + record.interval * self.missed_beats
+            _agent_registry[record.agent_id] = record
+
+    async def _on_peer_joined(self, envelope: MessageEnvelope) -> None:
+        await self.publish_snapshot()
+
+    async def sweep(self, now: Optional[float] = None) -> List[str]:
+        """Marks agents whose heartbeat deadline passed as STALLED. Returns their ids."""
+        now = time.monotonic() if now is None else now
+        stalled: List[str] = []
+        for record in _agent_registry.values():
+            if record.status != AgentStatus.STALLED and now > record.deadline:
+                record.status = AgentStatus.STALLED
+                stalled.append(record.agent_id)
+                await self.bus.publish(AGENT_STATUS_DELTA_TOPIC, record.to_delta())
+        if stalled:
+            logger.warning("Agents stalled (missed %s heartbeats): %s", self.missed_beats, stalled)
+        return stalled
+
+    async def publish_snapshot(self) -> None:
+        await self.bus.publish(AGENT_SNAPSHOT_TOPIC, {
+            "agents": [dict(record.to_delta(), interval=record.interval) for record in _agent_registry.values()]
+        })
+
+    async def _sweep_loop(self) -> None:
+        last_snapshot = time.monotonic()
+        while True:
+            try:
+                await asyncio.sleep(self.sweep_interval)
+                now = time.monotonic()
+                await self.sweep(now)
+                if now - last_snapshot >= self.snapshot_interval:
+                    last_snapshot = now
+                    await self.publish_snapshot()
+            except asyncio.CancelledError:
+                break
+            except Exception as e:
+                logger.error("Error in agent registry sweep: %s", e)
 
 @router.get("/")
 async def list_agents(
     bus: Annotated[MessageBus, Depends(get_bus)]
 ) -> List[AgentHeartbeat]:
-    """List all active agents seen recently."""
-    return list(_agent_registry.values())
+    """List all agents seen, with STALLED for those that missed their heartbeats."""
+    return [record.to_heartbeat() for record in _agent_registry.values()]
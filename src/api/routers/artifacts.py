@@ -0,0 +1,94 @@
+from typing import Annotated, Iterator, Optional, Tuple
+from uuid import UUID
+from fastapi import APIRouter, Depends, Header, HTTPException, status
+from fastapi.responses import StreamingResponse
+
+from src.core.artifacts.service import ArtifactService
+from src.core.db.models import ArtifactVersion
+from src.api.deps import get_artifacts
+
+router = APIRouter()
+
+def _parse_range(header: str, size: int) -> Tuple[int, int]:
+    """Parses a single 'bytes=start-end' range into an inclusive (start, end) pair."""
+    unit, _, spec = header.partition("=")
+    if unit.strip() != "bytes" or "," in spec:
+        raise ValueError("Only single byte ranges are supported")
+
+    start_str, _, end_str = spec.strip().partition("-")
+    if not start_str:
+        # Suffix range: last N bytes
+        length = int(end_str)
+        if length <= 0:
+            raise ValueError("Empty suffix range")
+        return max(size - length, 0), size - 1
+
+    start = int(start_str)
+    end = int(end_str) if end_str else size - 1
+    if start >= size or end < start:
+        raise ValueError("Range not satisfiable")
+    return start, min(end, size - 1)
+
+async def _serve_version(
+    artifacts: ArtifactService,
+    artifact_id: UUID,
+    version_number: Optional[int],
+    range_header: Optional[str]
+) -> StreamingResponse:
+    try:
+        version: ArtifactVersion = await artifacts.get_version(artifact_id, version_number)
+    except ValueError as e:
+        raise HTTPException(status_code=404, detail=str(e))
+
+    try:
+        view = await artifacts.open_content(version)
+    except FileNotFoundError:
+        raise HTTPException(status_code=404, detail=f"Blob {version.blob_digest} missing from artifact store")
+
+    size = view.size
+    headers = {"Accept-Ranges": "bytes"}
+    if version.blob_digest:
+        headers["ETag"] = f'"{version.blob_digest}"'
+
+    start, end, code = 0, size - 1, status.HTTP_200_OK
+    if range_header and size > 0:
+        try:
+            start, end = _parse_range(range_header, size)
+        except ValueError:
+            view.close()
+            raise HTTPException(
+                status_code=416,
+                detail="Invalid Range header",
+                headers={"Content-Range": f"bytes */{size}"}
+            )
+        code = status.HTTP_206_PARTIAL_CONTENT
+        headers["Content-Range"] = f"bytes {start}-{end}/{size}"
+
+    headers["Content-Length"] = str(end - start + 1 if size else 0)
+
+    def body() -> Iterator[bytes]:
+        try:
+            yield from view.iter_range(start, end)
+        finally:
+            view.close()
+
+    return StreamingResponse(body(), status_code=code, headers=headers, media_type=version.artifact.media_type)
+
+@router.get("/{artifact_id}/content")
+async def get_current_content(
+    artifact_id: UUID,
+    artifacts: Annotated[ArtifactService, Depends(get_artifacts)],
+    range_header: Annotated[Optional[str], Header(alias="Range")] = None
+) -> StreamingResponse:
+    """Serve the content of the current artifact version (supports HTTP range requests)."""
+    return await _serve_version(artifacts, artifact_id, None, range_header)
+
+@router.get("/{artifact_id}/versions/{version_number}/content")
+async def get_version_content(
+    artifact_id: UUID,
+    version_number: int,
+    artifacts: Annotated[ArtifactService, Depends(get_artifacts)],
+    range_header: Annotated[Optional[str], Header(alias="Range")] = None
+) -> StreamingResponse:
+    """Serve the content of a specific artifact version (supports HTTP range requests)."""
+    return await _serve_version(artifacts, artifact_id, version_number, range_header)
@@ -1,47 +1,99 @@
 import asyncio
-from typing import Annotated, List
-from fastapi import APIRouter, WebSocket, WebSocketDisconnect, Depends
-from src.core.bus.bus import MessageBus, MessageEnvelope
-from src.api.deps import get_bus
+from datetime import datetime
+from typing import Annotated, Any, List, Optional
+from uuid import UUID
+from fastapi import APIRouter, WebSocket, WebSocketDisconnect, Depends, Query, status
+from src.api.broadcast import SlowClientError, StreamClient, StreamHub, parse_topics
+from src.api.deps import get_hub, get_log_index
+from src.core.logs.index import LogIndex
 
 router = APIRouter()
 
+# Default topics for the log viewer
+LOG_VIEWER_TOPICS: List[str] = [
+    "workflow.goal_started",
+    "workflow.state_change",
+    "system.agent_status",
+    "system.agent_snapshot",
+    "agent.log"
+]
+
+@router.get("")
+async def query_logs(
+    index: Annotated[LogIndex, Depends(get_log_index)],
+    hub: Annotated[StreamHub, Depends(get_hub)],
+    since: Optional[datetime] = None,
+    until: Optional[datetime] = None,
+    agent_id: Optional[str] = None,
+    level: Optional[str] = None,
+    q: Optional[str] = Query(None, description="Case-insensitive text search"),
+    limit: int = Query(100, ge=1, le=1000),
+    before: Optional[int] = Query(None, description="Return lines older than this seq (paging)")
+) -> dict[str, Any]:
+    """
+    Query recent agent log lines, newest first.
+    `last_event_id` is this worker's stream position as of the query: following the
+    stream from it continues right after the returned lines.
+    """
+    last_event_id = hub.last_event_id # read together with the query, with no await in between
+    entries = index.query(since, until, agent_id, level, q, limit, before)
+    return {
+        "entries": entries,
+        "next_before": entries[-1]["seq"] if len(entries) == limit else None,
+        "oldest_seq": index.first_seq,
+        "last_event_id": last_event_id,
+    }
+
 @router.websocket("/ws")
 async def websocket_endpoint(
     websocket: WebSocket,
-    bus: Annotated[MessageBus, Depends(get_bus)]
+    hub: Annotated[StreamHub, Depends(get_hub)],
+    topics: Optional[str] = Query(None),
+    goal_id: Optional[UUID] = Query(None),
+    last_event_id: Optional[str] = Query(None)
 ) -> None:
+    """
+    Streams bus events as JSON text frames. `topics`, `goal_id` and `last_event_id`
+    behave like on the SSE endpoint; each frame carries its event `id`.
+    """
     await websocket.accept()
-    
-    # Bridge: Listen to bus, send to WS
-    queue: asyncio.Queue[MessageEnvelope] = asyncio.Queue()
-    
-    async def bridge_callback(envelope: MessageEnvelope) -> None:
-        await queue.put(envelope)
-        
-    # Subscribe to critical topics for the log viewer
-    critical_topics: List[str] = [
-        "workflow.goal_started",
-        "workflow.state_change",
-        "system.heartbeat",
-        "agent.log"
-    ]
-    
-    for topic in critical_topics:
-        await bus.subscribe(topic, bridge_callback)
+    await hub.start()
+    try:
+        client = hub.connect(
+            parse_topics(topics) or LOG_VIEWER_TOPICS,
+            str(goal_id) if goal_id else None,
+            last_event_id
+        )
+    except ValueError as e:
+        await websocket.close(code=status.WS_1008_POLICY_VIOLATION, reason=str(e))
+        return
+    except RuntimeError:
+        await websocket.close(code=status.WS_1013_TRY_AGAIN_LATER)
+        return
         
+    # Nothing is read from the client, but a disconnect only surfaces through receive():
+    # without this, a narrow filter could hold a dead socket's slot until the next event
+    watcher = asyncio.create_task(_close_on_disconnect(websocket, hub, client))
     try:
-        while True:
-            # Wait for message from bus
-            envelope = await queue.get()
-            
-            # Send to WS
-            await websocket.send_json({
-                "topic": envelope.topic,
-                "payload": envelope.payload,
-                "timestamp": envelope.timestamp.isoformat(),
-                "source": envelope.source_id
-            })
+        if client.gap:
+            await websocket.send_json({"topic": "stream.gap", "last_event_id": last_event_id})
+        # Events arrive pre-encoded from the hub; send them as-is
+        async for _, data in client:
+            await websocket.send_text(data)
+    except SlowClientError:
+        await websocket.close(code=status.WS_1013_TRY_AGAIN_LATER, reason="Client too slow")
     except WebSocketDisconnect:
-        # Cleanup: In a real implementation, we'd remove the callback from the bus.
         pass
+    finally:
+        watcher.cancel()
+        hub.disconnect(client)
+
+async def _close_on_disconnect(websocket: WebSocket, hub: StreamHub, client: StreamClient) -> None:
+    """Reads (and discards) client frames until the socket closes, then ends the client's stream."""
+    try:
+        while (await websocket.receive())["type"] != "websocket.disconnect":
+            pass
+    except (WebSocketDisconnect, RuntimeError):
+        pass
+    finally:
+        hub.disconnect(client)
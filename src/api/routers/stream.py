@@ -1,50 +1,51 @@
 import asyncio
 import logging
-from typing import AsyncGenerator, Any
-from fastapi import APIRouter, Request
+from typing import AsyncGenerator, Any, Optional
+from uuid import UUID
+from fastapi import APIRouter, Header, HTTPException, Query, Request
 from sse_starlette.sse import EventSourceResponse
-from src.api.deps import get_bus
-from src.core.bus.bus import MessageBus, MessageEnvelope
+from src.api.broadcast import SlowClientError, StreamHub, parse_topics
+from src.api.deps import get_hub
 
 router = APIRouter()
 logger = logging.getLogger(__name__)
 
 @router.get("/stream")
-async def sse_stream(request: Request) -> EventSourceResponse:
+async def sse_stream(
+    request: Request,
+    topics: Optional[str] = Query(None, description="Comma-separated topics; entries containing '*' are regexes"),
+    goal_id: Optional[UUID] = Query(None, description="Only events whose payload references this goal"),
+    last_event_id: Optional[str] = Query(None, description="Resume point for clients that cannot set headers"),
+    last_event_id_header: Optional[str] = Header(None, alias="Last-Event-ID")
+) -> EventSourceResponse:
     """
     Server-Sent Events endpoint.
-    Streams all bus messages to the client.
+    Streams bus messages matching the filters to the client. Reconnecting with
+    Last-Event-ID replays missed events; a `gap` event is sent first when some
+    of them were already evicted from the replay buffer, or when the id was issued
+    by another worker process (resumption is per process).
     """
-    bus: MessageBus = get_bus()
+    hub: StreamHub = get_hub()
+    await hub.start()
+    resume_from = last_event_id_header if last_event_id_header is not None else last_event_id
+    try:
+        client = hub.connect(parse_topics(topics), str(goal_id) if goal_id else None, resume_from)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except RuntimeError as e:
+        raise HTTPException(status_code=503, detail=str(e))
     
     async def event_generator() -> AsyncGenerator[dict[str, Any], None]:
-        queue: asyncio.Queue[MessageEnvelope] = asyncio.Queue()
-        
-        async def handler(envelope: MessageEnvelope) -> None:
-            await queue.put(envelope)
-            
-        # Subscribe to everything
-        await bus.subscribe(".*", handler)
-        
         try:
-            while True:
-                if await request.is_disconnected():
-                    break
-                
-                envelope = await queue.get()
-                yield {
-                    "event": "message",
-                    "data": {
-                        "topic": envelope.topic,
-                        "payload": envelope.payload,
-                        "timestamp": envelope.timestamp.isoformat(),
-                        "source": envelope.source_id
-                    }
-                }
+            if client.gap:
+                yield {"event": "gap", "data": str(resume_from)}
+            async for event_id, data in client:
+                yield {"id": event_id, "event": "message", "data": data}
+        except SlowClientError:
+            logger.warning("SSE client dropped for falling behind")
         except asyncio.CancelledError:
             logger.info("SSE client disconnected")
         finally:
-            # Cleanup - in robust system we'd unsubscribe
-            pass
+            hub.disconnect(client)
             
     return EventSourceResponse(event_generator())
@@ -1,30 +1,162 @@
-from typing import Annotated, Any
+import json
+from datetime import datetime
+from typing import Annotated, Any, List, Optional
 from uuid import UUID
-from fastapi import APIRouter, Depends, HTTPException, status
-from pydantic import BaseModel
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response, status
+from pydantic import BaseModel, ValidationError
+from sqlalchemy.exc import IntegrityError
 
+from src.core.workflow.admission import AdmissionController
 from src.core.workflow.engine import WorkflowEngine
-from src.core.workflow.state import WorkflowState, TransitionError
-from src.api.deps import get_engine
+from src.core.workflow.history import WorkflowHistory
+from src.core.workflow.timers import WorkflowTimers
+from src.core.workflow.state import WorkflowState, TransitionError, TransitionConflictError
+from src.api.deps import get_admission, get_engine, get_history, get_shards, get_speculation, get_task_responses, get_timers
+from src.core.cluster.sharding import ShardCoordinator
+from src.api.responses import TaskResponseCache
+from src.core.workflow.speculation import SpeculationPolicy
+from src.shared.config import settings
+from src.shared.models import TaskPriority
 
 router = APIRouter()
 
 class CreateGoalRequest(BaseModel):
     title: str
     description: str
+    workflow: Optional[str] = None # Definition key (name@version); default: settings.WORKFLOW_DEFAULT
+    priority: Optional[TaskPriority] = None # Inherited by the goal's tasks; CRITICAL enables speculative execution
 
 class TransitionRequest(BaseModel):
     target_state: WorkflowState
 
+class ReplayRequest(BaseModel):
+    goal_ids: Optional[List[UUID]] = None # Default: every goal
+    apply: bool = False # Rewrite diverged goals.status/version from the event log
+
+def _admit(admission: AdmissionController, count: int) -> None:
+    """
+    Reserves room for `count` goals in the decomposition backlog. Raises 429 with
+    Retry-After while there is none, and 413 for a batch larger than the whole limit.
+    The caller must release the reservation if the goals are not created.
+    """
+    if not admission.fits(count):
+        raise HTTPException(
+            status_code=status.HTTP_413_CONTENT_TOO_LARGE,
+            detail=f"At most {admission.max_backlog} goals can wait for decomposition; split the request"
+        )
+    retry_after = admission.reserve(count)
+    if retry_after is not None:
+        raise HTTPException(
+            status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+            detail=f"Goal backlog is full ({admission.backlog} pending decomposition)",
+            headers={"Retry-After": str(retry_after)}
+        )
+
+def _workflow_key(engine: WorkflowEngine, workflow: Optional[str]) -> str:
+    """Resolves a workflow key up front so unknown keys are a 422, not a failed insert."""
+    try:
+        return engine.workflows.get(workflow).key
+    except ValueError as e:
+        raise HTTPException(status_code=422, detail=str(e))
+
+def _parse_bulk_goals(body: bytes, content_type: str) -> List[CreateGoalRequest]:
+    """Accepts a JSON array or NDJSON (one goal object per line)."""
+    try:
+        if "ndjson" in content_type or "jsonl" in content_type:
+            items = [json.loads(line) for line in body.splitlines() if line.strip()]
+        else:
+            items = json.loads(body)
+            if not isinstance(items, list):
+                raise ValueError("expected a JSON array of goals")
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=f"Malformed bulk body: {e}")
+
+    if len(items) > settings.GOAL_BULK_MAX_ITEMS:
+        raise HTTPException(
+            status_code=status.HTTP_413_CONTENT_TOO_LARGE,
+            detail=f"At most {settings.GOAL_BULK_MAX_ITEMS} goals per request"
+        )
+    goals: List[CreateGoalRequest] = []
+    for index, item in enumerate(items):
+        try:
+            goals.append(CreateGoalRequest.model_validate(item))
+        except ValidationError as e:
+            raise HTTPException(status_code=422, detail={"index": index, "errors": e.errors(include_url=False)})
+    return goals
+
 @router.post("/goals", status_code=status.HTTP_201_CREATED)
 async def create_goal(
     request: CreateGoalRequest,
-    engine: Annotated[WorkflowEngine, Depends(get_engine)]
+    engine: Annotated[WorkflowEngine, Depends(get_engine)],
+    admission: Annotated[AdmissionController, Depends(get_admission)]
 ) -> dict[str, str]:
     """Create a new High-Level Goal (Starts N1)."""
-    goal_id = await engine.initialize_goal(request.title, request.description)
+    workflow = _workflow_key(engine, request.workflow)
+    _admit(admission, 1)
+    priority = request.priority or TaskPriority.MEDIUM
+    try:
+        goal_id = await engine.initialize_goal(request.title, request.description, workflow, priority)
+    except BaseException:
+        admission.release(1)
+        raise
     return {"id": str(goal_id), "status": "created"}
 
+@router.post("/goals/bulk", status_code=status.HTTP_201_CREATED)
+async def create_goals_bulk(
+    request: Request,
+    engine: Annotated[WorkflowEngine, Depends(get_engine)],
+    admission: Annotated[AdmissionController, Depends(get_admission)],
+    workflow: Optional[str] = Query(None),
+    priority: TaskPriority = Query(TaskPriority.MEDIUM)
+) -> dict[str, Any]:
+    """
+    Create many goals in one transaction, all under one workflow definition and priority.
+    Body: a JSON array, or NDJSON with Content-Type application/x-ndjson.
+    """
+    workflow = _workflow_key(engine, workflow)
+    goals = _parse_bulk_goals(await request.body(), request.headers.get("content-type", ""))
+    for index, goal in enumerate(goals):
+        if goal.workflow is not None and _workflow_key(engine, goal.workflow) != workflow:
+            raise HTTPException(
+                status_code=422,
+                detail={"index": index, "errors": f"workflow {goal.workflow} differs from the request's {workflow}"}
+            )
+        if goal.priority is not None and goal.priority != priority:
+            raise HTTPException(
+                status_code=422,
+                detail={"index": index, "errors": f"priority {goal.priority.value} differs from the request's {priority.value}"}
+            )
+    _admit(admission, len(goals))
+    try:
+        goal_ids = await engine.initialize_goals(
+            [(g.title, g.description) for g in goals], workflow=workflow, priority=priority
+        )
+    except BaseException:
+        admission.release(len(goals))
+        raise
+    return {"ids": [str(goal_id) for goal_id in goal_ids], "count": len(goal_ids), "status": "created"}
+
+@router.get("/goals")
+async def list_goals(
+    engine: Annotated[WorkflowEngine, Depends(get_engine)],
+    status_filter: Optional[str] = Query(None, alias="status"),
+    limit: int = Query(100, ge=1, le=500),
+    offset: int = Query(0, ge=0)
+) -> list[dict[str, Any]]:
+    """List goals, newest first."""
+    from sqlalchemy import select
+    from src.core.db.models import Goal
+
+    query = select(Goal.id, Goal.title, Goal.status, Goal.created_at).order_by(Goal.created_at.desc())
+    if status_filter:
+        query = query.where(Goal.status == status_filter)
+    async with engine.session_factory() as session:
+        rows = (await session.execute(query.limit(limit).offset(offset))).all()
+    return [
+        {"id": str(row.id), "title": row.title, "status": row.status, "created_at": row.created_at}
+        for row in rows
+    ]
+
 @router.post("/goals/{goal_id}/advance")
 async def advance_phase(
     goal_id: UUID,
@@ -37,14 +169,17 @@ async def advance_phase(
         return {"goal_id": str(goal_id), "new_state": request.target_state, "accepted": success}
     except ValueError as e:
         raise HTTPException(status_code=404, detail=str(e))
+    except TransitionConflictError as e:
+        raise HTTPException(status_code=409, detail=str(e))
     except TransitionError as e:
         raise HTTPException(status_code=400, detail=str(e))
 
 @router.get("/goals/{goal_id}/tasks")
 async def get_goal_tasks(
     goal_id: UUID,
-    engine: Annotated[WorkflowEngine, Depends(get_engine)]
-) -> Any:
+    engine: Annotated[WorkflowEngine, Depends(get_engine)],
+    responses: Annotated[TaskResponseCache, Depends(get_task_responses)]
+) -> Response:
     """Retrieve tasks for a specific goal."""
     from sqlalchemy import select
     from src.core.db.models import Task
@@ -53,4 +188,119 @@ async def get_goal_tasks(
     async with engine.session_factory() as session:
         result = await session.execute(select(Task).where(Task.goal_id == goal_id))
         tasks = result.scalars().all()
-        return tasks
+        # Completed tasks are served from their cached JSON encoding
+        return responses.list_response(tasks)
+
+@router.get("/goals/{goal_id}/summary")
+async def get_goal_summary(
+    goal_id: UUID,
+    engine: Annotated[WorkflowEngine, Depends(get_engine)]
+) -> dict[str, Any]:
+    """Task counts per state, percent complete, average latency and ETA, from the goal's counter row."""
+    from src.core.db.models import Goal
+    from src.core.db.progress import get_progress, summarize
+
+    async with engine.session_factory() as session:
+        goal = await engine.cache.get(session, Goal, goal_id)
+        if not goal:
+            raise HTTPException(status_code=404, detail=f"Goal {goal_id} not found")
+        progress = await get_progress(session, goal_id)
+        if progress in session.new:
+            try:
+                await session.commit()
+            except IntegrityError:
+                # Another request backfilled the row first
+                await session.rollback()
+                progress = await get_progress(session, goal_id)
+        return {"goal_id": str(goal_id), "status": goal.status, **summarize(progress)}
+
+@router.get("/goals/{goal_id}/history")
+async def get_goal_history(
+    goal_id: UUID,
+    history: Annotated[WorkflowHistory, Depends(get_history)],
+    at: Optional[datetime] = Query(None, description="Rebuild the goal's state as of this time")
+) -> dict[str, Any]:
+    """The goal's transition events and its state replayed from the nearest snapshot."""
+    state = await history.state_at(goal_id, at)
+    if state is None:
+        raise HTTPException(status_code=404, detail=f"No history for goal {goal_id}")
+    return {"goal_id": str(goal_id), "at": at, "state": state.to_dict(), "events": await history.events(goal_id, at)}
+
+@router.post("/replay")
+async def replay_history(
+    request: ReplayRequest,
+    history: Annotated[WorkflowHistory, Depends(get_history)]
+) -> dict[str, Any]:
+    """Replays the event log for many goals and reports (or repairs) drift in goals.status."""
+    return await history.rebuild(request.goal_ids, apply=request.apply)
+
+@router.get("/tasks/{task_id}")
+async def get_task(
+    task_id: UUID,
+    engine: Annotated[WorkflowEngine, Depends(get_engine)],
+    responses: Annotated[TaskResponseCache, Depends(get_task_responses)]
+) -> Response:
+    """Retrieve a single task, including its result."""
+    from src.core.db.models import Task
+
+    async with engine.session_factory() as session:
+        task = await session.get(Task, task_id)
+        if not task:
+            raise HTTPException(status_code=404, detail=f"Task {task_id} not found")
+        return responses.response(task)
+
+@router.get("/tasks/{task_id}/subtree")
+async def get_task_subtree(
+    task_id: UUID,
+    engine: Annotated[WorkflowEngine, Depends(get_engine)],
+    responses: Annotated[TaskResponseCache, Depends(get_task_responses)],
+    depth: Optional[int] = Query(None, ge=0, description="Levels below the task to include; default: all")
+) -> Response:
+    """A task and its subtasks in depth-first order, from the materialized path index."""
+    from src.core.db.models import Task
+    from src.core.db.tree import subtree
+
+    async with engine.session_factory() as session:
+        task = await session.get(Task, task_id)
+        if not task:
+            raise HTTPException(status_code=404, detail=f"Task {task_id} not found")
+        return responses.list_response(await subtree(session, task, depth))
+
+@router.get("/cache/stats")
+async def get_cache_stats(
+    engine: Annotated[WorkflowEngine, Depends(get_engine)]
+) -> dict[str, Any]:
+    """Hit/miss metrics of the Goal/Task entity cache."""
+    return engine.cache.stats()
+
+@router.get("/timers/stats")
+async def get_timer_stats(
+    timers: Annotated[WorkflowTimers, Depends(get_timers)]
+) -> dict[str, Any]:
+    """Pending workflow timers and how many of each kind have fired."""
+    return timers.stats()
+
+@router.get("/shards")
+async def get_shard_stats(
+    shards: Annotated[ShardCoordinator, Depends(get_shards)]
+) -> dict[str, Any]:
+    """This process's Director shards, the ring members and events held for handoff."""
+    return shards.stats()
+
+@router.get("/speculation")
+async def get_speculation_stats(
+    speculation: Annotated[SpeculationPolicy, Depends(get_speculation)]
+) -> dict[str, Any]:
+    """Speculative execution counters and per-task-type latency percentiles."""
+    return speculation.stats()
+
+@router.get("/definitions")
+async def list_definitions(
+    engine: Annotated[WorkflowEngine, Depends(get_engine)]
+) -> list[dict[str, Any]]:
+    """Loaded workflow definitions: states, allowed transitions and which one is the default."""
+    default = engine.workflows.get().key
+    return [
+        {**definition.describe(), "default": definition.key == default}
+        for definition in sorted(engine.workflows, key=lambda d: d.key)
+    ]
@@ -0,0 +1,133 @@
+import asyncio
+import json
+from datetime import datetime
+from typing import Any, AsyncIterator, Dict, List, Optional
+
+import httpx
+
+from src.shared.config import settings
+
+class SSEEvent:
+    """One Server-Sent Event as parsed from the stream."""
+
+    __slots__ = ("id", "event", "data")
+
+    def __init__(self, id: Optional[str], event: str, data: str) -> None:
+        self.id = id
+        self.event = event
+        self.data = data
+
+    def json(self) -> Any:
+        return json.loads(self.data)
+
+async def iter_sse(lines: AsyncIterator[str]) -> AsyncIterator[SSEEvent]:
+    """Incremental SSE parser: yields each event as soon as its terminating blank line arrives."""
+    event_id: Optional[str] = None
+    event = "message"
+    data: List[str] = []
+    async for line in lines:
+        if not line:
+            if data:
+                yield SSEEvent(event_id, event, "\n".join(data))
+            event, data = "message", []
+            continue
+        if line.startswith(":"):
+            continue # comment / ping
+        field, _, value = line.partition(":")
+        value = value[1:] if value.startswith(" ") else value
+        if field == "data":
+            data.append(value)
+        elif field == "event":
+            event = value
+        elif field == "id":
+            event_id = value
+
+class OCSClient:
+    """
+    Async API client for the CLI.
+    One pooled httpx.AsyncClient with keep-alive is reused for every request,
+    so paging and reconnects don't pay a new TCP/TLS handshake each time.
+    """
+
+    def __init__(self, base_url: str = settings.API_URL, transport: Optional[httpx.AsyncBaseTransport] = None) -> None:
+        self._http = httpx.AsyncClient(
+            base_url=base_url,
+            transport=transport,
+            timeout=httpx.Timeout(10.0, read=None),
+            limits=httpx.Limits(max_connections=10, max_keepalive_connections=10, keepalive_expiry=30.0)
+        )
+
+    async def __aenter__(self) -> "OCSClient":
+        return self
+
+    async def __aexit__(self, *exc: Any) -> None:
+        await self.close()
+
+    async def close(self) -> None:
+        await self._http.aclose()
+
+    async def _get(self, path: str, **params: Any) -> Any:
+        response = await self._http.get(path, params={k: v for k, v in params.items() if v is not None})
+        response.raise_for_status()
+        return response.json()
+
+    async def iter_goals(self, status: Optional[str] = None, page_size: int = 100) -> AsyncIterator[List[Dict[str, Any]]]:
+        """Yields goals page by page, newest first."""
+        offset = 0
+        while True:
+            page = await self._get("/api/v1/workflow/goals", status=status, limit=page_size, offset=offset)
+            if page:
+                yield page
+            if len(page) < page_size:
+                break
+            offset += page_size
+
+    async def agents(self) -> List[Dict[str, Any]]:
+        records: List[Dict[str, Any]] = await self._get("/api/v1/agents/")
+        return records
+
+    async def logs(
+        self,
+        agent_id: Optional[str] = None,
+        level: Optional[str] = None,
+        text: Optional[str] = None,
+        since: Optional[datetime] = None,
+        limit: int = 100
+    ) -> Dict[str, Any]:
+        """
+        Recent log lines, newest first, under "entries". Pass "last_event_id" to
+        `stream` to follow on from exactly these lines.
+        """
+        history: Dict[str, Any] = await self._get(
+            "/api/v1/logs", agent_id=agent_id, level=level, q=text,
+            since=since.isoformat() if since else None, limit=limit
+        )
+        return history
+
+    async def stream(
+        self,
+        topics: Optional[str] = None,
+        last_event_id: Optional[str] = None,
+        backoff: float = 0.5,
+        max_backoff: float = 30.0
+    ) -> AsyncIterator[SSEEvent]:
+        """
+        Follows the SSE stream, yielding events as they arrive, until the caller stops.
+        A closed or failed connection is retried with exponential backoff, resuming
+        from the last event id seen; the server sends a `gap` event if it cannot.
+        """
+        delay = backoff
+        while True:
+            headers = {"Last-Event-ID": last_event_id} if last_event_id else {}
+            try:
+                async with self._http.stream("GET", "/api/v1/stream/stream", params={"topics": topics} if topics else None, headers=headers) as response:
+                    response.raise_for_status()
+                    async for event in iter_sse(response.aiter_lines()):
+                        delay = backoff
+                        if event.id:
+                            last_event_id = event.id
+                        yield event
+            except httpx.TransportError:
+                pass # server restarting, worker gone, network blip
+            await asyncio.sleep(delay)
+            delay = min(delay * 2, max_backoff)
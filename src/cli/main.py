@@ -1,8 +1,14 @@
+from typing import Any, Dict, Optional, TYPE_CHECKING
+
 import typer
 from rich.console import Console
-from rich.table import Table
 from src.shared.constants import SYSTEM_NAME, SYSTEM_VERSION, SYSTEM_MODE
-from src.shared.models import AgentRole
+from src.shared.enums import AgentRole
+
+# Keep cold start cheap: asyncio, rich.table/live, httpx and the API client are imported
+# inside the commands that use them.
+if TYPE_CHECKING:
+    from rich.text import Text
 
 app = typer.Typer(help=SYSTEM_NAME)
 console = Console()
@@ -21,27 +27,121 @@ def init() -> None:
     # TODO: Add initialization logic here (e.g. database setup)
     console.print("✓ Environment ready.")
 
+LEVEL_STYLES: Dict[str, str] = {"DEBUG": "dim", "INFO": "green", "SUCCESS": "bold green", "WARNING": "yellow", "ERROR": "red", "CRITICAL": "bold red"}
+
+def _log_line(timestamp: str, agent_id: str, level: str, message: str) -> "Text":
+    from rich.text import Text
+
+    line = Text(f"{timestamp[11:23]} ", style="dim")
+    line.append(f"{level:<8}", style=LEVEL_STYLES.get(level, "white"))
+    line.append(f"{agent_id:<10} ", style="cyan")
+    line.append(message)
+    return line
+
+def _run(coro: Any) -> None:
+    """Runs an API command, turning connection/HTTP failures into a short error."""
+    import asyncio
+    import httpx
+
+    try:
+        asyncio.run(coro)
+    except httpx.HTTPError as e:
+        console.print(f"[red]API request failed:[/red] {e}")
+        raise typer.Exit(1)
+    except KeyboardInterrupt:
+        pass
+
+async def _show_goals(status: Optional[str]) -> None:
+    from rich.live import Live
+    from rich.table import Table
+    from src.cli.client import OCSClient
+
+    table = Table(title="Goals")
+    table.add_column("ID", style="dim")
+    table.add_column("Title", style="cyan")
+    table.add_column("Status", style="yellow")
+    table.add_column("Created", style="white")
+
+    # Rows are added as each page arrives instead of after the whole listing.
+    async with OCSClient() as client:
+        with Live(table, console=console, auto_refresh=False) as live:
+            async for page in client.iter_goals(status=status):
+                for goal in page:
+                    table.add_row(goal["id"], goal["title"], goal["status"], str(goal["created_at"])[:19])
+                live.refresh()
+
+async def _show_agents() -> None:
+    from rich.table import Table
+    from src.cli.client import OCSClient
+
+    async with OCSClient() as client:
+        records = await client.agents()
+
+    table = Table(title="Agents")
+    table.add_column("Agent", style="cyan")
+    table.add_column("Status", style="yellow")
+    table.add_column("Current Task", style="white")
+    table.add_column("Last Seen", style="dim")
+    for agent in records:
+        table.add_row(agent["agent_id"], agent["status"], agent.get("current_task_id") or "-", str(agent["timestamp"])[:19])
+    console.print(table)
+
+async def _show_logs(follow: bool, agent: Optional[str], level: Optional[str], search: Optional[str], limit: int) -> None:
+    from src.cli.client import OCSClient
+
+    async with OCSClient() as client:
+        history = await client.logs(agent_id=agent, level=level, text=search, limit=limit)
+        for entry in reversed(history["entries"]):
+            console.print(_log_line(entry["timestamp"], entry["agent_id"], entry["level"], entry["message"]))
+        if not follow:
+            return
+
+        needle = search.lower() if search else None
+        async for event in client.stream(topics="agent.log", last_event_id=history.get("last_event_id")):
+            if event.event == "gap":
+                console.print("[yellow]Some log lines were missed: the server no longer holds them.[/yellow]")
+                continue
+            if event.event != "message":
+                continue
+            data: Dict[str, Any] = event.json()
+            payload = data.get("payload") or {}
+            agent_id = str(payload.get("agent_id") or data.get("source", ""))
+            entry_level = str(payload.get("level") or "INFO").upper()
+            message = str(payload.get("message", ""))
+            if agent and agent_id != agent:
+                continue
+            if level and entry_level != level.upper():
+                continue
+            if needle and needle not in message.lower():
+                continue
+            console.print(_log_line(data["timestamp"], agent_id, entry_level, message))
+
 @app.command()
-def goals() -> None:
+def goals(status: Optional[str] = typer.Option(None, help="Only goals in this state")) -> None:
     """List all high-level goals."""
-    # ... logic ...
-    pass
+    _run(_show_goals(status))
 
 @app.command()
 def agents() -> None:
     """List all registered agents."""
-    # ... logic ...
-    pass
+    _run(_show_agents())
 
 @app.command()
-def logs(follow: bool = False) -> None:
+def logs(
+    follow: bool = typer.Option(False, "--follow", "-f", help="Keep streaming new lines"),
+    agent: Optional[str] = typer.Option(None, help="Only lines from this agent"),
+    level: Optional[str] = typer.Option(None, help="Only lines with this level"),
+    search: Optional[str] = typer.Option(None, "--grep", help="Case-insensitive text filter"),
+    limit: int = typer.Option(50, help="Recent lines to show first")
+) -> None:
     """Stream system logs."""
-    # ... logic ...
-    pass
+    _run(_show_logs(follow, agent, level, search, limit))
 
 @app.command()
 def list_agents() -> None:
     """List available agent roles."""
+    from rich.table import Table
+
     table = Table(title="Available Agents")
     table.add_column("Role", style="cyan")
     table.add_column("Description", style="white")
@@ -1,13 +1,14 @@
 import asyncio
 import logging
 from abc import ABC, abstractmethod
-from typing import Optional, Any, Final, TYPE_CHECKING
+from typing import Optional, Any, Dict, Final, List, Tuple, TYPE_CHECKING
 
 if TYPE_CHECKING:
     from src.core.bus.bus import MessageBus, MessageEnvelope
     from src.shared.models import AgentTask
 
 from src.shared.models import AgentHeartbeat, AgentStatus, TaskState
+from src.shared.constants import AGENT_STATUS_TOPIC
 
 logger = logging.getLogger(__name__)
 
@@ -15,6 +16,11 @@ class BaseAgent(ABC):
     """
     Abstract Base Class for OCS Agents.
     Handles lifecycle, heartbeat, and task subscription.
+    Heartbeats are coalesced: a status change is published immediately, and the
+    periodic loop only sends a keepalive when nothing was published since its last tick.
+    Tasks run concurrently; the status and the running task ids come from the runs in flight.
+    Running tasks can be cancelled over agents.<id>.cancel, e.g. the losing copies of
+    a speculatively executed task.
     """
 
     HEARTBEAT_DEFAULT_INTERVAL: Final[float] = 5.0
@@ -32,6 +38,9 @@ class BaseAgent(ABC):
         self._current_task_id: Optional[str] = None
         self._shutdown_event: asyncio.Event = asyncio.Event()
         self._heartbeat_task: Optional[asyncio.Task[None]] = None
+        self._last_reported: Optional[Tuple[AgentStatus, Optional[str], Tuple[str, ...]]] = None
+        self._reported_since_tick: bool = False
+        self._runs: Dict[str, Dict[Optional[int], "asyncio.Task[Any]"]] = {} # task id -> replica -> run
 
     async def start(self) -> None:
         """Starts the agent's background processes."""
@@ -39,6 +48,7 @@ class BaseAgent(ABC):
         
         # Subscribe to own task queue
         await self.bus.subscribe(f"agents.{self.agent_id}.task", self._handle_task_envelope)
+        await self.bus.subscribe(f"agents.{self.agent_id}.cancel", self.on_cancel)
         
         # Start Heartbeat
         self._heartbeat_task = asyncio.create_task(self._heartbeat_loop())
@@ -60,7 +70,9 @@ class BaseAgent(ABC):
         """Periodically publishes heartbeat to the message bus."""
         while not self._shutdown_event.is_set():
             try:
-                await self._emit_heartbeat()
+                if not self._reported_since_tick:
+                    await self._emit_heartbeat(force=True)
+                self._reported_since_tick = False
                 await asyncio.sleep(self.heartbeat_interval)
             except asyncio.CancelledError:
                 break
@@ -68,14 +80,22 @@ class BaseAgent(ABC):
                 logger.error("Error in heartbeat loop for %s: %s", self.agent_id, e)
                 await asyncio.sleep(5) # Backoff
 
-    async def _emit_heartbeat(self) -> None:
-        """Publishes the current agent status."""
+    async def _emit_heartbeat(self, force: bool = False) -> None:
+        """Publishes the current agent status if it changed (or unconditionally when forced)."""
+        running = tuple(self._runs)
+        state = (self._status, self._current_task_id, running)
+        if not force and state == self._last_reported:
+            return
+        self._last_reported = state
+        self._reported_since_tick = True
         hb = AgentHeartbeat(
             agent_id=self.agent_id,
             status=self._status,
-            current_task_id=self._current_task_id
+            current_task_id=self._current_task_id,
+            running_task_ids=list(running),
+            interval=self.heartbeat_interval
         )
-        await self.bus.publish("system.heartbeat", hb)
+        await self.bus.publish(AGENT_STATUS_TOPIC, hb)
 
     async def log(self, level: str, message: str) -> None:
         """Helper to publish log events to the bus."""
@@ -87,6 +107,10 @@ class BaseAgent(ABC):
 
     async def _handle_task_envelope(self, envelope: "MessageEnvelope") -> None:
         """Callback for incoming tasks from the message bus."""
+        if self._shutdown_event.is_set():
+            # The subscription outlives stop(); a stopped agent must not race the running one
+            logger.info("Agent %s is stopped; ignoring task on %s", self.agent_id, envelope.topic)
+            return
         try:
             from src.shared.models import AgentTask
             
@@ -104,10 +128,25 @@ class BaseAgent(ABC):
         except Exception as e:
             logger.error("Error handling task envelope: %s", e, exc_info=True)
             self._status = AgentStatus.ERROR
+            await self._emit_heartbeat()
+
+    async def on_cancel(self, envelope: "MessageEnvelope") -> None:
+        """
+        Cancels the running copies of a task without reporting a result.
+        Payload: { "task_id": str, "keep": Optional[int] } (the copy to leave running)
+        """
+        data = envelope.payload
+        keep = data.get("keep")
+        for replica, run in list(self._runs.get(str(data.get("task_id")), {}).items()):
+            if keep is None or replica != keep:
+                run.cancel()
 
     async def _execute_task(self, task: "AgentTask") -> None:
         """Wraps the task processing with status updates and result reporting."""
         logger.info("Agent %s received task %s", self.agent_id, task.id)
+        run = asyncio.current_task()
+        if run is not None:
+            self._runs.setdefault(task.id, {})[task.replica] = run
         self._status = AgentStatus.WORKING
         self._current_task_id = task.id
         await self._emit_heartbeat()
@@ -123,20 +162,39 @@ class BaseAgent(ABC):
                     "result": result,
                     "agent_id": self.agent_id
                 }
+                if task.goal_id:
+                    payload["goal_id"] = task.goal_id
+                if task.replica is not None:
+                    payload["replica"] = task.replica
                 await self.bus.publish("workflow.task_result", payload, source_id=self.agent_id)
             
+        except asyncio.CancelledError:
+            logger.info("Agent %s cancelled task %s (copy %s)", self.agent_id, task.id, task.replica)
+            raise
         except Exception as e:
             logger.error("Task %s failed: %s", task.id, e, exc_info=True)
             # Publish failure event to workflow
-            await self.bus.publish("workflow.task_result", {
+            failure: Dict[str, Any] = {
                 "task_id": task.id,
                 "status": TaskState.FAILED.value,
                 "error": str(e),
                 "agent_id": self.agent_id
-            }, source_id=self.agent_id)
+            }
+            if task.goal_id:
+                failure["goal_id"] = task.goal_id
+            if task.replica is not None:
+                failure["replica"] = task.replica
+            await self.bus.publish("workflow.task_result", failure, source_id=self.agent_id)
         finally:
-            self._status = AgentStatus.IDLE
-            self._current_task_id = None
+            runs = self._runs.get(task.id)
+            if runs is not None and runs.get(task.replica) is run:
+                del runs[task.replica]
+                if not runs:
+                    del self._runs[task.id]
+            # Other tasks (or other copies of this one) may still be running
+            running: List[str] = list(self._runs)
+            self._status = AgentStatus.WORKING if running else AgentStatus.IDLE
+            self._current_task_id = running[-1] if running else None
             await self._emit_heartbeat()
 
     @abstractmethod
@@ -1,11 +1,18 @@
 import logging
-import asyncio
-from typing import Any, TYPE_CHECKING
+from datetime import datetime, timezone
+from typing import Any, Optional, Tuple, TYPE_CHECKING
 from uuid import UUID
 
 from src.core.agents.base import BaseAgent
-from src.core.workflow.state import WorkflowState
-from src.shared.models import AgentRole, TaskState
+from src.core.cluster.sharding import ShardCoordinator
+from src.core.db.cache import entity_cache
+from src.core.db.progress import FINISHED_STATES, outstanding_tasks, record_transition
+from src.core.db.session import as_utc
+from src.core.db.tree import needs_expansion, roll_up
+from src.core.workflow.definition import ON_ENTER, ON_TASKS_FINISHED, WorkflowReaction, WorkflowRegistry, default_registry
+from src.core.workflow.speculation import SpeculationPolicy
+from src.core.workflow.state import WorkflowState, TransitionError
+from src.shared.models import AgentRole, TaskPriority, TaskState
 
 if TYPE_CHECKING:
     from src.core.bus.bus import MessageEnvelope, MessageBus
@@ -17,11 +24,30 @@ logger = logging.getLogger(__name__)
 class DirectorAgent(BaseAgent):
     """
     The Director Agent orchestrates the high-level workflow of the OCS.
-    It listens for system events and decides when to advance phases.
+    It listens for system events and decides when to advance phases; what it does on
+    entering a state, or when a goal's tasks finish, comes from the reactions of the
+    goal's workflow definition. Nothing waits on a timer: each phase advances as soon
+    as the signal arrives and the transition's guards pass.
+
+    With a ShardCoordinator, goal events are handled only by the shard owning the
+    goal, one at a time per goal, instead of all concurrently on every Director.
+
+    Latency-critical tasks may be dispatched as several copies (see SpeculationPolicy);
+    the first successful copy's result is accepted and the other copies are cancelled.
     """
-    def __init__(self, bus: "MessageBus", engine: "WorkflowEngine") -> None:
+    def __init__(
+        self,
+        bus: "MessageBus",
+        engine: "WorkflowEngine",
+        workflows: Optional[WorkflowRegistry] = None,
+        shards: Optional[ShardCoordinator] = None,
+        speculation: Optional[SpeculationPolicy] = None
+    ) -> None:
         super().__init__(agent_id=AgentRole.DIRECTOR.value, bus=bus)
         self.engine: "WorkflowEngine" = engine
+        self.workflows: WorkflowRegistry = workflows or default_registry()
+        self.shards: Optional[ShardCoordinator] = shards
+        self.speculation: SpeculationPolicy = speculation or SpeculationPolicy()
 
     async def process_task(self, task: "AgentTask") -> Any:
         # Director might process explicit tasks too
@@ -30,8 +56,8 @@ class DirectorAgent(BaseAgent):
 
     async def on_goal_started(self, envelope: "MessageEnvelope") -> None:
         """
-        Reacts to a new goal being created.
-        Currently, it automatically approves the transition to Task Decomposition (Phase 2).
+        Reacts to a new goal being created by running the reactions of its workflow's
+        initial state (for the standard workflow: approve Task Decomposition).
         """
         data = envelope.payload
         goal_id = data.get("goal_id")
@@ -44,20 +70,17 @@ class DirectorAgent(BaseAgent):
         logger.info("Director observed new goal: %s (%s). Initiating assessment.", title, goal_id)
         await self.log("INFO", f"Observed new goal: '{title}'. Assessing feasibility...")
         
-        # Simulate thinking/processing time (e.g., calling LLM for feasibility)
-        await asyncio.sleep(2) 
-        
-        # Attempt to transition to Phase 2
         try:
-            logger.info("Director approving transition to Task Decomposition for %s", goal_id)
-            await self.log("INFO", f"Goal '{title}' approved. Transitioning to Task Decomposition.")
-            await self.engine.transition_phase(UUID(goal_id), WorkflowState.TASK_DECOMPOSITION)
-        except Exception as e:
-            logger.error("Director failed to transition goal %s: %s", goal_id, e)
+            definition = self.workflows.get(data.get("workflow"))
+        except ValueError as e:
+            logger.error("Director cannot run goal %s: %s", goal_id, e)
+            return
+        await self._run_reactions(UUID(goal_id), definition.reactions(definition.initial), title)
 
     async def on_state_change(self, envelope: "MessageEnvelope") -> None:
         """
-        Reacts to state transitions.
+        Reacts to state transitions by running the reactions the goal's workflow
+        declares for the new state.
         """
         data = envelope.payload
         new_state = data.get("new_state")
@@ -65,32 +88,86 @@ class DirectorAgent(BaseAgent):
         
         logger.info("Director observed state change for %s -> %s", goal_id, new_state)
         
-        if new_state == WorkflowState.TASK_DECOMPOSITION.value:
-            logger.info("Director is now searching for Lyra to delegate Prompt Engineering...")
-            await self.log("INFO", "Phase Task Decomposition active. Delegating to Lyra...")
-            
-            # Fetch Goal details to pass to Lyra
-            from src.core.db.models import Goal
-            
-            try:
-                # Use engine's session factory
-                async with self.engine.session_factory() as session:
-                    goal = await session.get(Goal, UUID(goal_id))
-                    if goal:
-                        # Delegate to Lyra
-                        await self.bus.publish("agent.lyra.decompose", {
-                            "goal_id": goal_id,
-                            "title": goal.title,
-                            "description": goal.description
-                        })
-                        logger.info("Delegated goal %s to Lyra.", goal.title)
-            except Exception as e:
-                logger.error("Director failed to delegate to Lyra: %s", e)
+        try:
+            definition = self.workflows.get(data.get("workflow"))
+            state = WorkflowState(new_state)
+        except ValueError as e:
+            logger.error("Director cannot react to state change of %s: %s", goal_id, e)
+            return
+        await self._run_reactions(UUID(goal_id), definition.reactions(state, ON_ENTER))
+
+    async def on_tasks_finished(self, goal_id: UUID) -> None:
+        """Runs the tasks_finished reactions of the state the goal is in now."""
+        from src.core.db.models import Goal
+
+        async with self.engine.session_factory() as session:
+            goal = await entity_cache.get(session, Goal, goal_id)
+        if goal is None:
+            return
+        try:
+            definition = self.workflows.get(goal.workflow)
+        except ValueError as e:
+            logger.error("Director cannot advance goal %s: %s", goal_id, e)
+            return
+        reactions = definition.reactions(WorkflowState(goal.status), ON_TASKS_FINISHED)
+        if reactions:
+            logger.info("All tasks of goal %s finished in %s.", goal_id, goal.status)
+            await self._run_reactions(goal_id, reactions, goal.title)
+
+    async def _run_reactions(
+        self, goal_id: UUID, reactions: Tuple[WorkflowReaction, ...], title: Optional[str] = None
+    ) -> None:
+        advanced = False
+        for reaction in reactions:
+            if reaction.action == "advance":
+                # Alternatives: the first transition whose guards pass wins
+                if not advanced and reaction.target is not None:
+                    advanced = await self._advance(goal_id, reaction.target, title)
+            else:
+                await self._delegate(goal_id, reaction)
+
+    async def _advance(self, goal_id: UUID, target: WorkflowState, title: Optional[str] = None) -> bool:
+        try:
+            logger.info("Director approving transition to %s for %s", target.value, goal_id)
+            await self.engine.transition_phase(goal_id, target)
+        except TransitionError as e:
+            # A guard is not satisfied yet (or a concurrent signal advanced the goal first)
+            logger.info("Goal %s stays put, not ready for %s: %s", goal_id, target.value, e)
+            return False
+        except Exception as e:
+            logger.error("Director failed to transition goal %s: %s", goal_id, e)
+            return False
+        await self.log("INFO", f"Goal '{title or goal_id}' approved. Transitioned to {target.value}.")
+        return True
+
+    async def _delegate(self, goal_id: UUID, reaction: WorkflowReaction) -> None:
+        agent = reaction.agent or reaction.topic
+        logger.info("Director is now searching for %s to delegate goal %s...", agent, goal_id)
+        await self.log("INFO", f"Delegating goal {goal_id} to {agent}...")
+        
+        # Fetch Goal details to pass to the delegate
+        from src.core.db.models import Goal
+        
+        try:
+            # Use engine's session factory; hot goals are served from the entity cache
+            async with self.engine.session_factory() as session:
+                goal = await entity_cache.get(session, Goal, goal_id)
+                if goal and reaction.topic:
+                    await self.bus.publish(reaction.topic, {
+                        "goal_id": str(goal_id),
+                        "title": goal.title,
+                        "description": goal.description
+                    })
+                    logger.info("Delegated goal %s to %s.", goal.title, agent)
+        except Exception as e:
+            logger.error("Director failed to delegate to %s: %s", agent, e)
 
     async def on_tasks_generated(self, envelope: "MessageEnvelope") -> None:
         """
         Reacts when Lyra (or others) generate tasks.
-        Assigns these tasks to GPTASe for execution.
+        Assigns these tasks to GPTASe for execution; tasks too complex to execute
+        directly go back to Lyra to be expanded into subtasks, so a goal's task tree
+        only grows as far as the scheduler actually reaches.
         """
         data = envelope.payload
         goal_id = data.get("goal_id")
@@ -99,36 +176,53 @@ class DirectorAgent(BaseAgent):
         logger.info("Director observed %s new tasks for goal %s. Assigning to GPTASe.", count, goal_id)
         await self.log("INFO", f"Found {count} pending tasks. Assigning to Agents...")
         
-        from src.core.db.models import Task
-        from sqlalchemy import select
+        from src.core.db.claims import claim_pending_tasks
         
         try:
             async with self.engine.session_factory() as session:
-                # 1. Fetch unassigned tasks
-                result = await session.execute(
-                    select(Task).where(Task.goal_id == UUID(goal_id), Task.status == TaskState.PENDING.value)
-                )
-                tasks = result.scalars().all()
+                # 1. Claim unassigned tasks for GPTASe (Logic would be more complex in real system).
+                #    FOR UPDATE SKIP LOCKED: concurrent Directors never double-assign a task.
+                tasks = await claim_pending_tasks(session, AgentRole.GPTASE.value, goal_id=UUID(goal_id))
+                expand = [task for task in tasks if needs_expansion(task)]
+                for task in expand:
+                    task.assigned_to = AgentRole.LYRA.value
+                await session.commit()
+            for task in tasks:
+                entity_cache.put(task)
                 
-                for task in tasks:
-                    # 2. Assign to GPTASe (Logic would be more complex in real system)
-                    task.assigned_to = AgentRole.GPTASE.value
-                    task.status = TaskState.ACTIVE.value
-                    session.add(task)
-                    
-                    # 3. Publish Assignment
-                    agent_task_payload = {
-                        "id": str(task.id),
-                        "type": task.type,
-                        "title": task.title,
-                        "payload": task.payload,
-                        "assigned_to": AgentRole.GPTASE.value
-                    }
-                    
+            for task in tasks:
+                # 2. Publish Assignment (after commit, so a fast result never races the claim)
+                if task.assigned_to == AgentRole.LYRA.value:
+                    await self.bus.publish("agent.lyra.expand", {
+                        "goal_id": str(task.goal_id),
+                        "task_id": str(task.id)
+                    })
+                    await self.log("INFO", f"Sent task '{task.title}' to {AgentRole.LYRA.value} for expansion.")
+                    continue
+                priority = (task.payload or {}).get("priority") or TaskPriority.MEDIUM.value
+                agent_task_payload = {
+                    "id": str(task.id),
+                    "type": task.type,
+                    "title": task.title,
+                    "payload": task.payload,
+                    "assigned_to": AgentRole.GPTASE.value,
+                    "goal_id": str(task.goal_id),
+                    "priority": priority
+                }
+                
+                copies = self.speculation.replicas_for(task.type, priority)
+                if copies == 1:
                     await self.bus.publish(f"agents.{AgentRole.GPTASE.value}.task", agent_task_payload)
                     await self.log("INFO", f"Assigned task '{task.title}' to {AgentRole.GPTASE.value}.")
-                
-                await session.commit()
+                    continue
+                self.speculation.begin(str(task.id), copies)
+                for replica in range(copies):
+                    copy = {**agent_task_payload, "replica": replica}
+                    model = self.speculation.model_for(replica)
+                    if model:
+                        copy["model"] = model
+                    await self.bus.publish(f"agents.{AgentRole.GPTASE.value}.task", copy)
+                await self.log("INFO", f"Assigned task '{task.title}' to {AgentRole.GPTASE.value} as {copies} speculative copies.")
                 
         except Exception as e:
             logger.error("Director failed to assign tasks: %s", e, exc_info=True)
@@ -136,12 +230,20 @@ class DirectorAgent(BaseAgent):
     async def on_task_result(self, envelope: "MessageEnvelope") -> None:
         """
         Reacts to task results.
-        Updates DB status.
+        Updates DB status and the goal's progress counters, and settles parent
+        tasks once all of their subtasks have finished. Results for tasks that are
+        no longer Active under the reporting agent (finished, or re-queued after
+        their lease expired) are ignored. For speculative copies, the first success
+        decides the task and the remaining copies are cancelled; a failure counts
+        only once every copy has failed. Each decision is published once as
+        workflow.task_settled.
         """
         data = envelope.payload
         task_id = data.get("task_id")
         status = data.get("status")
         result_payload = data.get("result")
+        replica = data.get("replica")
+        agent_id = data.get("agent_id")
         
         logger.info("Director processing result for task %s: %s", task_id, status)
         
@@ -149,22 +251,57 @@ class DirectorAgent(BaseAgent):
         
         try:
             async with self.engine.session_factory() as session:
-                task = await session.get(Task, UUID(task_id))
+                task = await entity_cache.get_for_update(session, Task, UUID(task_id))
                 if task:
+                    previous, started_at = task.status, task.updated_at
+                    if previous != TaskState.ACTIVE.value or (agent_id and task.assigned_to != agent_id):
+                        logger.info(
+                            "Ignoring result of task %s (copy %s) from %s: task is %s, assigned to %s.",
+                            task_id, replica, agent_id, previous, task.assigned_to
+                        )
+                        return
+                    if replica is not None:
+                        if not self.speculation.settle(task_id, status, replica):
+                            logger.info("Copy %s of task %s failed; waiting for the other copies or the task's lease.", replica, task_id)
+                            return
+                    if status == TaskState.COMPLETED.value and previous == TaskState.ACTIVE.value and started_at:
+                        elapsed = (datetime.now(timezone.utc) - as_utc(started_at)).total_seconds()
+                        self.speculation.latency.record(task.type, max(0.0, elapsed))
                     task.status = status
                     task.result = {"output": result_payload}
                     session.add(task)
+                    await record_transition(session, task.goal_id, previous, status, started_at=started_at)
+                    parents = await roll_up(session, task) if status in FINISHED_STATES else []
+                    finished = (
+                        status in FINISHED_STATES and status != previous
+                        and await outstanding_tasks(session, task.goal_id) == 0
+                    )
                     await session.commit()
+                    entity_cache.put(task)
+                    for parent in parents:
+                        entity_cache.put(parent)
                     
                     logger.info("Task %s marked as %s in DB.", task.title, status)
+                    for parent in parents:
+                        logger.info("Parent task %s settled as %s.", parent.title, parent.status)
+                    await self.bus.publish("workflow.task_settled", {
+                        "goal_id": str(task.goal_id), "task_id": task_id, "status": status
+                    })
+                    if replica is not None and status == TaskState.COMPLETED.value:
+                        agent = agent_id or AgentRole.GPTASE.value
+                        await self.bus.publish(f"agents.{agent}.cancel", {"task_id": task_id, "keep": replica})
                     await self.log("INFO", f"Updated Task '{task.title}' status to {status}.")
+                    if finished:
+                        await self.on_tasks_finished(task.goal_id)
         except Exception as e:
             logger.error("Director failed to process task result: %s", e, exc_info=True)
 
     async def start(self) -> None:
         await super().start()
-        # Subscribe to workflow events
-        await self.bus.subscribe("workflow.goal_started", self.on_goal_started)
-        await self.bus.subscribe("workflow.state_change", self.on_state_change)
-        await self.bus.subscribe("workflow.tasks_generated", self.on_tasks_generated)
-        await self.bus.subscribe("workflow.task_result", self.on_task_result)
+        # Subscribe to workflow events (through this process's shards when sharded)
+        route = self.shards.route if self.shards else (lambda handler: handler)
+        await self.bus.subscribe("workflow.goal_started", route(self.on_goal_started))
+        await self.bus.subscribe("workflow.state_change", route(self.on_state_change))
+        await self.bus.subscribe("workflow.tasks_generated", route(self.on_tasks_generated))
+        await self.bus.subscribe("workflow.tasks_requeued", route(self.on_tasks_generated))
+        await self.bus.subscribe("workflow.task_result", route(self.on_task_result))
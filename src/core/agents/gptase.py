@@ -52,9 +52,12 @@ class GPTASeAgent(BaseAgent):
                 
                 await self.log("INFO", "Consulting Gemini...")
 
+                # Speculative copies may each name their own model configuration
+                options = {"model": task.model} if task.model else {}
                 response = await self.llm.generate(
                     f"{system_prompt}\n{user_prompt}", 
-                    schema=TaskResultSchema
+                    schema=TaskResultSchema,
+                    **options
                 )
                 
                 if response:
@@ -63,8 +66,10 @@ class GPTASeAgent(BaseAgent):
                          summary = response.summary
                          output_content = response.output
                     elif isinstance(response, dict):
-                         summary = str(response.get('summary', ''))
-                         output_content = str(response.get('output', ''))
+                         # An invalid result fails this copy instead of winning the race
+                         parsed = TaskResultSchema.model_validate(response)
+                         summary = parsed.summary
+                         output_content = parsed.output
                     else:
                          output_content = str(response)
                          summary = "Generated content."
@@ -1,11 +1,16 @@
 import logging
-from typing import Any, List, Optional, TYPE_CHECKING
+from typing import Any, List, Optional, Set, TYPE_CHECKING
 from uuid import UUID
 
 from src.core.agents.base import BaseAgent
 from src.core.db.session import AsyncSessionLocal
 from src.core.db.models import Task, Goal
-from src.shared.models import AgentRole, TaskState
+from src.core.db.claims import notify_tasks_pending
+from src.core.db.cache import entity_cache
+from src.core.db.progress import record_progress, record_transition, task_counts
+from src.core.db.tree import new_task
+from src.shared.config import settings
+from src.shared.models import AgentRole, TaskPriority, TaskState
 
 if TYPE_CHECKING:
     from src.core.bus.bus import MessageBus, MessageEnvelope
@@ -13,6 +18,7 @@ if TYPE_CHECKING:
     from src.shared.models import AgentTask
 
 from pydantic import BaseModel
+from sqlalchemy import func, select
 
 logger = logging.getLogger(__name__)
 
@@ -20,6 +26,7 @@ class TaskModel(BaseModel):
     title: str
     type: str  # RESEARCH, DESIGN, CODING
     description: str
+    complexity: int = 1 # 1 (trivial) to 10; see settings.TASK_EXPANSION_COMPLEXITY
 
 class TaskDecompositionSchema(BaseModel):
     tasks: List[TaskModel]
@@ -27,22 +34,29 @@ class TaskDecompositionSchema(BaseModel):
 class LyraAgent(BaseAgent):
     """
     Lyra: The Prompt Engineer & Task Decomposer.
-    Responsible for breaking down High-Level Goals into executable Tasks.
+    Responsible for breaking down High-Level Goals into executable Tasks, and for
+    expanding tasks that turn out too complex into subtasks when they are scheduled.
     """
     def __init__(
         self, 
         bus: "MessageBus", 
         llm: Optional["LLMService"] = None, 
-        session_factory: Any = AsyncSessionLocal
+        session_factory: Any = AsyncSessionLocal,
+        max_breadth: int = settings.TASK_MAX_BREADTH,
+        max_tasks: int = settings.TASK_MAX_PER_GOAL
     ) -> None:
         super().__init__(agent_id=AgentRole.LYRA.value, bus=bus)
         self.session_factory = session_factory
         self.llm = llm
+        self.max_breadth = max_breadth
+        self.max_tasks = max_tasks
+        self._decomposing: Set[str] = set() # Goals with a decomposition in progress
 
     async def start(self) -> None:
         await super().start()
         # Listen for specific delegation commands
         await self.bus.subscribe("agent.lyra.decompose", self.on_decompose_request)
+        await self.bus.subscribe("agent.lyra.expand", self.on_expand_request)
 
     async def process_task(self, task: "AgentTask") -> Any:
         return {"status": "ok"}
@@ -51,6 +65,8 @@ class LyraAgent(BaseAgent):
         """
         Handles request to decompose a goal.
         Payload: { "goal_id": str, "title": str, "description": str }
+        A goal is decomposed once: requests for a goal that already has tasks, or
+        is being decomposed right now, are ignored.
         """
         payload = envelope.payload
         goal_id_str = payload.get("goal_id")
@@ -61,6 +77,24 @@ class LyraAgent(BaseAgent):
             logger.warning("Incomplete decomposition request received: %s", payload)
             return
 
+        if goal_id_str in self._decomposing:
+            logger.info("Ignoring duplicate decomposition request for goal %s.", goal_id_str)
+            return
+        self._decomposing.add(goal_id_str)
+        try:
+            async with self.session_factory() as session:
+                decomposed = await self._has_tasks(session, UUID(goal_id_str))
+            if decomposed:
+                logger.info("Ignoring decomposition request for goal %s: it already has tasks.", goal_id_str)
+                return
+            await self._decompose(goal_id_str, title, description)
+        finally:
+            self._decomposing.discard(goal_id_str)
+
+    async def _has_tasks(self, session: Any, goal_id: UUID) -> bool:
+        return await session.scalar(select(Task.id).where(Task.goal_id == goal_id).limit(1)) is not None
+
+    async def _decompose(self, goal_id_str: str, title: str, description: str) -> None:
         logger.info("Lyra received decomposition request for goal: %s (%s)", title, goal_id_str)
         await self.log("INFO", f"Starting task decomposition for '{title}'...")
 
@@ -70,8 +104,9 @@ class LyraAgent(BaseAgent):
             try:
                 system_instruction = (
                     "You are Lyra, a task decomposition expert. "
-                    "Break down the following goal into 3-5 distinct, executable technical tasks. "
+                    f"Break down the following goal into 3-{self.max_breadth} distinct, executable technical tasks. "
                     "Types: RESEARCH, DESIGN, CODING, REVIEW. "
+                    "Rate each task's complexity from 1 (trivial) to 10 (needs its own breakdown). "
                     "Return JSON matching the schema."
                 )
                 prompt = f"Goal: {title}\nContext: {description}\n{system_instruction}"
@@ -79,11 +114,7 @@ class LyraAgent(BaseAgent):
                 await self.log("INFO", "Consulting Gemini...")
 
                 # Call LLM
-                response = await self.llm.generate(prompt, schema=TaskDecompositionSchema)
-                if response and hasattr(response, 'tasks'):
-                    generated_tasks_data = response.tasks
-                elif isinstance(response, dict) and 'tasks' in response:
-                    generated_tasks_data = [TaskModel(**t) for t in response['tasks']]
+                generated_tasks_data = await self._generate(prompt)
                 
                 await self.log("SUCCESS", "Gemini generated tasks.")
 
@@ -108,24 +139,33 @@ class LyraAgent(BaseAgent):
         try:
             async with self.session_factory() as session:
                 # verify goal exists
-                goal = await session.get(Goal, UUID(goal_id_str))
+                goal = await entity_cache.get(session, Goal, UUID(goal_id_str))
                 if not goal:
                     logger.error("Goal %s not found during decomposition.", goal_id_str)
                     return
+                if await self._has_tasks(session, goal.id):
+                    logger.info("Goal %s was decomposed meanwhile; dropping the new tasks.", goal_id_str)
+                    return
 
                 created_tasks = []
-                for t_model in generated_tasks_data:
-                    new_task = Task(
-                        goal_id=goal.id,
+                for t_model in generated_tasks_data[:self.max_breadth]:
+                    task = new_task(
+                        goal.id,
                         title=t_model.title,
                         type=t_model.type,
-                        payload={"description": t_model.description},
+                        payload={
+                            "description": t_model.description,
+                            "complexity": t_model.complexity,
+                            "priority": goal.priority or TaskPriority.MEDIUM.value
+                        },
                         status=TaskState.PENDING.value,
                         assigned_to=None # Pending assignment
                     )
-                    session.add(new_task)
-                    created_tasks.append(new_task)
+                    session.add(task)
+                    created_tasks.append(task)
                 
+                await record_progress(session, goal.id, {TaskState.PENDING.value: len(created_tasks)})
+                await notify_tasks_pending(session, goal.id)
                 await session.commit()
                 
                 logger.info("Lyra created %s tasks for goal %s", len(created_tasks), goal_id_str)
@@ -140,3 +180,107 @@ class LyraAgent(BaseAgent):
         except Exception as e:
             logger.error("Lyra failed to save tasks: %s", e, exc_info=True)
             await self.log("ERROR", f"Failed to save tasks: {str(e)}")
+
+    async def on_expand_request(self, envelope: "MessageEnvelope") -> None:
+        """
+        Expands a task the Director claimed into subtasks.
+        Payload: { "goal_id": str, "task_id": str }
+        The task stays Active until its subtasks finish. If the goal's task budget is
+        spent or no usable breakdown comes back, the task is re-queued as a leaf and
+        executed as it is.
+        """
+        task_id_str = envelope.payload.get("task_id")
+        if not task_id_str:
+            logger.warning("Incomplete expansion request received: %s", envelope.payload)
+            return
+
+        async with self.session_factory() as session:
+            task = await entity_cache.get(session, Task, UUID(task_id_str))
+            if task is None or task.status != TaskState.ACTIVE.value or task.assigned_to != self.agent_id:
+                logger.info("Ignoring expansion request for task %s: no longer assigned to Lyra.", task_id_str)
+                return
+            total = sum((await task_counts(session, task.goal_id)).values())
+
+        breadth = min(self.max_breadth, self.max_tasks - total)
+        subtasks: List[TaskModel] = []
+        if self.llm and breadth >= 2:
+            await self.log("INFO", f"Expanding task '{task.title}'...")
+            description = (task.payload or {}).get("description", "")
+            prompt = (
+                f"Task: {task.title}\nContext: {description}\n"
+                "You are Lyra, a task decomposition expert. "
+                f"This task is too large to execute in one step. Break it down into 2-{breadth} "
+                "smaller, executable subtasks. Types: RESEARCH, DESIGN, CODING, REVIEW. "
+                "Rate each subtask's complexity from 1 (trivial) to 10 (needs its own breakdown). "
+                "Return JSON matching the schema."
+            )
+            try:
+                subtasks = (await self._generate(prompt))[:breadth]
+            except Exception as e:
+                logger.error("Lyra LLM expansion failed for task %s: %s", task_id_str, e)
+
+        try:
+            async with self.session_factory() as session:
+                parent = await entity_cache.get_for_update(session, Task, task.id)
+                if parent is None or parent.status != TaskState.ACTIVE.value or parent.assigned_to != self.agent_id:
+                    return
+                if await session.scalar(select(func.count()).where(Task.parent_id == parent.id)):
+                    return  # Already expanded by an earlier copy of this request
+
+                if len(subtasks) < 2:
+                    parent.status = TaskState.PENDING.value
+                    parent.assigned_to = None
+                    parent.payload = {**(parent.payload or {}), "leaf": True}
+                    await record_transition(session, parent.goal_id, TaskState.ACTIVE.value, TaskState.PENDING.value)
+                    await notify_tasks_pending(session, parent.goal_id)
+                    await session.commit()
+                    entity_cache.put(parent)
+
+                    logger.info("Task %s not expanded (budget %s); re-queued for execution.", task_id_str, breadth)
+                    await self.bus.publish("workflow.tasks_requeued", {
+                        "goal_id": str(parent.goal_id),
+                        "task_count": 1,
+                        "reason": "not expanded"
+                    })
+                    return
+
+                for t_model in subtasks:
+                    session.add(new_task(
+                        parent.goal_id,
+                        parent,
+                        title=t_model.title,
+                        type=t_model.type,
+                        payload={
+                            "description": t_model.description,
+                            "complexity": t_model.complexity,
+                            "priority": (parent.payload or {}).get("priority") or TaskPriority.MEDIUM.value,
+                            "parent": parent.title
+                        },
+                        status=TaskState.PENDING.value,
+                        assigned_to=None
+                    ))
+                await record_progress(session, parent.goal_id, {TaskState.PENDING.value: len(subtasks)})
+                await notify_tasks_pending(session, parent.goal_id)
+                await session.commit()
+
+                logger.info("Lyra expanded task %s into %s subtasks", task_id_str, len(subtasks))
+                await self.log("SUCCESS", f"Expanded task '{parent.title}' into {len(subtasks)} subtasks.")
+                await self.bus.publish("workflow.tasks_generated", {
+                    "goal_id": str(parent.goal_id),
+                    "task_count": len(subtasks),
+                    "parent_id": task_id_str
+                })
+
+        except Exception as e:
+            logger.error("Lyra failed to expand task %s: %s", task_id_str, e, exc_info=True)
+            await self.log("ERROR", f"Failed to expand task: {str(e)}")
+
+    async def _generate(self, prompt: str) -> List[TaskModel]:
+        if not self.llm:
+            return []
+        response = await self.llm.generate(prompt, schema=TaskDecompositionSchema)
+        if response and hasattr(response, 'tasks'):
+            return list(response.tasks)
+        if isinstance(response, dict) and 'tasks' in response:
+            return [TaskModel(**t) for t in response['tasks']]
+        return []
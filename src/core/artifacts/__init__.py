@@ -0,0 +1,4 @@
+from src.core.artifacts.store import BlobStore, BlobView
+from src.core.artifacts.service import ArtifactService
+
+__all__ = ["BlobStore", "BlobView", "ArtifactService"]
@@ -0,0 +1,62 @@
+import difflib
+import json
+import zlib
+from typing import Any, List
+
+try:
+    import zstandard
+except ImportError:  # Optional dependency (pip install ocs[compression])
+    zstandard = None  # type: ignore[assignment]
+
+# One-byte codec tags prefixed to every compressed payload.
+CODEC_ZLIB = b"z"
+CODEC_ZSTD = b"s"
+
+
+def compress(data: bytes) -> bytes:
+    """Compresses with zstd when available, zlib otherwise."""
+    if zstandard is not None:
+        return CODEC_ZSTD + zstandard.ZstdCompressor(level=10).compress(data)
+    return CODEC_ZLIB + zlib.compress(data, 9)
+
+
+def decompress(blob: bytes) -> bytes:
+    codec, body = blob[:1], blob[1:]
+    if codec == CODEC_ZLIB:
+        return zlib.decompress(body)
+    if codec == CODEC_ZSTD:
+        if zstandard is None:
+            raise RuntimeError("Blob is zstd-compressed but the 'zstandard' package is not installed")
+        return zstandard.ZstdDecompressor().decompress(body)
+    raise ValueError(f"Unknown compression codec: {codec!r}")
+
+
+def encode_delta(base: str, target: str) -> bytes:
+    """
+    Encodes target as line-level edits against base.
+    Ops are ["c", start, end] (copy base lines) or ["i", text] (insert literal text).
+    """
+    base_lines = base.splitlines(keepends=True)
+    target_lines = target.splitlines(keepends=True)
+    matcher = difflib.SequenceMatcher(None, base_lines, target_lines, autojunk=False)
+
+    ops: List[List[Any]] = []
+    for tag, i1, i2, j1, j2 in matcher.get_opcodes():
+        if tag == "equal":
+            ops.append(["c", i1, i2])
+        elif j2 > j1:
+            ops.append(["i", "".join(target_lines[j1:j2])])
+
+    return compress(json.dumps(ops, separators=(",", ":")).encode("utf-8"))
+
+
+def apply_delta(base: str, delta: bytes) -> str:
+    """Rebuilds the target text from its base and an encoded delta."""
+    base_lines = base.splitlines(keepends=True)
+    parts: List[str] = []
+    for op in json.loads(decompress(delta)):
+        if op[0] == "c":
+            parts.extend(base_lines[op[1]:op[2]])
+        else:
+            parts.append(op[1])
+    return "".join(parts)
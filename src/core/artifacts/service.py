@@ -0,0 +1,195 @@
+import asyncio
+import logging
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional, Tuple
+from uuid import UUID
+
+from sqlalchemy import select
+from sqlalchemy.orm import selectinload
+
+from src.core.artifacts.delta import encode_delta, apply_delta
+from src.core.artifacts.store import BlobStore, BlobView
+from src.core.db.session import AsyncSessionLocal
+from src.core.db.models import Artifact, ArtifactVersion
+from src.shared.config import settings
+
+logger = logging.getLogger(__name__)
+
+ENCODING_RAW = "raw"
+ENCODING_DELTA = "delta"
+
+
+class VersionCache:
+    """LRU cache of reconstructed version contents keyed by (artifact_id, version_number)."""
+
+    def __init__(self, max_entries: int) -> None:
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[Tuple[UUID, int], str]" = OrderedDict()
+
+    def get(self, artifact_id: UUID, version_number: int) -> Optional[str]:
+        key = (artifact_id, version_number)
+        content = self._entries.get(key)
+        if content is not None:
+            self._entries.move_to_end(key)
+        return content
+
+    def put(self, artifact_id: UUID, version_number: int, content: str) -> None:
+        key = (artifact_id, version_number)
+        self._entries[key] = content
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+
+class ArtifactService:
+    """
+    Stores artifact versions in the blob store and keeps only metadata in the DB.
+    Versions form delta chains: every K-th version is a raw keyframe, the ones
+    in between are compressed line diffs against their predecessor.
+    """
+
+    def __init__(
+        self,
+        session_factory: Any = AsyncSessionLocal,
+        blobs: Optional[BlobStore] = None,
+        keyframe_interval: int = settings.ARTIFACT_KEYFRAME_INTERVAL,
+        cache_size: int = settings.ARTIFACT_VERSION_CACHE_SIZE
+    ) -> None:
+        self.session_factory = session_factory
+        self.blobs: BlobStore = blobs or BlobStore()
+        self.keyframe_interval: int = max(1, keyframe_interval)
+        self.cache: VersionCache = VersionCache(cache_size)
+
+    async def add_version(self, artifact_id: UUID, content: str, agent_id: str) -> ArtifactVersion:
+        """Writes content to the blob store and records a new version pointing at it."""
+        data = content.encode("utf-8")
+
+        async with self.session_factory() as session:
+            artifact = await session.get(Artifact, artifact_id)
+            if not artifact:
+                raise ValueError(f"Artifact {artifact_id} not found")
+
+            previous = (await session.execute(
+                select(ArtifactVersion)
+                .where(ArtifactVersion.artifact_id == artifact_id)
+                .order_by(ArtifactVersion.version_number.desc())
+                .limit(1)
+            )).scalars().first()
+            version_number = previous.version_number + 1 if previous else 1
+
+            encoding, base_number, blob = ENCODING_RAW, None, data
+            if previous and (version_number - 1) % self.keyframe_interval != 0:
+                base_content = await self._reconstruct(session, artifact_id, previous.version_number)
+                delta = await asyncio.to_thread(encode_delta, base_content, content)
+                # A delta that does not beat the raw text is not worth the reconstruction cost.
+                if len(delta) < len(data):
+                    encoding, base_number, blob = ENCODING_DELTA, previous.version_number, delta
+
+            digest = await asyncio.to_thread(self.blobs.put, blob)
+            version = ArtifactVersion(
+                artifact_id=artifact_id,
+                version_number=version_number,
+                blob_digest=digest,
+                encoding=encoding,
+                base_version_number=base_number,
+                size_bytes=len(data),
+                created_by_agent=agent_id
+            )
+            session.add(version)
+            await session.flush()
+
+            artifact.current_version_id = version.id
+            await session.commit()
+
+            self.cache.put(artifact_id, version_number, content)
+            logger.info(
+                "Stored version %s of artifact %s as %s (%s bytes)",
+                version_number, artifact_id, encoding, len(blob)
+            )
+            return version
+
+    async def get_version(self, artifact_id: UUID, version_number: Optional[int] = None) -> ArtifactVersion:
+        """Returns a specific version, or the current one when no number is given."""
+        async with self.session_factory() as session:
+            query = (
+                select(ArtifactVersion)
+                .options(selectinload(ArtifactVersion.artifact))
+                .where(ArtifactVersion.artifact_id == artifact_id)
+            )
+            if version_number is None:
+                query = query.order_by(ArtifactVersion.version_number.desc()).limit(1)
+            else:
+                query = query.where(ArtifactVersion.version_number == version_number)
+
+            version: Optional[ArtifactVersion] = (await session.execute(query)).scalars().first()
+            if not version:
+                raise ValueError(f"Version {version_number or 'current'} of artifact {artifact_id} not found")
+            return version
+
+    async def open_content(self, version: ArtifactVersion) -> BlobView:
+        """
+        Opens the content of a version.
+        Raw keyframes are read straight from the blob store (memory-mapped when large);
+        delta versions and legacy inline rows are served from memory.
+        """
+        if version.encoding == ENCODING_RAW and version.blob_digest:
+            return await asyncio.to_thread(self.blobs.open, version.blob_digest)
+        return BlobView((await self.read_content(version)).encode("utf-8"))
+
+    async def read_content(self, version: ArtifactVersion) -> str:
+        if not version.blob_digest:
+            return version.content or ""
+        async with self.session_factory() as session:
+            return await self._reconstruct(session, version.artifact_id, version.version_number)
+
+    async def _reconstruct(self, session: Any, artifact_id: UUID, version_number: int) -> str:
+        """
+        Rebuilds a version by walking back to the nearest keyframe (or cached version)
+        and applying at most K-1 deltas forward.
+        """
+        cached = self.cache.get(artifact_id, version_number)
+        if cached is not None:
+            return cached
+
+        result = await session.execute(
+            select(ArtifactVersion)
+            .where(
+                ArtifactVersion.artifact_id == artifact_id,
+                ArtifactVersion.version_number <= version_number,
+                ArtifactVersion.version_number > version_number - self.keyframe_interval
+            )
+            .order_by(ArtifactVersion.version_number.desc())
+        )
+        window: Dict[int, ArtifactVersion] = {v.version_number: v for v in result.scalars().all()}
+        if version_number not in window:
+            raise ValueError(f"Version {version_number} of artifact {artifact_id} not found")
+
+        # Walk back along the chain until a keyframe or a cached ancestor.
+        chain: List[ArtifactVersion] = []
+        number: Optional[int] = version_number
+        content: Optional[str] = None
+        while number is not None:
+            content = self.cache.get(artifact_id, number)
+            if content is not None:
+                break
+            current = window.get(number)
+            if current is None:
+                raise ValueError(f"Broken delta chain for artifact {artifact_id} at version {number}")
+            if current.encoding != ENCODING_DELTA:
+                if current.blob_digest:
+                    raw = await asyncio.to_thread(self.blobs.read, current.blob_digest)
+                    content = raw.decode("utf-8")
+                else:
+                    content = current.content or ""
+                self.cache.put(artifact_id, number, content)
+                break
+            chain.append(current)
+            number = current.base_version_number
+
+        assert content is not None
+        for delta_version in reversed(chain):
+            delta = await asyncio.to_thread(self.blobs.read, str(delta_version.blob_digest))
+            content = apply_delta(content, delta)
+            self.cache.put(artifact_id, delta_version.version_number, content)
+
+        return content
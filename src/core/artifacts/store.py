@@ -0,0 +1,111 @@
+import hashlib
+import mmap
+import os
+import re
+import tempfile
+from pathlib import Path
+from typing import Final, Iterator, Optional
+
+from src.shared.config import settings
+
+_DIGEST_RE: Final = re.compile(r"^[0-9a-f]{64}$")
+
+
+class BlobView:
+    """
+    Read-only view over a stored blob.
+    Large blobs are memory-mapped so reads never copy the file into the heap.
+    """
+
+    def __init__(self, data: bytes | mmap.mmap) -> None:
+        self._data = data
+        self.buffer: memoryview = memoryview(data)
+
+    @property
+    def size(self) -> int:
+        return len(self.buffer)
+
+    @property
+    def is_mapped(self) -> bool:
+        return isinstance(self._data, mmap.mmap)
+
+    def iter_range(self, start: int, end: int, chunk_size: int = 64 * 1024) -> Iterator[bytes]:
+        """Yields the inclusive byte range [start, end] in chunks."""
+        offset = start
+        while offset <= end:
+            stop = min(offset + chunk_size, end + 1)
+            yield bytes(self.buffer[offset:stop])
+            offset = stop
+
+    def close(self) -> None:
+        self.buffer.release()
+        if isinstance(self._data, mmap.mmap):
+            self._data.close()
+
+    def __enter__(self) -> "BlobView":
+        return self
+
+    def __exit__(self, *exc: object) -> None:
+        self.close()
+
+
+class BlobStore:
+    """
+    Content-addressed blob store rooted at ``ARTIFACTS_DIR``.
+    Blobs are keyed by their SHA-256 digest and written once, so identical
+    content across versions and artifacts is stored a single time.
+    """
+
+    MMAP_THRESHOLD: Final[int] = 64 * 1024
+
+    def __init__(self, root: Optional[Path] = None, mmap_threshold: int = MMAP_THRESHOLD) -> None:
+        self.root: Path = (root or settings.ARTIFACTS_DIR) / "blobs"
+        self.mmap_threshold: int = mmap_threshold
+
+    @staticmethod
+    def digest(data: bytes) -> str:
+        return hashlib.sha256(data).hexdigest()
+
+    def path_for(self, digest: str) -> Path:
+        """Returns the on-disk location of a blob (two-level fan-out by digest prefix)."""
+        if not _DIGEST_RE.match(digest):
+            raise ValueError(f"Invalid blob digest: {digest!r}")
+        return self.root / digest[:2] / digest
+
+    def exists(self, digest: str) -> bool:
+        return self.path_for(digest).is_file()
+
+    def size(self, digest: str) -> int:
+        return self.path_for(digest).stat().st_size
+
+    def put(self, data: bytes) -> str:
+        """Stores data and returns its digest. Existing blobs are never rewritten."""
+        digest = self.digest(data)
+        path = self.path_for(digest)
+        if path.is_file():
+            return digest
+
+        path.parent.mkdir(parents=True, exist_ok=True)
+        # Write to a temp file in the same directory and rename, so readers never observe partial blobs.
+        fd, tmp_name = tempfile.mkstemp(dir=path.parent, prefix=".tmp-")
+        try:
+            with os.fdopen(fd, "wb") as tmp:
+                tmp.write(data)
+            os.replace(tmp_name, path)
+        except BaseException:
+            Path(tmp_name).unlink(missing_ok=True)
+            raise
+        return digest
+
+    def open(self, digest: str) -> BlobView:
+        """Opens a blob for reading. Blobs above the mmap threshold are mapped, not read."""
+        path = self.path_for(digest)
+        with open(path, "rb") as f:
+            size = os.fstat(f.fileno()).st_size
+            if size < self.mmap_threshold or size == 0:
+                return BlobView(f.read())
+            return BlobView(mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ))
+
+    def read(self, digest: str) -> bytes:
+        with self.open(digest) as view:
+            return bytes(view.buffer)
@@ -0,0 +1,3 @@
+from src.core.audit.writer import AuditWriter, partition_key
+
+__all__ = ["AuditWriter", "partition_key"]
@@ -0,0 +1,154 @@
+import asyncio
+import logging
+from collections import deque
+from datetime import datetime, timedelta, timezone
+from typing import Any, Deque, Dict, Final, Optional, Tuple, TYPE_CHECKING
+from uuid import UUID
+
+from pydantic_core import to_jsonable_python
+from sqlalchemy import delete, insert
+
+from src.core.db.session import AsyncSessionLocal
+from src.core.db.models import AuditLog
+from src.shared.config import settings
+
+if TYPE_CHECKING:
+    from src.core.bus.bus import MessageBus, MessageEnvelope
+
+logger = logging.getLogger(__name__)
+
+PARTITION_FORMAT: Final[str] = "%Y%m%d"
+
+def partition_key(timestamp: datetime) -> str:
+    """Daily partition key used to bucket audit rows for cheap retention deletes."""
+    return timestamp.strftime(PARTITION_FORMAT)
+
+def _parse_uuid(value: Any) -> Optional[UUID]:
+    try:
+        return UUID(str(value))
+    except (TypeError, ValueError):
+        return None
+
+class AuditWriter:
+    """
+    Asynchronous, batched AuditLog writer.
+    Bus events are converted to rows and appended to a bounded ring buffer; a background
+    task bulk-inserts them, so workflow handlers never wait on an audit INSERT.
+    When the buffer is full the oldest pending entries are dropped and counted.
+    """
+
+    TOPICS: Final[Tuple[str, ...]] = ("workflow.*", "agent.log")
+
+    def __init__(
+        self,
+        bus: "MessageBus",
+        session_factory: Any = AsyncSessionLocal,
+        buffer_size: int = settings.AUDIT_BUFFER_SIZE,
+        batch_size: int = settings.AUDIT_BATCH_SIZE,
+        flush_interval: float = settings.AUDIT_FLUSH_INTERVAL,
+        retention_days: int = settings.AUDIT_RETENTION_DAYS
+    ) -> None:
+        self.bus: "MessageBus" = bus
+        self.session_factory = session_factory
+        self.batch_size: int = batch_size
+        self.flush_interval: float = flush_interval
+        self.retention_days: int = retention_days
+
+        self._buffer: Deque[Dict[str, Any]] = deque(maxlen=buffer_size)
+        self._wakeup: asyncio.Event = asyncio.Event()
+        self._flush_task: Optional[asyncio.Task[None]] = None
+        self._last_purge: Optional[datetime] = None
+
+        self.written: int = 0
+        self.dropped: int = 0
+
+    async def start(self) -> None:
+        for topic in self.TOPICS:
+            await self.bus.subscribe(topic, self.record)
+        self._flush_task = asyncio.create_task(self._flush_loop())
+
+    async def stop(self) -> None:
+        """Stops the background loop and flushes whatever is still buffered."""
+        if self._flush_task:
+            self._flush_task.cancel()
+            try:
+                await self._flush_task
+            except asyncio.CancelledError:
+                pass
+            self._flush_task = None
+        await self.flush()
+
+    async def record(self, envelope: "MessageEnvelope") -> None:
+        """Bus callback: buffers one audit entry. Never touches the DB."""
+        if len(self._buffer) == self._buffer.maxlen:
+            self.dropped += 1
+        self._buffer.append(self._to_row(envelope))
+        if len(self._buffer) >= self.batch_size:
+            self._wakeup.set()
+
+    def _to_row(self, envelope: "MessageEnvelope") -> Dict[str, Any]:
+        payload = envelope.payload if isinstance(envelope.payload, dict) else {}
+        actor_id = payload.get("agent_id") or envelope.source_id
+
+        entity_type, entity_id = "system", None
+        if "task_id" in payload:
+            entity_type, entity_id = "task", _parse_uuid(payload["task_id"])
+        elif "goal_id" in payload:
+            entity_type, entity_id = "goal", _parse_uuid(payload["goal_id"])
+        elif envelope.topic == "agent.log":
+            entity_type = "agent"
+
+        return {
+            "timestamp": envelope.timestamp,
+            "partition_key": partition_key(envelope.timestamp),
+            "actor_id": str(actor_id)[:50],
+            "action_type": envelope.topic,
+            "entity_type": entity_type,
+            "entity_id": entity_id,
+            "metadata_json": to_jsonable_python(envelope.payload, fallback=str),
+        }
+
+    async def flush(self) -> int:
+        """Bulk-inserts all buffered entries in batches. Returns the number of rows written."""
+        total = 0
+        while self._buffer:
+            batch = [self._buffer.popleft() for _ in range(min(self.batch_size, len(self._buffer)))]
+            try:
+                async with self.session_factory() as session:
+                    await session.execute(insert(AuditLog), batch)
+                    await session.commit()
+            except Exception as e:
+                logger.error("Failed to write %s audit entries: %s", len(batch), e)
+                self.dropped += len(batch)
+                continue
+            total += len(batch)
+        self.written += total
+        return total
+
+    async def purge_expired(self, now: Optional[datetime] = None) -> int:
+        """Deletes whole daily partitions older than the retention window."""
+        now = now or datetime.now(timezone.utc)
+        cutoff = partition_key(now - timedelta(days=self.retention_days))
+        async with self.session_factory() as session:
+            result = await session.execute(delete(AuditLog).where(AuditLog.partition_key < cutoff))
+            await session.commit()
+        self._last_purge = now
+        return int(result.rowcount or 0)
+
+    async def _flush_loop(self) -> None:
+        while True:
+            try:
+                try:
+                    await asyncio.wait_for(self._wakeup.wait(), timeout=self.flush_interval)
+                except asyncio.TimeoutError:
+                    pass
+                self._wakeup.clear()
+                await self.flush()
+
+                now = datetime.now(timezone.utc)
+                if self._last_purge is None or now - self._last_purge > timedelta(hours=1):
+                    await self.purge_expired(now)
+            except asyncio.CancelledError:
+                break
+            except Exception as e:
+                logger.error("Error in audit flush loop: %s", e)
@@ -1,3 +1,4 @@
 from src.core.bus.bus import MessageBus, MessageEnvelope, InMemoryMessageBus
+from src.core.bus.executor import KeyedExecutor
 
-__all__ = ["MessageBus", "MessageEnvelope", "InMemoryMessageBus"]
+__all__ = ["MessageBus", "MessageEnvelope", "InMemoryMessageBus", "KeyedExecutor"]
@@ -1,10 +1,14 @@
 import asyncio
+import re
 from abc import ABC, abstractmethod
-from typing import Any, Callable, Dict, List, Awaitable
+from typing import Any, Callable, Dict, List, Awaitable, Optional, Pattern, Sequence, Tuple
 from uuid import uuid4, UUID
 from datetime import datetime, timezone
 from pydantic import BaseModel, Field, ConfigDict
 
+from src.core.bus.executor import KeyedExecutor
+from src.shared.config import settings
+
 class MessageEnvelope(BaseModel):
     """Standard envelope for all messages on the bus."""
     model_config = ConfigDict(arbitrary_types_allowed=True)
@@ -14,13 +18,14 @@ class MessageEnvelope(BaseModel):
     payload: Any
     timestamp: datetime = Field(default_factory=lambda: datetime.now(timezone.utc))
     source_id: str = "system"
+    key: Optional[str] = None # Partition key: envelopes sharing it are handled one after another
 
 class MessageBus(ABC):
     """Abstract Base Class for the Message Bus."""
     
     @abstractmethod
-    async def publish(self, topic: str, payload: Any, source_id: str = "system") -> None:
-        """Publish a message to a topic."""
+    async def publish(self, topic: str, payload: Any, source_id: str = "system", key: Optional[str] = None) -> None:
+        """Publish a message to a topic, optionally under a partition key."""
         pass
 
     @abstractmethod
@@ -38,27 +43,74 @@ class InMemoryMessageBus(MessageBus):
     Notes:
     - This is NOT durable. Messages are lost if process restarts.
     - Callbacks are executed concurrently in the background.
+    - Topics containing '*' are regular expressions matched against the full topic
+      (e.g. "workflow.*" or ".*").
+    - Envelopes with a partition key are delivered in order per key: all callbacks of
+      one envelope finish before the next envelope of that key is dispatched, while
+      different keys proceed in parallel. Topics under `ordered_prefixes` are keyed by
+      their payload's goal_id unless the publisher passes a key. The order is the one in
+      which this process publishes or receives the envelopes: events of one goal that
+      are published by different processes carry no order between them.
     """
-    def __init__(self) -> None:
+    def __init__(
+        self,
+        ordered_prefixes: Sequence[str] = tuple(settings.BUS_ORDERED_TOPIC_PREFIXES)
+    ) -> None:
         self._subscribers: Dict[str, List[Callable[[MessageEnvelope], Awaitable[None]]]] = {}
+        self._pattern_subscribers: List[Tuple[Pattern[str], Callable[[MessageEnvelope], Awaitable[None]]]] = []
+        self.ordered_prefixes: Tuple[str, ...] = tuple(ordered_prefixes)
+        self._ordered: KeyedExecutor = KeyedExecutor()
 
-    async def publish(self, topic: str, payload: Any, source_id: str = "system") -> None:
+    def partition_key(self, topic: str, payload: Any) -> Optional[str]:
+        """The goal an event belongs to, for topics delivered in order; None otherwise."""
+        if isinstance(payload, dict) and topic.startswith(self.ordered_prefixes):
+            goal_id = payload.get("goal_id")
+            return str(goal_id) if goal_id is not None else None
+        return None
+
+    async def publish(self, topic: str, payload: Any, source_id: str = "system", key: Optional[str] = None) -> None:
         """
-        Publishes a message. Dispatches to all subscribers of the exact topic.
-        Dispatch is non-blocking (fire-and-forget via asyncio.create_task).
+        Publishes a message. Dispatches to all subscribers of the exact topic
+        and to every pattern subscription matching it.
+        Dispatch is non-blocking (fire-and-forget via asyncio.create_task); keyed
+        envelopes are queued behind earlier envelopes of the same key.
         """
+        key = key if key is not None else self.partition_key(topic, payload)
         envelope = MessageEnvelope(
             topic=topic,
             payload=payload,
-            source_id=source_id
+            source_id=source_id,
+            key=key
         )
-        
-        # Exact match for now
-        if topic in self._subscribers:
-            callbacks = self._subscribers[topic]
-            for cb in callbacks:
-                # Fire and forget callback execution
-                asyncio.create_task(self._safe_dispatch(cb, envelope))
+        await self.deliver(envelope)
+
+    async def deliver(self, envelope: MessageEnvelope) -> None:
+        """Dispatches an existing envelope (e.g. one received from another process) as-is."""
+        topic = envelope.topic
+        callbacks = list(self._subscribers.get(topic, []))
+        callbacks.extend(cb for pattern, cb in self._pattern_subscribers if pattern.fullmatch(topic))
+        if not callbacks:
+            return
+        if envelope.key is not None:
+            self._ordered.submit(envelope.key, lambda: self._dispatch_all(callbacks, envelope))
+            return
+        for cb in callbacks:
+            # Fire and forget callback execution
+            asyncio.create_task(self._safe_dispatch(cb, envelope))
+
+    async def _dispatch_all(
+        self,
+        callbacks: List[Callable[[MessageEnvelope], Awaitable[None]]],
+        envelope: MessageEnvelope
+    ) -> None:
+        if len(callbacks) == 1:
+            await self._safe_dispatch(callbacks[0], envelope)
+        else:
+            await asyncio.gather(*(self._safe_dispatch(cb, envelope) for cb in callbacks))
+
+    def stats(self) -> Dict[str, Any]:
+        """Keyed delivery: lanes with queued envelopes and how many envelopes they handled."""
+        return self._ordered.stats()
 
     async def _safe_dispatch(
         self, 
@@ -79,7 +131,10 @@ class InMemoryMessageBus(MessageBus):
         topic: str, 
         callback: Callable[[MessageEnvelope], Awaitable[None]]
     ) -> None:
-        """Adds a subscriber for a specific topic."""
+        """Adds a subscriber for a specific topic or topic pattern."""
+        if "*" in topic:
+            self._pattern_subscribers.append((re.compile(topic), callback))
+            return
         if topic not in self._subscribers:
             self._subscribers[topic] = []
         self._subscribers[topic].append(callback)
@@ -0,0 +1,69 @@
+import asyncio
+import logging
+from collections import deque
+from typing import Any, Awaitable, Callable, Deque, Dict, Optional
+
+logger = logging.getLogger(__name__)
+
+Job = Callable[[], Awaitable[None]]
+
+class KeyedExecutor:
+    """
+    Runs jobs serially per key and concurrently across keys. Each key with queued
+    jobs has one task draining its FIFO lane, so jobs of one key never overlap and
+    run in submission order. `concurrency` optionally caps how many keys run at once.
+    Idle keys cost nothing: a lane is dropped as soon as it is empty.
+    """
+
+    def __init__(self, concurrency: Optional[int] = None) -> None:
+        self._slots: Optional[asyncio.Semaphore] = asyncio.Semaphore(concurrency) if concurrency else None
+        self._lanes: Dict[str, Deque[Job]] = {}
+        self._running: Dict[str, "asyncio.Task[None]"] = {}
+        self.processed: int = 0
+
+    def submit(self, key: str, job: Job) -> None:
+        lane = self._lanes.get(key)
+        if lane is None:
+            lane = self._lanes[key] = deque()
+        lane.append(job)
+        if key not in self._running:
+            self._running[key] = asyncio.create_task(self._drain(key, lane))
+
+    async def _drain(self, key: str, lane: Deque[Job]) -> None:
+        try:
+            if self._slots is not None:
+                async with self._slots:
+                    await self._run(key, lane)
+            else:
+                await self._run(key, lane)
+        finally:
+            del self._lanes[key]
+            del self._running[key]
+
+    async def _run(self, key: str, lane: Deque[Job]) -> None:
+        while lane:
+            job = lane.popleft()
+            try:
+                await job()
+            except Exception as e:
+                # A failing job must not stall the jobs queued behind it
+                logger.error("Job for key %s failed: %s", key, e)
+            self.processed += 1
+
+    async def drain(self, keys: Callable[[str], bool] = lambda key: True) -> None:
+        """Waits until no lane for the matching keys is queued or running."""
+        while True:
+            tasks = [task for key, task in self._running.items() if keys(key)]
+            if not tasks:
+                return
+            await asyncio.wait(tasks)
+
+    def __len__(self) -> int:
+        return len(self._running)
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "lanes": len(self._running),
+            "queued": sum(len(lane) for lane in self._lanes.values()),
+            "processed": self.processed,
+        }
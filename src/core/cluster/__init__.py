@@ -0,0 +1,7 @@
+from src.core.cluster.bridge import BusBridge
+from src.core.cluster.election import FileLock, file_lock
+from src.core.cluster.member import ClusterMember
+from src.core.cluster.ring import HashRing
+from src.core.cluster.sharding import ShardCoordinator, goal_key
+
+__all__ = ["BusBridge", "ClusterMember", "FileLock", "file_lock", "HashRing", "ShardCoordinator", "goal_key"]
@@ -0,0 +1,162 @@
+import asyncio
+import logging
+from collections import OrderedDict
+from pathlib import Path
+from typing import Optional, Set, TYPE_CHECKING
+from uuid import UUID
+
+from pydantic_core import to_json
+
+from src.core.bus.bus import MessageEnvelope
+from src.core.db.cache import entity_cache
+from src.core.db.models import Goal, Task
+from src.shared.constants import CLUSTER_PEER_JOINED_TOPIC
+
+if TYPE_CHECKING:
+    from src.core.bus.bus import InMemoryMessageBus
+
+logger = logging.getLogger(__name__)
+
+MAX_LINE: int = 16 * 1024 * 1024
+MAX_WRITE_BUFFER: int = 8 * 1024 * 1024
+
+class _SeenIds:
+    """Bounded set of envelope ids, used to avoid echoing bridged messages back."""
+
+    def __init__(self, max_entries: int = 10000) -> None:
+        self.max_entries = max_entries
+        self._ids: "OrderedDict[UUID, Optional[asyncio.StreamWriter]]" = OrderedDict()
+
+    def add(self, envelope_id: UUID, origin: Optional[asyncio.StreamWriter]) -> None:
+        self._ids[envelope_id] = origin
+        while len(self._ids) > self.max_entries:
+            self._ids.popitem(last=False)
+
+    def origin(self, envelope_id: UUID) -> "tuple[bool, Optional[asyncio.StreamWriter]]":
+        if envelope_id in self._ids:
+            return True, self._ids[envelope_id]
+        return False, None
+
+class BusBridge:
+    """
+    Joins the in-memory buses of several worker processes on one host over a
+    Unix domain socket. The elected owner listens; the other workers connect.
+    Envelopes are exchanged as NDJSON and re-delivered locally with their
+    original id, topic, timestamp and source, so every process sees every event:
+    the owner's agents react to goals created through any worker, and each
+    worker's registry, log index and stream hub stay complete.
+    """
+
+    def __init__(self, bus: "InMemoryMessageBus", socket_path: Path) -> None:
+        self.bus: "InMemoryMessageBus" = bus
+        self.socket_path: Path = socket_path
+        self._server: Optional[asyncio.AbstractServer] = None
+        self._peers: Set[asyncio.StreamWriter] = set()
+        self._readers: Set["asyncio.Task[None]"] = set()
+        self._seen: _SeenIds = _SeenIds()
+        self._subscribed: bool = False
+
+    @property
+    def is_server(self) -> bool:
+        return self._server is not None
+
+    @property
+    def connected(self) -> bool:
+        return bool(self._peers)
+
+    async def serve(self) -> None:
+        """Owner side: accepts worker connections."""
+        await self._subscribe()
+        self.socket_path.parent.mkdir(parents=True, exist_ok=True)
+        self.socket_path.unlink(missing_ok=True)
+        self._server = await asyncio.start_unix_server(self._on_peer, path=str(self.socket_path), limit=MAX_LINE)
+
+    async def connect(self) -> bool:
+        """Worker side: connects to the owner. Returns False if it is not listening yet."""
+        await self._subscribe()
+        try:
+            reader, writer = await asyncio.open_unix_connection(str(self.socket_path), limit=MAX_LINE)
+        except (FileNotFoundError, ConnectionRefusedError):
+            return False
+        self._track(reader, writer)
+        return True
+
+    async def close(self) -> None:
+        if self._server is not None:
+            self._server.close() # stop accepting; connections already open stay up
+        peers, self._peers = list(self._peers), set()
+        for writer in peers:
+            writer.close()
+        readers = list(self._readers)
+        for task in readers:
+            task.cancel()
+        await asyncio.gather(*readers, return_exceptions=True)
+        self._readers.clear()
+        for writer in peers:
+            try:
+                await writer.wait_closed()
+            except (ConnectionError, OSError):
+                pass
+        if self._server is not None:
+            # Since Python 3.12 this waits for every accepted connection, so it goes last
+            await self._server.wait_closed()
+            self._server = None
+
+    async def _subscribe(self) -> None:
+        if not self._subscribed:
+            self._subscribed = True
+            await self.bus.subscribe(".*", self._forward)
+
+    async def _on_peer(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        self._track(reader, writer)
+        # Lets state holders (e.g. the agent registry) send the newcomer a snapshot.
+        await self.bus.publish(CLUSTER_PEER_JOINED_TOPIC, {"peers": len(self._peers)})
+
+    def _track(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        self._peers.add(writer)
+        task = asyncio.create_task(self._read_loop(reader, writer))
+        self._readers.add(task)
+        task.add_done_callback(self._readers.discard)
+
+    async def _read_loop(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        try:
+            while line := await reader.readline():
+                try:
+                    envelope = MessageEnvelope.model_validate_json(line)
+                except ValueError as e:
+                    logger.error("Dropping malformed bridged message: %s", e)
+                    continue
+                self._seen.add(envelope.id, writer)
+                _invalidate_cached_entities(envelope)
+                await self.bus.deliver(envelope)
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            self._peers.discard(writer)
+            writer.close()
+
+    async def _forward(self, envelope: MessageEnvelope) -> None:
+        """Bus callback: sends local events to the peers, except back to where a bridged one came from."""
+        bridged, origin = self._seen.origin(envelope.id)
+        if bridged and not self.is_server:
+            return
+        line = to_json(envelope, fallback=str) + b"\n"
+        for writer in list(self._peers):
+            if writer is origin:
+                continue
+            if writer.transport.get_write_buffer_size() > MAX_WRITE_BUFFER:
+                logger.warning("Dropping bus bridge peer that stopped reading")
+                self._peers.discard(writer)
+                writer.close()
+                continue
+            writer.write(line)
+
+def _invalidate_cached_entities(envelope: MessageEnvelope) -> None:
+    """Rows changed by another process must not be served from this process's entity cache."""
+    payload = envelope.payload if isinstance(envelope.payload, dict) else {}
+    for key, model in (("goal_id", Goal), ("task_id", Task)):
+        try:
+            if payload.get(key) is not None:
+                entity_cache.invalidate(model, UUID(str(payload[key])))
+        except ValueError:
+            pass
@@ -0,0 +1,62 @@
+import asyncio
+import logging
+import os
+from contextlib import asynccontextmanager
+from pathlib import Path
+from typing import AsyncIterator, Optional
+
+try:
+    import fcntl
+except ImportError: # pragma: no cover - Windows
+    fcntl = None # type: ignore[assignment]
+
+logger = logging.getLogger(__name__)
+
+class FileLock:
+    """
+    Advisory lock on a local file (flock). The OS releases it when the holding
+    process exits, so a crashed owner never leaves a stale lock behind.
+    Without fcntl (Windows) every process is treated as the lock holder.
+    """
+
+    def __init__(self, path: Path) -> None:
+        self.path: Path = path
+        self._fd: Optional[int] = None
+
+    @property
+    def held(self) -> bool:
+        return self._fd is not None
+
+    def acquire(self, blocking: bool = False) -> bool:
+        if self._fd is not None:
+            return True
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        fd = os.open(self.path, os.O_RDWR | os.O_CREAT, 0o644)
+        if fcntl is not None:
+            try:
+                fcntl.flock(fd, fcntl.LOCK_EX | (0 if blocking else fcntl.LOCK_NB))
+            except BlockingIOError:
+                os.close(fd)
+                return False
+        os.ftruncate(fd, 0)
+        os.write(fd, str(os.getpid()).encode())
+        self._fd = fd
+        return True
+
+    def release(self) -> None:
+        if self._fd is None:
+            return
+        if fcntl is not None:
+            fcntl.flock(self._fd, fcntl.LOCK_UN)
+        os.close(self._fd)
+        self._fd = None
+
+@asynccontextmanager
+async def file_lock(path: Path) -> AsyncIterator[None]:
+    """Holds an exclusive lock for the duration of the block, waiting for it off the event loop."""
+    lock = FileLock(path)
+    await asyncio.to_thread(lock.acquire, True)
+    try:
+        yield
+    finally:
+        lock.release()
@@ -0,0 +1,75 @@
+import asyncio
+import logging
+from pathlib import Path
+from typing import Awaitable, Callable, Optional, TYPE_CHECKING
+
+from src.core.cluster.bridge import BusBridge
+from src.core.cluster.election import FileLock
+from src.shared.config import settings
+
+if TYPE_CHECKING:
+    from src.core.bus.bus import InMemoryMessageBus
+
+logger = logging.getLogger(__name__)
+
+class ClusterMember:
+    """
+    One worker process in a multi-worker deployment on a single host.
+    Workers compete for a file lock; the holder becomes the owner, runs the
+    agents and the bus bridge server, and the others connect to it. When the
+    owner dies the OS drops its lock and the next worker to poll takes over.
+    """
+
+    def __init__(
+        self,
+        bus: "InMemoryMessageBus",
+        on_elected: Callable[[], Awaitable[None]],
+        cluster_dir: Path = settings.CLUSTER_DIR,
+        poll_interval: float = settings.CLUSTER_POLL_INTERVAL
+    ) -> None:
+        self.on_elected = on_elected
+        self.poll_interval: float = poll_interval
+        self.lock: FileLock = FileLock(cluster_dir / "owner.lock")
+        self.bridge: BusBridge = BusBridge(bus, cluster_dir / "bus.sock")
+        self._task: Optional["asyncio.Task[None]"] = None
+
+    @property
+    def is_owner(self) -> bool:
+        return self.lock.held
+
+    async def start(self) -> None:
+        await self._poll()
+        self._task = asyncio.create_task(self._poll_loop())
+
+    async def stop(self) -> None:
+        if self._task:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        await self.bridge.close()
+        self.lock.release()
+
+    async def _poll(self) -> None:
+        if self.is_owner:
+            return
+        if self.lock.acquire():
+            logger.info("Elected as owner; starting agents and bus bridge")
+            await self.bridge.close()
+            await self.bridge.serve()
+            await self.on_elected()
+        elif not self.bridge.connected:
+            if not await self.bridge.connect():
+                logger.debug("Owner bus bridge not reachable yet")
+
+    async def _poll_loop(self) -> None:
+        while True:
+            try:
+                await asyncio.sleep(self.poll_interval)
+                await self._poll()
+            except asyncio.CancelledError:
+                break
+            except Exception as e:
+                logger.error("Error in cluster membership loop: %s", e)
@@ -0,0 +1,59 @@
+from bisect import bisect_left
+from hashlib import blake2b
+from typing import FrozenSet, Iterable, List, Optional
+
+def _hash(value: str) -> int:
+    return int.from_bytes(blake2b(value.encode("utf-8"), digest_size=8).digest(), "big")
+
+class HashRing:
+    """
+    Consistent hashing of keys onto nodes. Each node is placed at `replicas` points
+    on a 64-bit circle and a key belongs to the node owning the first point at or
+    after the key's hash, so adding or removing one of N nodes moves only ~1/N of
+    the keys.
+    """
+    __slots__ = ("replicas", "_nodes", "_points", "_owners")
+
+    def __init__(self, nodes: Iterable[str] = (), replicas: int = 64) -> None:
+        self.replicas: int = replicas
+        self._nodes: FrozenSet[str] = frozenset(nodes)
+        self._points: List[int] = []
+        self._owners: List[str] = []
+        self._build()
+
+    def _build(self) -> None:
+        points = sorted(
+            (_hash(f"{node}#{replica}"), node) for node in self._nodes for replica in range(self.replicas)
+        )
+        self._points = [point for point, _ in points]
+        self._owners = [node for _, node in points]
+
+    @property
+    def nodes(self) -> FrozenSet[str]:
+        return self._nodes
+
+    def add(self, node: str) -> None:
+        if node not in self._nodes:
+            self._nodes = self._nodes | {node}
+            self._build()
+
+    def remove(self, node: str) -> None:
+        if node in self._nodes:
+            self._nodes = self._nodes - {node}
+            self._build()
+
+    def owner(self, key: str) -> Optional[str]:
+        if not self._points:
+            return None
+        index = bisect_left(self._points, _hash(key))
+        return self._owners[index % len(self._owners)]
+
+    def fingerprint(self) -> str:
+        """Identifies the node set; equal on every process that agrees on membership."""
+        return blake2b("\n".join(sorted(self._nodes)).encode("utf-8"), digest_size=8).hexdigest()
+
+    def __len__(self) -> int:
+        return len(self._nodes)
+
+    def __contains__(self, node: object) -> bool:
+        return node in self._nodes
@@ -0,0 +1,303 @@
+import asyncio
+import logging
+import os
+import socket
+import time
+from functools import partial
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Set, Tuple, TYPE_CHECKING
+
+from src.core.bus.executor import KeyedExecutor
+from src.core.cluster.ring import HashRing
+from src.shared.config import settings
+from src.shared.constants import CLUSTER_PEER_JOINED_TOPIC
+
+if TYPE_CHECKING:
+    from src.core.bus.bus import MessageBus, MessageEnvelope
+
+logger = logging.getLogger(__name__)
+
+SHARD_TOPIC = "cluster.director.shards"
+
+Handler = Callable[["MessageEnvelope"], Awaitable[None]]
+KeyFunction = Callable[["MessageEnvelope"], Optional[str]]
+
+def goal_key(envelope: "MessageEnvelope") -> Optional[str]:
+    """Shards workflow events by goal; task results that predate goal_id fall back to the task."""
+    payload = envelope.payload
+    if isinstance(payload, dict):
+        return payload.get("goal_id") or payload.get("task_id")
+    return None
+
+class Shard:
+    """
+    A local shard: one FIFO lane per key with at most `concurrency` keys running at
+    once. Events of one key never overlap and run in arrival order; different keys
+    run concurrently.
+    """
+
+    def __init__(self, shard_id: str, concurrency: int) -> None:
+        self.shard_id: str = shard_id
+        self._executor: KeyedExecutor = KeyedExecutor(concurrency)
+
+    def submit(self, key: str, handler: Handler, envelope: "MessageEnvelope") -> None:
+        self._executor.submit(key, partial(self._handle, key, handler, envelope))
+
+    async def _handle(self, key: str, handler: Handler, envelope: "MessageEnvelope") -> None:
+        try:
+            await handler(envelope)
+        except Exception as e:
+            logger.error("Shard %s failed on %s for %s: %s", self.shard_id, envelope.topic, key, e)
+
+    async def drain(self, moved: Callable[[str], bool] = lambda key: True) -> None:
+        """Waits until no lane for the matching keys is queued or running."""
+        await self._executor.drain(moved)
+
+    def stats(self) -> Dict[str, Any]:
+        return self._executor.stats()
+
+class ShardCoordinator:
+    """
+    Splits per-goal event processing across Director shards by consistent hashing.
+
+    Each process runs `shards` local shards. With `clustered` set (MULTI_WORKER),
+    processes announce their shards on SHARD_TOPIC, and every process builds the same
+    ring from the announcements. Each event is handled only by the shard that owns
+    its key. Processes that stop announcing for `member_ttl` seconds are dropped.
+
+    Handoff on membership change: a shard that loses keys finishes the events it
+    already queued for them, then publishes `released` for the new ring. The shard
+    gaining those keys holds their events until the previous owner has released
+    them or `handoff_timeout` passes. Per-goal order is kept across the move
+    unless that timeout expires.
+
+    Announcements only reach peers over a connected bus bridge, so every process
+    announces again whenever a bridge connection is made (CLUSTER_PEER_JOINED_TOPIC).
+    A process that knows no peers yet holds its events for another handoff window
+    at that point, until the answers arrive, instead of claiming every goal.
+
+    Handlers must still tolerate seeing an event twice around a membership change.
+    The Director's handlers do: transitions are compare-and-swap, claims skip
+    locked rows, and Lyra does not decompose a goal that already has tasks.
+    """
+
+    def __init__(
+        self,
+        bus: "MessageBus",
+        shards: int = settings.DIRECTOR_SHARDS,
+        concurrency: int = settings.DIRECTOR_SHARD_CONCURRENCY,
+        clustered: bool = settings.MULTI_WORKER,
+        node_id: Optional[str] = None,
+        replicas: int = settings.DIRECTOR_SHARD_REPLICAS,
+        announce_interval: float = settings.DIRECTOR_SHARD_ANNOUNCE_INTERVAL,
+        member_ttl: float = settings.DIRECTOR_SHARD_TTL,
+        handoff_timeout: float = settings.DIRECTOR_HANDOFF_TIMEOUT
+    ) -> None:
+        self.bus: "MessageBus" = bus
+        self.node_id: str = node_id or f"{socket.gethostname()}:{os.getpid()}"
+        self.concurrency: int = concurrency
+        self.clustered: bool = clustered
+        self.replicas: int = replicas
+        self.announce_interval: float = announce_interval
+        self.member_ttl: float = member_ttl
+        self.handoff_timeout: float = handoff_timeout
+
+        self.local: Dict[str, Shard] = {}
+        for index in range(max(1, shards)):
+            shard_id = f"{self.node_id}/{index}"
+            self.local[shard_id] = Shard(shard_id, concurrency)
+        self.ring: HashRing = HashRing(self.local, replicas)
+
+        self._members: Dict[str, Tuple[Tuple[str, ...], float]] = {} # node -> (shard ids, last seen)
+        self._previous: Optional[HashRing] = None
+        self._handoff_deadline: float = 0.0
+        self._released: Dict[str, Set[str]] = {} # ring fingerprint -> nodes that released for it
+        self._held: List[Tuple[str, Handler, "MessageEnvelope"]] = []
+        self._joining: bool = False
+        self._join_generation: int = 0
+        self._active: bool = False
+        self._loop_task: Optional[asyncio.Task[None]] = None
+        self._release_task: Optional[asyncio.Task[None]] = None
+        self._subscribed: bool = False
+        self.rebalances: int = 0
+
+    async def start(self) -> None:
+        if not self.clustered:
+            return
+        if not self._subscribed:
+            self._subscribed = True
+            await self.bus.subscribe(SHARD_TOPIC, self._on_membership)
+            await self.bus.subscribe(CLUSTER_PEER_JOINED_TOPIC, self._on_peer_joined)
+        self._active = True
+        await self._join()
+        self._loop_task = asyncio.create_task(self._announce_loop())
+
+    async def stop(self) -> None:
+        self._active = False
+        for task in (self._loop_task, self._release_task):
+            if task:
+                task.cancel()
+                try:
+                    await task
+                except asyncio.CancelledError:
+                    pass
+        self._loop_task = self._release_task = None
+        for shard in self.local.values():
+            await shard.drain()
+        if self.clustered:
+            # Peers take over our keys as soon as they see this; no need to wait for the TTL
+            await self._announce("down")
+
+    def route(self, handler: Handler, key: KeyFunction = goal_key) -> Handler:
+        """Wraps a bus callback so that only the owning shard runs it, in per-key order."""
+        async def dispatch(envelope: "MessageEnvelope") -> None:
+            self._dispatch(key(envelope) or str(envelope.id), handler, envelope)
+        return dispatch
+
+    def owns(self, key: str) -> bool:
+        return self.ring.owner(key) in self.local
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "node": self.node_id,
+            "ring": sorted(self.ring.nodes),
+            "members": sorted(self._members),
+            "shards": {shard_id: shard.stats() for shard_id, shard in self.local.items()},
+            "held": len(self._held),
+            "rebalances": self.rebalances,
+        }
+
+    # -- Routing ----------------------------------------------------------
+
+    def _dispatch(self, key: str, handler: Handler, envelope: "MessageEnvelope") -> None:
+        if self._joining or self._awaiting_handoff(key):
+            self._held.append((key, handler, envelope))
+            return
+        shard = self.local.get(self.ring.owner(key) or "")
+        if shard is not None:
+            shard.submit(key, handler, envelope)
+
+    def _awaiting_handoff(self, key: str) -> bool:
+        if self._previous is None or time.monotonic() >= self._handoff_deadline:
+            return False
+        previous = self._previous.owner(key)
+        if previous is None or previous in self.local:
+            return False
+        node = previous.rsplit("/", 1)[0]
+        if node not in self._members:
+            return False # left or expired: nothing of it is left to wait for
+        return node not in self._released.get(self.ring.fingerprint(), ())
+
+    def _flush(self) -> None:
+        held, self._held = self._held, []
+        for key, handler, envelope in held:
+            self._dispatch(key, handler, envelope)
+
+    # -- Membership -------------------------------------------------------
+
+    async def _announce(self, event: str, epoch: Optional[str] = None) -> None:
+        await self.bus.publish(SHARD_TOPIC, {
+            "node": self.node_id,
+            "event": event,
+            "shards": sorted(self.local),
+            "epoch": epoch,
+        }, source_id=self.node_id)
+
+    async def _on_membership(self, envelope: "MessageEnvelope") -> None:
+        data = envelope.payload
+        node = data.get("node")
+        if not self._active or not node or node == self.node_id:
+            return
+        event = data.get("event")
+        if event == "down":
+            if self._members.pop(node, None) is not None:
+                self._rebalance()
+            return
+        if event == "released":
+            self._released.setdefault(data.get("epoch") or "", set()).add(node)
+            while len(self._released) > 16:
+                self._released.pop(next(iter(self._released)))
+            self._flush()
+            return
+
+        shards = tuple(data.get("shards") or ())
+        known = self._members.get(node)
+        self._members[node] = (shards, time.monotonic())
+        if known is None or known[0] != shards:
+            if known is None:
+                await self._announce("up") # let the newcomer learn about us right away
+            self._rebalance()
+
+    def _rebalance(self) -> None:
+        ring = HashRing(
+            [*self.local, *(shard for shards, _ in self._members.values() for shard in shards)],
+            self.replicas
+        )
+        if ring.nodes == self.ring.nodes:
+            return
+        previous, self.ring = self.ring, ring
+        self.rebalances += 1
+        logger.info("Director shard ring changed: %s shards on %s nodes", len(ring), len(self._members) + 1)
+        if self._joining:
+            return
+        self._begin_handoff(previous)
+
+    async def _join(self) -> None:
+        """Holds everything until peers have answered, then takes over our keys like any handoff."""
+        self._joining = True
+        self._join_generation += 1
+        await self._announce("up")
+        asyncio.get_running_loop().call_later(self.handoff_timeout, self._finish_join, self._join_generation)
+
+    async def _on_peer_joined(self, envelope: "MessageEnvelope") -> None:
+        """A bridge connection came up: peers may have missed everything announced so far."""
+        if not self._active:
+            return
+        if not self._members:
+            await self._join() # on our own so far: the ring we built cannot be trusted
+        else:
+            await self._announce("up")
+
+    def _finish_join(self, generation: int) -> None:
+        if not self._joining or not self._active or generation != self._join_generation:
+            return
+        self._joining = False
+        others = [shard for shard in self.ring.nodes if shard not in self.local]
+        self._begin_handoff(HashRing(others, self.replicas) if others else None)
+
+    def _begin_handoff(self, previous: Optional[HashRing]) -> None:
+        self._previous = previous
+        self._handoff_deadline = time.monotonic() + self.handoff_timeout
+        asyncio.get_running_loop().call_later(self.handoff_timeout, self._flush)
+        self._flush()
+        if self.clustered:
+            # A newer ring supersedes the release still waiting for the old one
+            if self._release_task:
+                self._release_task.cancel()
+            self._release_task = asyncio.create_task(self._release(self.ring))
+
+    async def _release(self, ring: HashRing) -> None:
+        """Finishes queued events of keys that moved away, then tells their new owners."""
+        for shard_id, shard in self.local.items():
+            await shard.drain(partial(_moved_away, ring, shard_id))
+        if ring is self.ring:
+            await self._announce("released", ring.fingerprint())
+
+    async def _announce_loop(self) -> None:
+        while True:
+            try:
+                await asyncio.sleep(self.announce_interval)
+                await self._announce("up")
+                cutoff = time.monotonic() - self.member_ttl
+                expired = [node for node, (_, seen) in self._members.items() if seen < cutoff]
+                for node in expired:
+                    logger.warning("Director shard node %s stopped announcing; taking over its goals", node)
+                    del self._members[node]
+                if expired:
+                    self._rebalance()
+            except asyncio.CancelledError:
+                break
+            except Exception as e:
+                logger.error("Error in shard membership loop: %s", e)
+
+def _moved_away(ring: HashRing, shard_id: str, key: str) -> bool:
+    return ring.owner(key) != shard_id
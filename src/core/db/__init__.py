@@ -1,4 +1,12 @@
 from src.core.db.session import engine, AsyncSessionLocal, get_db, create_tables
 from src.core.db.models import Base, Goal, Task, Artifact, ArtifactVersion, AuditLog
+from src.core.db.claims import claim_pending_tasks, notify_tasks_pending
+from src.core.db.cache import EntityCache, entity_cache
+from src.core.db.tree import new_task, needs_expansion, roll_up, subtree
 
-__all__ = ["engine", "AsyncSessionLocal", "get_db", "create_tables", "Base", "Goal", "Task", "Artifact", "ArtifactVersion", "AuditLog"]
+__all__ = [
+    "engine", "AsyncSessionLocal", "get_db", "create_tables",
+    "Base", "Goal", "Task", "Artifact", "ArtifactVersion", "AuditLog",
+    "claim_pending_tasks", "notify_tasks_pending", "EntityCache", "entity_cache",
+    "new_task", "needs_expansion", "roll_up", "subtree",
+]
@@ -0,0 +1,135 @@
+from collections import OrderedDict
+from typing import Any, Dict, Optional, Tuple, Type, TypeVar, cast
+from uuid import UUID
+
+from sqlalchemy import inspect as sa_inspect
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import make_transient_to_detached
+
+from src.core.db.models import Base
+from src.shared.config import settings
+
+T = TypeVar("T", bound=Base)
+CacheKey = Tuple[Type[Base], UUID]
+
+class EntityCache:
+    """
+    Process-wide read-through cache for Goal and Task rows.
+
+    Entries are detached snapshots: `get` may return a shared instance that callers
+    must treat as read-only (column attributes only; relationships are not loaded).
+    Writers go through `get_for_update`, which merges the snapshot into their session
+    without a SELECT, and publish the committed row back with `put`.
+
+    While a read-through load of a key is in flight, the key carries a version stamp
+    that every write or invalidation bumps, so a load that raced with a write never
+    repopulates a stale row. Stamps are dropped with the last in-flight load.
+    """
+
+    def __init__(self, max_entries: int = settings.ENTITY_CACHE_SIZE) -> None:
+        self.max_entries: int = max_entries
+        self._entries: "OrderedDict[CacheKey, Base]" = OrderedDict()
+        self._stamps: Dict[CacheKey, int] = {}
+        self._loading: Dict[CacheKey, int] = {} # In-flight loads per key
+
+        self.hits: int = 0
+        self.misses: int = 0
+        self.invalidations: int = 0
+
+    async def get(self, session: AsyncSession, model: Type[T], ident: UUID) -> Optional[T]:
+        """Returns the cached snapshot, or loads the row through the given session."""
+        key: CacheKey = (model, ident)
+        cached = self._entries.get(key)
+        if cached is not None:
+            self.hits += 1
+            self._entries.move_to_end(key)
+            return cast(T, cached)
+
+        self.misses += 1
+        self._loading[key] = self._loading.get(key, 0) + 1
+        stamp = self._stamps.get(key, 0)
+        try:
+            obj = await session.get(model, ident)
+        finally:
+            fresh = self._stamps.get(key, 0) == stamp
+            loading = self._loading.pop(key) - 1
+            if loading:
+                self._loading[key] = loading
+            else:
+                self._stamps.pop(key, None)
+        if obj is not None and fresh:
+            self._store(key, obj)
+        return obj
+
+    async def get_for_update(self, session: AsyncSession, model: Type[T], ident: UUID) -> Optional[T]:
+        """Returns an instance attached to the session, built from the cache when possible."""
+        key: CacheKey = (model, ident)
+        cached = self._entries.get(key)
+        if cached is None:
+            return await self.get(session, model, ident)
+
+        self.hits += 1
+        self._entries.move_to_end(key)
+        # merge() copies state into a session-owned instance; the shared snapshot stays untouched.
+        return await session.merge(cast(T, cached), load=False)
+
+    def put(self, obj: Base) -> None:
+        """Write-through: publishes a committed row, superseding any in-flight loads."""
+        ident = getattr(obj, "id", None)
+        if not isinstance(ident, UUID):
+            return
+        key: CacheKey = (type(obj), ident)
+        self._bump(key)
+        self._store(key, obj)
+
+    def invalidate(self, model: Type[Base], ident: UUID) -> None:
+        key: CacheKey = (model, ident)
+        self._bump(key)
+        if self._entries.pop(key, None) is not None:
+            self.invalidations += 1
+
+    def clear(self) -> None:
+        for key in list(self._entries):
+            self.invalidate(*key)
+
+    def stats(self) -> Dict[str, Any]:
+        lookups = self.hits + self.misses
+        return {
+            "size": len(self._entries),
+            "hits": self.hits,
+            "misses": self.misses,
+            "invalidations": self.invalidations,
+            "hit_ratio": self.hits / lookups if lookups else 0.0,
+        }
+
+    def _bump(self, key: CacheKey) -> None:
+        if key in self._loading:
+            self._stamps[key] = self._stamps.get(key, 0) + 1
+
+    def _store(self, key: CacheKey, obj: Base) -> None:
+        model = key[0]
+        if not isinstance(obj, model):
+            return
+        snapshot = self._snapshot(model, obj)
+        if snapshot is None:
+            # Partially loaded (e.g. expired after an UPDATE): drop rather than cache a hole.
+            self._entries.pop(key, None)
+            return
+        self._entries[key] = snapshot
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    @staticmethod
+    def _snapshot(model: Type[Base], obj: Base) -> Optional[Base]:
+        """Copies the loaded column values of obj into a fresh detached instance."""
+        state = sa_inspect(obj)
+        columns = [attr.key for attr in sa_inspect(model).column_attrs]
+        if any(key not in state.dict for key in columns):
+            return None
+        snapshot = model(**{key: state.dict[key] for key in columns})
+        make_transient_to_detached(snapshot)
+        return snapshot
+
+# Process-wide instance shared by the engine and agents
+entity_cache = EntityCache()
@@ -0,0 +1,89 @@
+from collections import Counter
+from datetime import datetime, timezone
+from typing import Final, List, Optional
+from uuid import UUID
+
+from sqlalchemy import Select, select, update, text
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from src.core.db.models import Task
+from src.core.db.progress import record_progress
+from src.shared.models import TaskState
+
+TASKS_PENDING_CHANNEL: Final[str] = "ocs_tasks_pending"
+
+def is_postgres(session: AsyncSession) -> bool:
+    bind = getattr(session, "bind", None)
+    return getattr(getattr(bind, "dialect", None), "name", None) == "postgresql"
+
+def claim_candidates_query(goal_id: Optional[UUID] = None, limit: Optional[int] = None) -> Select[UUID]:
+    """The locking SELECT of pending task ids that `claim_pending_tasks` runs first."""
+    candidates = (
+        select(Task.id)
+        .where(Task.status == TaskState.PENDING.value)
+        .order_by(Task.created_at)
+        .with_for_update(skip_locked=True)
+    )
+    if goal_id is not None:
+        candidates = candidates.where(Task.goal_id == goal_id)
+    if limit is not None:
+        candidates = candidates.limit(limit)
+    return candidates
+
+async def claim_pending_tasks(
+    session: AsyncSession,
+    agent_id: str,
+    goal_id: Optional[UUID] = None,
+    limit: Optional[int] = None
+) -> List[Task]:
+    """
+    Claims pending tasks for an agent:
+
+        SELECT id FROM tasks WHERE status='Pending' ... LIMIT n FOR UPDATE SKIP LOCKED;
+        UPDATE tasks SET status='Active', assigned_to=:agent
+        WHERE id IN (:ids) AND status='Pending' RETURNING *;
+
+    On PostgreSQL, concurrent claimers skip rows locked by each other instead of
+    blocking, and the row locks are held until the caller commits, so several
+    workers never double-assign a task. SQLite drops the locking clause; the
+    status re-check in the UPDATE keeps its claims exclusive.
+    Goal progress counters are moved from Pending to Active in the same transaction.
+    The caller owns the transaction and must commit.
+    """
+    # Materialize the ids first: PostgreSQL may re-evaluate a LIMIT subquery inside IN (...).
+    task_ids = list((await session.scalars(claim_candidates_query(goal_id, limit))).all())
+    if not task_ids:
+        return []
+
+    now = datetime.now(timezone.utc)
+    stmt = (
+        update(Task)
+        .where(Task.id.in_(task_ids), Task.status == TaskState.PENDING.value)
+        .values(
+            status=TaskState.ACTIVE.value,
+            assigned_to=agent_id,
+            updated_at=now
+        )
+        .returning(Task)
+    )
+    result = await session.scalars(stmt, execution_options={"synchronize_session": False})
+    claimed = list(result.all())
+
+    for claimed_goal_id, count in Counter(task.goal_id for task in claimed).items():
+        await record_progress(
+            session, claimed_goal_id,
+            {TaskState.PENDING.value: -count, TaskState.ACTIVE.value: count},
+            claimed_at=now
+        )
+    return claimed
+
+async def notify_tasks_pending(session: AsyncSession, goal_id: UUID) -> None:
+    """
+    Emits a NOTIFY on PostgreSQL so out-of-process workers LISTENing on
+    TASKS_PENDING_CHANNEL can claim new work. Delivered on commit; no-op elsewhere.
+    """
+    if is_postgres(session):
+        await session.execute(
+            text("SELECT pg_notify(:channel, :payload)"),
+            {"channel": TASKS_PENDING_CHANNEL, "payload": str(goal_id)}
+        )
@@ -2,7 +2,7 @@ from datetime import datetime, timezone
 from typing import List, Optional, Any
 from uuid import UUID, uuid4
 
-from sqlalchemy import String, ForeignKey, DateTime, JSON, Text
+from sqlalchemy import String, ForeignKey, DateTime, JSON, Text, UniqueConstraint
 from sqlalchemy.orm import Mapped, mapped_column, relationship, DeclarativeBase
 from sqlalchemy.ext.asyncio import AsyncAttrs
 
@@ -16,7 +16,10 @@ class Goal(Base):
     title: Mapped[str] = mapped_column(String(255))
     description: Mapped[str] = mapped_column(Text)
     status: Mapped[str] = mapped_column(String(50), default="ACTIVE")
-    created_at: Mapped[datetime] = mapped_column(DateTime, default=lambda: datetime.now(timezone.utc))
+    version: Mapped[int] = mapped_column(default=1) # Bumped by every status change; compare-and-swap token
+    workflow: Mapped[Optional[str]] = mapped_column(String(100), nullable=True) # Definition key (name@version); None = default
+    priority: Mapped[str] = mapped_column(String(20), default="Medium") # TaskPriority value, inherited by the goal's tasks
+    created_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), default=lambda: datetime.now(timezone.utc))
     
     tasks: Mapped[List["Task"]] = relationship(back_populates="goal", cascade="all, delete-orphan")
 
@@ -24,8 +27,10 @@ class Task(Base):
     __tablename__ = "tasks"
     
     id: Mapped[UUID] = mapped_column(primary_key=True, default=uuid4)
-    goal_id: Mapped[UUID] = mapped_column(ForeignKey("goals.id"))
-    parent_id: Mapped[Optional[UUID]] = mapped_column(ForeignKey("tasks.id"), nullable=True)
+    goal_id: Mapped[UUID] = mapped_column(ForeignKey("goals.id"), index=True)
+    parent_id: Mapped[Optional[UUID]] = mapped_column(ForeignKey("tasks.id"), nullable=True, index=True)
+    depth: Mapped[int] = mapped_column(default=0) # 0 for the goal's top-level tasks
+    path: Mapped[Optional[str]] = mapped_column(String(1024), nullable=True, index=True) # Materialized path: "<root hex>/.../<own hex>/"
     
     title: Mapped[str] = mapped_column(String(255))
     type: Mapped[str] = mapped_column(String(50)) # e.g. GENERATION, REVIEW
@@ -35,8 +40,8 @@ class Task(Base):
     payload: Mapped[dict[str, Any]] = mapped_column(JSON, default={})
     result: Mapped[Optional[dict[str, Any]]] = mapped_column(JSON, nullable=True)
     
-    created_at: Mapped[datetime] = mapped_column(DateTime, default=lambda: datetime.now(timezone.utc))
-    updated_at: Mapped[datetime] = mapped_column(DateTime, default=lambda: datetime.now(timezone.utc), onupdate=lambda: datetime.now(timezone.utc))
+    created_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), default=lambda: datetime.now(timezone.utc))
+    updated_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), default=lambda: datetime.now(timezone.utc), onupdate=lambda: datetime.now(timezone.utc))
 
     goal: Mapped["Goal"] = relationship(back_populates="tasks")
     
@@ -46,6 +51,43 @@ class Task(Base):
     
     artifacts: Mapped[List["Artifact"]] = relationship(back_populates="task", cascade="all, delete-orphan")
 
+class GoalProgress(Base):
+    """Per-goal task counters, maintained incrementally in the same transactions that move tasks."""
+    __tablename__ = "goal_progress"
+
+    goal_id: Mapped[UUID] = mapped_column(ForeignKey("goals.id"), primary_key=True)
+
+    pending: Mapped[int] = mapped_column(default=0)
+    active: Mapped[int] = mapped_column(default=0)
+    completed: Mapped[int] = mapped_column(default=0)
+    failed: Mapped[int] = mapped_column(default=0)
+
+    latency_total: Mapped[float] = mapped_column(default=0.0) # Seconds from claim to result, summed
+    latency_count: Mapped[int] = mapped_column(default=0)
+    first_claimed_at: Mapped[Optional[datetime]] = mapped_column(DateTime(timezone=True), nullable=True)
+    last_finished_at: Mapped[Optional[datetime]] = mapped_column(DateTime(timezone=True), nullable=True)
+
+class GoalEvent(Base):
+    """Append-only log of workflow transitions; goals.status is a projection of it."""
+    __tablename__ = "goal_events"
+    __table_args__ = (UniqueConstraint("goal_id", "version"),)
+
+    id: Mapped[int] = mapped_column(primary_key=True, autoincrement=True)
+    goal_id: Mapped[UUID] = mapped_column(ForeignKey("goals.id"), index=True)
+    version: Mapped[int] = mapped_column() # Goal version after this transition
+    from_state: Mapped[Optional[str]] = mapped_column(String(50), nullable=True) # None for goal creation
+    to_state: Mapped[str] = mapped_column(String(50))
+    occurred_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), default=lambda: datetime.now(timezone.utc))
+
+class GoalSnapshot(Base):
+    """Folded goal history up to `version`, so replays start here instead of at creation."""
+    __tablename__ = "goal_snapshots"
+
+    goal_id: Mapped[UUID] = mapped_column(ForeignKey("goals.id"), primary_key=True)
+    version: Mapped[int] = mapped_column(primary_key=True)
+    occurred_at: Mapped[datetime] = mapped_column(DateTime(timezone=True)) # Time of the last folded event
+    state: Mapped[dict[str, Any]] = mapped_column(JSON)
+
 class Artifact(Base):
     __tablename__ = "artifacts"
     
@@ -58,7 +100,7 @@ class Artifact(Base):
     
     current_version_id: Mapped[Optional[UUID]] = mapped_column(ForeignKey("artifact_versions.id"), nullable=True)
     
-    created_at: Mapped[datetime] = mapped_column(DateTime, default=lambda: datetime.now(timezone.utc))
+    created_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), default=lambda: datetime.now(timezone.utc))
     
     task: Mapped["Task"] = relationship(back_populates="artifacts")
     versions: Mapped[List["ArtifactVersion"]] = relationship(primaryjoin="Artifact.id==ArtifactVersion.artifact_id", back_populates="artifact")
@@ -70,9 +112,13 @@ class ArtifactVersion(Base):
     artifact_id: Mapped[UUID] = mapped_column(ForeignKey("artifacts.id"))
     
     version_number: Mapped[int] = mapped_column()
-    content: Mapped[str] = mapped_column(Text) # For text files. Binary refs likely external.
+    content: Mapped[Optional[str]] = mapped_column(Text, nullable=True) # Legacy inline content. New versions live in the blob store.
+    blob_digest: Mapped[Optional[str]] = mapped_column(String(64), nullable=True, index=True) # SHA-256 key under ARTIFACTS_DIR
+    size_bytes: Mapped[int] = mapped_column(default=0) # Size of the full (reconstructed) content
+    encoding: Mapped[str] = mapped_column(String(16), default="raw") # raw keyframe | delta against base version
+    base_version_number: Mapped[Optional[int]] = mapped_column(nullable=True)
     created_by_agent: Mapped[str] = mapped_column(String(50))
-    created_at: Mapped[datetime] = mapped_column(DateTime, default=lambda: datetime.now(timezone.utc))
+    created_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), default=lambda: datetime.now(timezone.utc))
 
     artifact: Mapped["Artifact"] = relationship(back_populates="versions", foreign_keys=[artifact_id])
 
@@ -80,11 +126,12 @@ class AuditLog(Base):
     __tablename__ = "audit_logs"
     
     id: Mapped[UUID] = mapped_column(primary_key=True, default=uuid4)
-    timestamp: Mapped[datetime] = mapped_column(DateTime, default=lambda: datetime.now(timezone.utc))
+    timestamp: Mapped[datetime] = mapped_column(DateTime(timezone=True), default=lambda: datetime.now(timezone.utc))
+    partition_key: Mapped[str] = mapped_column(String(8), index=True) # YYYYMMDD, used for retention
     actor_id: Mapped[str] = mapped_column(String(50))
     action_type: Mapped[str] = mapped_column(String(100))
     
     entity_type: Mapped[str] = mapped_column(String(50))
-    entity_id: Mapped[UUID] = mapped_column()
+    entity_id: Mapped[Optional[UUID]] = mapped_column(nullable=True)
     
     metadata_json: Mapped[dict[str, Any]] = mapped_column(JSON, default={})
@@ -0,0 +1,158 @@
+from datetime import datetime, timezone
+from typing import Any, Dict, Final, Mapping, Optional, cast
+from uuid import UUID
+
+from sqlalchemy import CursorResult, func, select, update
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from src.core.db.models import GoalProgress, Task
+from src.core.db.session import as_utc
+from src.shared.models import TaskState
+
+# TaskState value -> GoalProgress counter column
+STATE_COLUMNS: Final[Dict[str, str]] = {state.value: state.name.lower() for state in TaskState}
+FINISHED_STATES: Final[frozenset[str]] = frozenset({TaskState.COMPLETED.value, TaskState.FAILED.value})
+
+async def record_progress(
+    session: AsyncSession,
+    goal_id: UUID,
+    deltas: Mapping[str, int],
+    latency: Optional[float] = None,
+    claimed_at: Optional[datetime] = None,
+    finished_at: Optional[datetime] = None
+) -> None:
+    """
+    Applies counter deltas (keyed by TaskState value) as one relative UPDATE:
+
+        UPDATE goal_progress SET pending = pending - 2, active = active + 2, ...
+        WHERE goal_id = :goal_id;
+
+    Call it inside the transaction that moves the tasks so counters and rows commit
+    together. Goals without a counter row yet are backfilled from their tasks, which
+    already include this transaction's change.
+    """
+    values: Dict[str, Any] = {}
+    for state, delta in deltas.items():
+        if delta:
+            column = getattr(GoalProgress, STATE_COLUMNS[state])
+            values[column.key] = column + delta
+    if latency is not None:
+        values["latency_total"] = GoalProgress.latency_total + latency
+        values["latency_count"] = GoalProgress.latency_count + 1
+    if claimed_at is not None:
+        values["first_claimed_at"] = func.coalesce(GoalProgress.first_claimed_at, claimed_at)
+    if finished_at is not None:
+        values["last_finished_at"] = finished_at
+    if not values:
+        return
+
+    stmt = update(GoalProgress).where(GoalProgress.goal_id == goal_id).values(**values)
+    options = {"synchronize_session": False}
+    result = cast("CursorResult[Any]", await session.execute(stmt, execution_options=options))
+    if result.rowcount != 0:
+        return
+
+    # The session does not autoflush; the backfill must see this transaction's task rows
+    await session.flush()
+    try:
+        async with session.begin_nested():
+            row = await _count_tasks(session, goal_id)
+            if latency is not None:
+                row.latency_total, row.latency_count = latency, 1
+            row.first_claimed_at, row.last_finished_at = claimed_at, finished_at
+            session.add(row)
+    except IntegrityError:
+        # A concurrent writer backfilled first, without our uncommitted change
+        await session.execute(stmt, execution_options=options)
+
+async def record_transition(
+    session: AsyncSession,
+    goal_id: UUID,
+    previous: Optional[str],
+    current: str,
+    started_at: Optional[datetime] = None,
+    now: Optional[datetime] = None
+) -> None:
+    """Counts one task moving between states; latency is taken from claim (started_at) to result."""
+    if previous == current:
+        return
+    now = now or datetime.now(timezone.utc)
+    deltas = {state: delta for state, delta in ((previous, -1), (current, 1)) if state in STATE_COLUMNS}
+
+    latency = None
+    if current in FINISHED_STATES and previous == TaskState.ACTIVE.value and started_at is not None:
+        latency = max(0.0, (now - as_utc(started_at)).total_seconds())
+    await record_progress(
+        session, goal_id, deltas,
+        latency=latency,
+        claimed_at=now if current == TaskState.ACTIVE.value else None,
+        finished_at=now if current in FINISHED_STATES else None
+    )
+
+async def task_counts(session: AsyncSession, goal_id: UUID) -> Dict[str, int]:
+    """
+    Task counts per TaskState value, counted from the task rows as this transaction
+    sees them. Use it where a decision depends on the exact numbers (workflow guards);
+    the counters are for cheap reporting.
+    """
+    await session.flush()  # no autoflush: include this transaction's task changes
+    counts = {state: 0 for state in STATE_COLUMNS}
+    rows = await session.execute(
+        select(Task.status, func.count()).where(Task.goal_id == goal_id).group_by(Task.status)
+    )
+    for status, count in rows.all():
+        if status in counts:
+            counts[status] = count
+    return counts
+
+async def outstanding_tasks(session: AsyncSession, goal_id: UUID) -> int:
+    """Pending plus active tasks of the goal, counted from the task rows."""
+    await session.flush()  # no autoflush: include this transaction's task changes
+    return await session.scalar(
+        select(func.count()).where(
+            Task.goal_id == goal_id, Task.status.in_([TaskState.PENDING.value, TaskState.ACTIVE.value])
+        )
+    ) or 0
+
+async def get_progress(session: AsyncSession, goal_id: UUID) -> GoalProgress:
+    """Returns the goal's counter row, backfilling it once from its tasks. The caller commits."""
+    progress = await session.get(GoalProgress, goal_id)
+    if progress is None:
+        progress = await _count_tasks(session, goal_id)
+        session.add(progress)
+    return progress
+
+def summarize(progress: GoalProgress) -> Dict[str, Any]:
+    """Per-state counts, percent complete, mean claim-to-result latency and ETA."""
+    counts = {state: getattr(progress, column) or 0 for state, column in STATE_COLUMNS.items()}
+    total = sum(counts.values())
+    finished = counts[TaskState.COMPLETED.value] + counts[TaskState.FAILED.value]
+    remaining = total - finished
+
+    avg_latency = progress.latency_total / progress.latency_count if progress.latency_count else None
+
+    eta: Optional[float] = None
+    if total and not remaining:
+        eta = 0.0
+    elif avg_latency is not None:
+        eta = remaining * avg_latency
+        if progress.first_claimed_at and progress.last_finished_at:
+            # Observed throughput accounts for tasks running in parallel
+            elapsed = (as_utc(progress.last_finished_at) - as_utc(progress.first_claimed_at)).total_seconds()
+            if elapsed > 0:
+                eta = remaining * elapsed / progress.latency_count
+
+    return {
+        "counts": counts,
+        "total": total,
+        "percent_complete": round(100.0 * finished / total, 1) if total else 0.0,
+        "avg_latency_seconds": avg_latency,
+        "eta_seconds": eta,
+    }
+
+async def _count_tasks(session: AsyncSession, goal_id: UUID) -> GoalProgress:
+    progress = GoalProgress(goal_id=goal_id, pending=0, active=0, completed=0, failed=0, latency_total=0.0, latency_count=0)
+    for status, count in (await task_counts(session, goal_id)).items():
+        setattr(progress, STATE_COLUMNS[status], count)
+    return progress
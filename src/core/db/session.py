@@ -1,13 +1,25 @@
-from typing import AsyncGenerator
+from datetime import datetime, timezone
+from typing import Any, AsyncGenerator, Dict
 
 from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker, AsyncSession
 from src.shared.config import settings
 
+def _engine_options(url: str) -> Dict[str, Any]:
+    """Backend-specific engine options. SQLite is single-writer; PostgreSQL gets a real pool."""
+    if url.startswith("sqlite"):
+        return {}
+    return {
+        "pool_size": settings.DB_POOL_SIZE,
+        "max_overflow": settings.DB_MAX_OVERFLOW,
+        "pool_pre_ping": True,
+    }
+
 # Create the async engine with settings from the shared configuration
 engine = create_async_engine(
     settings.DATABASE_URL,
     echo=settings.DEBUG,
-    future=True
+    future=True,
+    **_engine_options(settings.DATABASE_URL)
 )
 
 # Configure the session factory
@@ -18,6 +30,10 @@ AsyncSessionLocal = async_sessionmaker(
     autoflush=False
 )
 
+def as_utc(value: datetime) -> datetime:
+    """SQLite hands back naive datetimes even for timezone-aware columns."""
+    return value if value.tzinfo else value.replace(tzinfo=timezone.utc)
+
 async def get_db() -> AsyncGenerator[AsyncSession, None]:
     """Dependency for providing a database session for FastAPI requests."""
     async with AsyncSessionLocal() as session:
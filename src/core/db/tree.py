@@ -0,0 +1,106 @@
+from typing import Any, Dict, List, Optional
+from uuid import UUID, uuid4
+
+from sqlalchemy import Select, and_, func, or_, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from src.core.db.models import Task
+from src.core.db.progress import FINISHED_STATES, record_transition
+from src.shared.config import settings
+from src.shared.models import TaskState
+
+def new_task(goal_id: UUID, parent: Optional[Task] = None, **fields: Any) -> Task:
+    """
+    Builds a task in its goal's tree. The id is assigned up front so the materialized
+    path (the ancestors' ids, then its own) is complete before the INSERT.
+    """
+    task_id = uuid4()
+    return Task(
+        id=task_id,
+        goal_id=goal_id,
+        parent_id=parent.id if parent is not None else None,
+        depth=parent.depth + 1 if parent is not None else 0,
+        path=f"{task_path(parent) if parent is not None else ''}{task_id.hex}/",
+        **fields
+    )
+
+def task_path(task: Task) -> str:
+    """The task's materialized path; rows created before paths existed count as roots."""
+    return task.path or f"{task.id.hex}/"
+
+def task_complexity(task: Task) -> int:
+    try:
+        return int((task.payload or {}).get("complexity") or 0)
+    except (TypeError, ValueError):
+        return 0
+
+def needs_expansion(
+    task: Task,
+    threshold: int = settings.TASK_EXPANSION_COMPLEXITY,
+    max_depth: int = settings.TASK_MAX_DEPTH
+) -> bool:
+    """True if the task should be split into subtasks instead of executed."""
+    if (task.payload or {}).get("leaf"):
+        return False # Expansion was refused or came back empty; run it as it is
+    return (task.depth or 0) < max_depth and task_complexity(task) >= threshold
+
+def subtree_query(task: Task, max_depth: Optional[int] = None) -> Select[Task]:
+    """
+    The task and its descendants in depth-first order, from one indexed range scan:
+
+        SELECT * FROM tasks WHERE path >= '<path>' AND path < '<path minus its "/">0' ORDER BY path;
+
+    Paths are hex ids joined by "/", and "0" is the character right after "/", so the
+    range holds exactly the paths starting with the task's. Unlike LIKE, a range
+    predicate uses the index whatever the column's collation.
+    `max_depth` limits how many levels below the task are returned.
+    """
+    prefix = task_path(task)
+    stmt = (
+        select(Task)
+        .where(or_(Task.id == task.id, and_(Task.path >= prefix, Task.path < prefix[:-1] + "0")))
+        .order_by(Task.path)
+    )
+    if max_depth is not None:
+        stmt = stmt.where(Task.depth <= (task.depth or 0) + max_depth)
+    return stmt
+
+async def subtree(session: AsyncSession, task: Task, max_depth: Optional[int] = None) -> List[Task]:
+    """Runs `subtree_query`."""
+    return list((await session.scalars(subtree_query(task, max_depth))).all())
+
+async def child_counts(session: AsyncSession, parent_id: UUID) -> Dict[str, int]:
+    """Direct subtasks of a task per status."""
+    await session.flush()  # no autoflush: include this transaction's task changes
+    rows = await session.execute(
+        select(Task.status, func.count()).where(Task.parent_id == parent_id).group_by(Task.status)
+    )
+    return {status: count for status, count in rows.all()}
+
+async def roll_up(session: AsyncSession, task: Task) -> List[Task]:
+    """
+    Settles the ancestors of a task that has just finished. A parent whose subtasks
+    have all finished becomes Completed, or Failed if any of them failed, and the
+    check repeats one level up. A parent is re-settled when a retried subtask changes
+    the outcome. Returns the parents whose status changed; the caller commits.
+    """
+    changed: List[Task] = []
+    parent_id = task.parent_id
+    while parent_id is not None:
+        counts = await child_counts(session, parent_id)
+        if not counts or any(status not in FINISHED_STATES for status in counts):
+            break
+        parent = await session.get(Task, parent_id)
+        if parent is None:
+            break
+        status = TaskState.FAILED.value if counts.get(TaskState.FAILED.value) else TaskState.COMPLETED.value
+        if parent.status == status:
+            break
+        previous = parent.status
+        parent.status = status
+        parent.result = {"subtasks": counts}
+        # No latency sample: a parent's time is its subtree's, already counted per leaf
+        await record_transition(session, parent.goal_id, previous, status)
+        changed.append(parent)
+        parent_id = parent.parent_id
+    return changed
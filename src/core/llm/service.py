@@ -1,9 +1,11 @@
 import os
 import logging
-from typing import Optional, Type, Any, Union
+from typing import Optional, Type, Any, Union, TYPE_CHECKING
 from pydantic import BaseModel
-from google import genai
-from google.genai import types
+
+# google.genai is heavy; it is imported on the first generate() call, not at startup.
+if TYPE_CHECKING:
+    from google import genai
 
 logger = logging.getLogger(__name__)
 
@@ -11,26 +13,38 @@ class LLMService:
     """
     Service for interacting with Google Gemini LLM.
     Supports structured output via Pydantic schemas.
+    The SDK client is created lazily on first use.
     """
     def __init__(self) -> None:
         self.api_key: Optional[str] = os.getenv("GOOGLE_API_KEY")
         if not self.api_key:
             logger.warning("GOOGLE_API_KEY not found. LLMService will fail if called.")
         
-        self.client: genai.Client = genai.Client(api_key=self.api_key)
+        self._client: Optional["genai.Client"] = None
         # Standardize on Gemini 2.0 Flash (latest stable-ish)
         self.model_name: str = "gemini-2.0-flash-exp"
 
+    @property
+    def client(self) -> "genai.Client":
+        if self._client is None:
+            from google import genai
+            self._client = genai.Client(api_key=self.api_key)
+        return self._client
+
     async def generate(
         self, 
         prompt: str, 
-        schema: Optional[Type[BaseModel]] = None
+        schema: Optional[Type[BaseModel]] = None,
+        model: Optional[str] = None
     ) -> Union[str, dict[str, Any], Any]:
         """
         Generates content from the LLM. 
         If a schema is provided, returns the parsed structured output.
+        `model` overrides the default model for this call.
         """
         try:
+            from google.genai import types
+
             config = types.GenerateContentConfig(
                 temperature=0.7,
             )
@@ -40,7 +54,7 @@ class LLMService:
                 config.response_schema = schema
 
             response = await self.client.aio.models.generate_content(
-                model=self.model_name,
+                model=model or self.model_name,
                 contents=prompt,
                 config=config
             )
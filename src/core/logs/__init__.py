@@ -0,0 +1,3 @@
+from src.core.logs.index import LogIndex
+
+__all__ = ["LogIndex"]
@@ -0,0 +1,264 @@
+import asyncio
+import logging
+from array import array
+from collections import deque
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Deque, Dict, Iterator, List, Optional, Tuple, TYPE_CHECKING
+
+from pydantic_core import to_json
+
+from src.shared.config import settings
+
+if TYPE_CHECKING:
+    from src.core.bus.bus import MessageBus, MessageEnvelope
+
+logger = logging.getLogger(__name__)
+
+# (timestamp, agent_id, level, message) as received from the bus
+RawEntry = Tuple[float, str, str, str]
+
+class LogIndex:
+    """
+    Bounded, queryable store for `agent.log` events.
+
+    Bus events are appended to a pending list and ingested in batches into a
+    columnar ring buffer (every ingest_interval, or as soon as max_pending lines
+    are queued, so a burst cannot grow the list without bound): parallel arrays of timestamps, interned agent and level
+    codes, and message strings, addressed by a monotonic sequence number
+    (slot = seq % capacity). Per-agent and per-level deques of sequence numbers
+    let filtered queries skip unrelated rows; stale index entries are trimmed as
+    the ring wraps. Rows evicted from the ring are appended to a daily NDJSON
+    file when a spill directory is configured.
+    """
+
+    TOPIC = "agent.log"
+
+    def __init__(
+        self,
+        bus: Optional["MessageBus"] = None,
+        capacity: int = settings.LOG_BUFFER_SIZE,
+        ingest_interval: float = settings.LOG_INGEST_INTERVAL,
+        max_pending: int = settings.LOG_MAX_PENDING,
+        max_message_length: int = settings.LOG_MAX_MESSAGE_LENGTH,
+        spill_dir: Optional[Path] = settings.LOG_SPILL_DIR
+    ) -> None:
+        self.bus: Optional["MessageBus"] = bus
+        self.capacity: int = capacity
+        self.ingest_interval: float = ingest_interval
+        self.max_pending: int = max_pending
+        self.max_message_length: int = max_message_length
+        self.spill_dir: Optional[Path] = spill_dir
+
+        self._timestamps: "array[float]" = array("d", bytes(8 * capacity))
+        self._agents: "array[int]" = array("I", bytes(4 * capacity))
+        self._levels: "array[int]" = array("H", bytes(2 * capacity))
+        self._messages: List[str] = [""] * capacity
+
+        self._agent_codes: Dict[str, int] = {}
+        self._agent_names: List[str] = []
+        self._level_codes: Dict[str, int] = {}
+        self._level_names: List[str] = []
+        self._by_agent: Dict[int, Deque[int]] = {}
+        self._by_level: Dict[int, Deque[int]] = {}
+
+        self._next_seq: int = 0
+        self._pending: List[RawEntry] = []
+        self._spill: List[Dict[str, Any]] = []
+        self._ingest_task: Optional[asyncio.Task[None]] = None
+        self._spill_due: asyncio.Event = asyncio.Event()
+
+        self.spilled: int = 0
+
+    @property
+    def first_seq(self) -> int:
+        """Oldest sequence number still held in memory."""
+        return max(0, self._next_seq - self.capacity)
+
+    def __len__(self) -> int:
+        return self._next_seq - self.first_seq
+
+    async def start(self) -> None:
+        if self.bus is not None:
+            await self.bus.subscribe(self.TOPIC, self.record)
+        self._ingest_task = asyncio.create_task(self._ingest_loop())
+
+    async def stop(self) -> None:
+        if self._ingest_task:
+            self._ingest_task.cancel()
+            try:
+                await self._ingest_task
+            except asyncio.CancelledError:
+                pass
+            self._ingest_task = None
+        self.ingest()
+        await asyncio.to_thread(self._write_spill)
+
+    async def record(self, envelope: "MessageEnvelope") -> None:
+        """Bus callback: queues one line for the next ingestion batch."""
+        payload = envelope.payload if isinstance(envelope.payload, dict) else {"message": envelope.payload}
+        self._queue((
+            envelope.timestamp.timestamp(),
+            str(payload.get("agent_id") or envelope.source_id),
+            str(payload.get("level") or "INFO").upper()[:16],
+            str(payload.get("message", ""))[:self.max_message_length]
+        ))
+
+    def append(self, timestamp: datetime, agent_id: str, level: str, message: str) -> None:
+        self._queue((timestamp.timestamp(), agent_id, level.upper()[:16], message[:self.max_message_length]))
+
+    def _queue(self, entry: RawEntry) -> None:
+        self._pending.append(entry)
+        if len(self._pending) >= self.max_pending:
+            self.ingest()
+
+    def ingest(self) -> int:
+        """Moves pending lines into the ring buffer. Returns the number ingested."""
+        batch, self._pending = self._pending, []
+        for ts, agent_id, level, message in batch:
+            seq = self._next_seq
+            slot = seq % self.capacity
+            if seq >= self.capacity:
+                self._evict(slot)
+
+            agent = self._intern(agent_id, self._agent_codes, self._agent_names)
+            level_code = self._intern(level, self._level_codes, self._level_names)
+            self._timestamps[slot] = ts
+            self._agents[slot] = agent
+            self._levels[slot] = level_code
+            self._messages[slot] = message
+            self._by_agent.setdefault(agent, deque()).append(seq)
+            self._by_level.setdefault(level_code, deque()).append(seq)
+            self._next_seq += 1
+
+        if len(self._spill) >= self.max_pending:
+            self._spill_due.set() # write evicted rows out before the next tick
+        if batch:
+            # Keep index deques proportional to the live window.
+            first = self.first_seq
+            for index in (self._by_agent, self._by_level):
+                for seqs in index.values():
+                    while seqs and seqs[0] < first:
+                        seqs.popleft()
+        return len(batch)
+
+    def query(
+        self,
+        since: Optional[datetime] = None,
+        until: Optional[datetime] = None,
+        agent_id: Optional[str] = None,
+        level: Optional[str] = None,
+        text: Optional[str] = None,
+        limit: int = 100,
+        before_seq: Optional[int] = None
+    ) -> List[Dict[str, Any]]:
+        """
+        Returns up to `limit` matching lines, newest first.
+        `text` is a case-insensitive substring match; `before_seq` pages backwards.
+        """
+        self.ingest()
+        candidates = self._candidates(agent_id, level)
+        if candidates is None:
+            return []
+
+        since_ts = since.timestamp() if since else None
+        until_ts = until.timestamp() if until else None
+        needle = text.lower() if text else None
+
+        results: List[Dict[str, Any]] = []
+        for seq in candidates:
+            if before_seq is not None and seq >= before_seq:
+                continue
+            slot = seq % self.capacity
+            ts = self._timestamps[slot]
+            if since_ts is not None and ts < since_ts:
+                continue
+            if until_ts is not None and ts > until_ts:
+                continue
+            message = self._messages[slot]
+            if needle is not None and needle not in message.lower():
+                continue
+            results.append(self._row(seq, slot))
+            if len(results) >= limit:
+                break
+        return results
+
+    def _candidates(self, agent_id: Optional[str], level: Optional[str]) -> Optional[Iterator[int]]:
+        """Newest-first sequence numbers to scan; None when a filter value was never seen."""
+        first = self.first_seq
+        indexed: List[Deque[int]] = []
+        if agent_id is not None:
+            code = self._agent_codes.get(agent_id)
+            if code is None:
+                return None
+            indexed.append(self._by_agent[code])
+        if level is not None:
+            code = self._level_codes.get(level.upper())
+            if code is None:
+                return None
+            indexed.append(self._by_level[code])
+
+        if not indexed:
+            return iter(range(self._next_seq - 1, first - 1, -1))
+
+        # Scan the smaller index; check the other filter per row.
+        seqs = min(indexed, key=len)
+        agent_code = self._agent_codes.get(agent_id) if agent_id is not None else None
+        level_code = self._level_codes.get(level.upper()) if level is not None else None
+        return (
+            seq for seq in reversed(seqs)
+            if seq >= first
+            and (agent_code is None or self._agents[seq % self.capacity] == agent_code)
+            and (level_code is None or self._levels[seq % self.capacity] == level_code)
+        )
+
+    def _row(self, seq: int, slot: int) -> Dict[str, Any]:
+        return {
+            "seq": seq,
+            "timestamp": datetime.fromtimestamp(self._timestamps[slot], tz=timezone.utc),
+            "agent_id": self._agent_names[self._agents[slot]],
+            "level": self._level_names[self._levels[slot]],
+            "message": self._messages[slot],
+        }
+
+    def _evict(self, slot: int) -> None:
+        if self.spill_dir is not None:
+            self._spill.append(self._row(self._next_seq - self.capacity, slot))
+        self._messages[slot] = ""
+
+    @staticmethod
+    def _intern(value: str, codes: Dict[str, int], names: List[str]) -> int:
+        code = codes.get(value)
+        if code is None:
+            code = codes[value] = len(names)
+            names.append(value)
+        return code
+
+    def _write_spill(self) -> None:
+        if not self._spill or self.spill_dir is None:
+            return
+        rows, self._spill = self._spill, []
+        self.spill_dir.mkdir(parents=True, exist_ok=True)
+        files: Dict[str, List[bytes]] = {}
+        for row in rows:
+            files.setdefault(row["timestamp"].strftime("%Y%m%d"), []).append(to_json(row) + b"\n")
+        for day, lines in files.items():
+            with open(self.spill_dir / f"agent-log-{day}.ndjson", "ab") as f:
+                f.writelines(lines)
+        self.spilled += len(rows)
+
+    async def _ingest_loop(self) -> None:
+        while True:
+            try:
+                try:
+                    await asyncio.wait_for(self._spill_due.wait(), self.ingest_interval)
+                except asyncio.TimeoutError:
+                    pass
+                self._spill_due.clear()
+                self.ingest()
+                if self._spill:
+                    await asyncio.to_thread(self._write_spill)
+            except asyncio.CancelledError:
+                break
+            except Exception as e:
+                logger.error("Error in log ingestion loop: %s", e)
@@ -1,5 +1,10 @@
 from src.core.workflow.engine import WorkflowEngine
-from src.core.workflow.state import WorkflowState, TransitionError, TRANSITION_MAP, validate_transition
-from src.core.workflow.guards import check_guards
+from src.core.workflow.state import WorkflowState, TransitionError, TransitionConflictError, validate_transition
+from src.core.workflow.guards import GuardResultCache, check_guards, guard, guard_session
+from src.core.workflow.definition import WorkflowDefinition, WorkflowDefinitionError, WorkflowRegistry, WorkflowSpec, compile_workflow, default_registry
+from src.core.workflow.admission import AdmissionController
+from src.core.workflow.history import WorkflowHistory, GoalHistory
+from src.core.workflow.timers import TimerWheel, WorkflowTimers
+from src.core.workflow.speculation import LatencyTracker, SpeculationPolicy
 
-__all__ = ["WorkflowEngine", "WorkflowState", "TransitionError", "TRANSITION_MAP", "validate_transition", "check_guards"]
+__all__ = ["WorkflowEngine", "AdmissionController", "WorkflowHistory", "GoalHistory", "TimerWheel", "WorkflowTimers", "LatencyTracker", "SpeculationPolicy", "WorkflowState", "TransitionError", "TransitionConflictError", "validate_transition", "check_guards", "guard", "guard_session", "GuardResultCache", "WorkflowDefinition", "WorkflowDefinitionError", "WorkflowRegistry", "WorkflowSpec", "compile_workflow", "default_registry"]
@@ -0,0 +1,128 @@
+import logging
+import math
+import time
+from collections import deque
+from typing import Any, Deque, FrozenSet, Optional, Set, TYPE_CHECKING
+
+from sqlalchemy import select
+
+from src.core.db.session import AsyncSessionLocal
+from src.core.db.models import Goal
+from src.core.workflow.state import WorkflowState
+from src.shared.config import settings
+
+if TYPE_CHECKING:
+    from src.core.bus.bus import MessageBus, MessageEnvelope
+
+logger = logging.getLogger(__name__)
+
+# Goals in these states are still waiting for Lyra's decomposition.
+BACKLOG_STATES: FrozenSet[str] = frozenset({
+    WorkflowState.INITIALIZATION.value,
+    WorkflowState.TASK_DECOMPOSITION.value,
+})
+
+class AdmissionController:
+    """
+    Tracks the decomposition backlog (goals started but not yet decomposed)
+    from workflow events, and refuses new goals while it is above the limit.
+    The Retry-After hint is derived from the recently observed drain rate.
+
+    Admitted goals are reserved until their workflow.goal_started event arrives, so
+    requests racing each other between admission and insert cannot together overshoot
+    the limit. The reservation count is per process: a started goal takes one
+    reservation back wherever it was admitted.
+    """
+
+    def __init__(
+        self,
+        bus: "MessageBus",
+        session_factory: Any = AsyncSessionLocal,
+        max_backlog: int = settings.GOAL_BACKLOG_LIMIT,
+        default_retry_after: float = 10.0,
+        max_retry_after: float = 300.0
+    ) -> None:
+        self.bus: "MessageBus" = bus
+        self.session_factory = session_factory
+        self.max_backlog: int = max_backlog
+        self.default_retry_after: float = default_retry_after
+        self.max_retry_after: float = max_retry_after
+        self._backlog: Set[str] = set()
+        self._reserved: int = 0 # Admitted goals whose goal_started has not arrived yet
+        self._drained: Deque[float] = deque(maxlen=100)
+        self._subscribed: bool = False
+
+    @property
+    def backlog(self) -> int:
+        return len(self._backlog) + self._reserved
+
+    async def start(self) -> None:
+        """Seeds the backlog from the DB, then follows workflow events."""
+        async with self.session_factory() as session:
+            ids = (await session.scalars(select(Goal.id).where(Goal.status.in_(BACKLOG_STATES)))).all()
+        self._backlog.update(str(goal_id) for goal_id in ids)
+        if self._subscribed:
+            return
+        self._subscribed = True
+        await self.bus.subscribe("workflow.goal_started", self._on_started)
+        await self.bus.subscribe("workflow.tasks_generated", self._on_decomposed)
+        await self.bus.subscribe("workflow.state_change", self._on_state_change)
+
+    def retry_after(self, count: int = 1) -> Optional[int]:
+        """
+        Returns None if `count` new goals may be admitted, else seconds to wait.
+        Waiting cannot help a batch larger than the limit itself; see `fits`.
+        """
+        excess = self.backlog + count - self.max_backlog
+        if excess <= 0:
+            return None
+        rate = self._drain_rate()
+        seconds = excess / rate if rate else self.default_retry_after
+        return int(math.ceil(min(max(seconds, 1.0), self.max_retry_after)))
+
+    def reserve(self, count: int) -> Optional[int]:
+        """
+        Admits `count` new goals if the backlog has room, holding their slots until
+        they start; no await separates the check from the reservation. Returns None
+        once reserved, else seconds to wait (nothing is reserved).
+        """
+        retry_after = self.retry_after(count)
+        if retry_after is None:
+            self._reserved += count
+        return retry_after
+
+    def release(self, count: int) -> None:
+        """Returns reserved slots of goals that were not created after all."""
+        self._reserved = max(0, self._reserved - count)
+
+    def fits(self, count: int) -> bool:
+        """Whether `count` goals could ever be admitted together."""
+        return count <= self.max_backlog
+
+    def _drain_rate(self) -> Optional[float]:
+        """Goals leaving the backlog per second over the recent window."""
+        if len(self._drained) < 2:
+            return None
+        elapsed = self._drained[-1] - self._drained[0]
+        return (len(self._drained) - 1) / elapsed if elapsed > 0 else None
+
+    def _drain(self, goal_id: str) -> None:
+        if goal_id in self._backlog:
+            self._backlog.discard(goal_id)
+            self._drained.append(time.monotonic())
+
+    async def _on_started(self, envelope: "MessageEnvelope") -> None:
+        goal_id = str(envelope.payload.get("goal_id"))
+        if goal_id not in self._backlog:
+            self._backlog.add(goal_id)
+            self.release(1)
+
+    async def _on_decomposed(self, envelope: "MessageEnvelope") -> None:
+        self._drain(str(envelope.payload.get("goal_id")))
+
+    async def _on_state_change(self, envelope: "MessageEnvelope") -> None:
+        goal_id = str(envelope.payload.get("goal_id"))
+        if envelope.payload.get("new_state") in BACKLOG_STATES:
+            self._backlog.add(goal_id)
+        else:
+            self._drain(goal_id)
@@ -0,0 +1,246 @@
+import json
+from pathlib import Path
+from types import MappingProxyType
+from typing import Any, Dict, Final, FrozenSet, Iterable, Iterator, List, Literal, Mapping, Optional, Tuple
+
+from pydantic import BaseModel, ConfigDict, ValidationError, model_validator
+
+from src.core.workflow.guards import GuardFunction, resolve_guard
+from src.core.workflow.state import WorkflowState, WorkflowTransition, TransitionError
+from src.shared.config import settings
+
+# Shipped definitions; settings.WORKFLOW_DEFINITIONS_DIR may add more
+BUILTIN_DIR = Path(__file__).resolve().parent / "definitions"
+
+# Signals a reaction can fire on
+ON_ENTER: Final = "enter" # the goal entered the state
+ON_TASKS_FINISHED: Final = "tasks_finished" # the goal's last pending/active task reached a final state
+
+class WorkflowReaction(BaseModel):
+    """
+    What the Director does when a signal arrives for a goal in a state. Advance
+    reactions are tried in order; the first transition whose guards pass wins.
+    """
+    model_config = ConfigDict(frozen=True)
+
+    on: Literal["enter", "tasks_finished"] = ON_ENTER
+    action: Literal["advance", "delegate"]
+    target: Optional[WorkflowState] = None # advance: the state to move to
+    agent: Optional[str] = None # delegate: who picks it up (for logs)
+    topic: Optional[str] = None # delegate: bus topic receiving {goal_id, title, description}
+
+    @model_validator(mode="after")
+    def _check_arguments(self) -> "WorkflowReaction":
+        if self.action == "advance" and self.target is None:
+            raise ValueError("'advance' reactions need a target state")
+        if self.action == "delegate" and not self.topic:
+            raise ValueError("'delegate' reactions need a topic")
+        return self
+
+class WorkflowSpec(BaseModel):
+    """A workflow definition as written in a definition file."""
+    name: str
+    version: int
+    description: str = ""
+    initial: WorkflowState
+    transitions: List[WorkflowTransition]
+    reactions: Dict[WorkflowState, List[WorkflowReaction]] = {}
+
+class WorkflowDefinitionError(ValueError):
+    """Raised when a workflow definition fails validation."""
+    pass
+
+class WorkflowDefinition:
+    """
+    A compiled, immutable workflow. States are numbered once; allowed transitions and
+    reachability are flat bytes tables, so a transition check is one index into them.
+    """
+    __slots__ = (
+        "name", "version", "key", "description", "initial", "states",
+        "_index", "_size", "_allowed", "_reachable", "_guards", "_reactions"
+    )
+
+    def __init__(
+        self,
+        spec: WorkflowSpec,
+        states: Tuple[WorkflowState, ...],
+        allowed: bytes,
+        reachable: bytes,
+        guards: Tuple[Tuple[GuardFunction, ...], ...],
+        reactions: Mapping[Tuple[WorkflowState, str], Tuple[WorkflowReaction, ...]]
+    ) -> None:
+        self.name: str = spec.name
+        self.version: int = spec.version
+        self.key: str = f"{spec.name}@{spec.version}"
+        self.description: str = spec.description
+        self.initial: WorkflowState = spec.initial
+        self.states: Tuple[WorkflowState, ...] = states
+        self._index: Mapping[WorkflowState, int] = MappingProxyType({state: i for i, state in enumerate(states)})
+        self._size: int = len(states)
+        self._allowed: bytes = allowed
+        self._reachable: bytes = reachable
+        self._guards: Tuple[Tuple[GuardFunction, ...], ...] = guards
+        self._reactions: Mapping[Tuple[WorkflowState, str], Tuple[WorkflowReaction, ...]] = reactions
+
+    def _cell(self, current: WorkflowState, target: WorkflowState) -> int:
+        i, j = self._index.get(current), self._index.get(target)
+        return -1 if i is None or j is None else i * self._size + j
+
+    def allows(self, current: WorkflowState, target: WorkflowState) -> bool:
+        cell = self._cell(current, target)
+        return cell >= 0 and self._allowed[cell] == 1
+
+    def validate(self, current: WorkflowState, target: WorkflowState) -> bool:
+        if not self.allows(current, target):
+            raise TransitionError(f"Invalid transition: {current} -> {target} (workflow {self.key})")
+        return True
+
+    def can_reach(self, current: WorkflowState, target: WorkflowState) -> bool:
+        """True if some sequence of transitions leads from current to target."""
+        cell = self._cell(current, target)
+        return cell >= 0 and self._reachable[cell] == 1
+
+    def guards(self, current: WorkflowState, target: WorkflowState) -> Tuple[GuardFunction, ...]:
+        cell = self._cell(current, target)
+        return self._guards[cell] if cell >= 0 else ()
+
+    def targets(self, current: WorkflowState) -> FrozenSet[WorkflowState]:
+        return frozenset(state for state in self.states if self.allows(current, state))
+
+    def reactions(self, state: WorkflowState, on: str = ON_ENTER) -> Tuple[WorkflowReaction, ...]:
+        return self._reactions.get((state, on), ())
+
+    def describe(self) -> Dict[str, object]:
+        return {
+            "key": self.key,
+            "name": self.name,
+            "version": self.version,
+            "description": self.description,
+            "initial": self.initial.value,
+            "transitions": {
+                state.value: sorted(target.value for target in self.targets(state)) for state in self.states
+            },
+        }
+
+def compile_workflow(spec: WorkflowSpec) -> WorkflowDefinition:
+    """Validates a spec and builds its lookup tables."""
+    import networkx as nx
+
+    graph: "nx.DiGraph[Any]" = nx.DiGraph()
+    graph.add_node(spec.initial)
+    errors: List[str] = []
+    edge_guards: Dict[Tuple[WorkflowState, WorkflowState], Tuple[GuardFunction, ...]] = {}
+
+    for transition in spec.transitions:
+        edge = (transition.from_state, transition.to_state)
+        if edge in edge_guards:
+            errors.append(f"duplicate transition {edge[0].value} -> {edge[1].value}")
+            continue
+        resolved: List[GuardFunction] = []
+        for name in transition.required_conditions:
+            try:
+                resolved.append(resolve_guard(name))
+            except KeyError:
+                errors.append(f"unknown guard '{name}' on {edge[0].value} -> {edge[1].value}")
+        edge_guards[edge] = tuple(resolved)
+        graph.add_edge(*edge)
+
+    unreachable = set(graph.nodes) - nx.descendants(graph, spec.initial) - {spec.initial}
+    if unreachable:
+        errors.append("states unreachable from the initial state: " + ", ".join(sorted(s.value for s in unreachable)))
+
+    for state, reactions in spec.reactions.items():
+        if state not in graph:
+            errors.append(f"reactions for unknown state {state.value}")
+        for reaction in reactions:
+            if reaction.target is not None and not graph.has_edge(state, reaction.target):
+                errors.append(f"reaction advances {state.value} -> {reaction.target.value}, which is not a transition")
+
+    if errors:
+        raise WorkflowDefinitionError(f"Workflow {spec.name}@{spec.version}: " + "; ".join(errors))
+
+    states = tuple(sorted(graph.nodes, key=lambda s: list(WorkflowState).index(s)))
+    index = {state: i for i, state in enumerate(states)}
+    size = len(states)
+    allowed = bytearray(size * size)
+    reachable = bytearray(size * size)
+    guard_table: List[Tuple[GuardFunction, ...]] = [()] * (size * size)
+    reaction_table: Dict[Tuple[WorkflowState, str], Tuple[WorkflowReaction, ...]] = {}
+    for state, state_reactions in spec.reactions.items():
+        for signal in (ON_ENTER, ON_TASKS_FINISHED):
+            matching = tuple(r for r in state_reactions if r.on == signal)
+            if matching:
+                reaction_table[(state, signal)] = matching
+    for (source, target), guards in edge_guards.items():
+        allowed[index[source] * size + index[target]] = 1
+        guard_table[index[source] * size + index[target]] = guards
+    for source in states:
+        for target in nx.descendants(graph, source):
+            reachable[index[source] * size + index[target]] = 1
+
+    return WorkflowDefinition(
+        spec,
+        states=states,
+        allowed=bytes(allowed),
+        reachable=bytes(reachable),
+        guards=tuple(guard_table),
+        reactions=MappingProxyType(reaction_table)
+    )
+
+def load_workflow(path: Path) -> WorkflowDefinition:
+    try:
+        spec = WorkflowSpec.model_validate(json.loads(path.read_text(encoding="utf-8")))
+    except (ValueError, ValidationError) as e:
+        raise WorkflowDefinitionError(f"{path.name}: {e}") from e
+    return compile_workflow(spec)
+
+class WorkflowRegistry:
+    """
+    Compiled workflow definitions by key ("name@version"). Goals record the key they
+    started under, so several versions of a workflow run side by side.
+    """
+
+    def __init__(self, definitions: Iterable[WorkflowDefinition] = (), default: Optional[str] = None) -> None:
+        self._definitions: Dict[str, WorkflowDefinition] = {}
+        for definition in definitions:
+            self.register(definition)
+        self.default_key: Optional[str] = default
+
+    def register(self, definition: WorkflowDefinition) -> None:
+        if definition.key in self._definitions:
+            raise WorkflowDefinitionError(f"Workflow {definition.key} is already registered")
+        self._definitions[definition.key] = definition
+
+    def get(self, key: Optional[str] = None) -> WorkflowDefinition:
+        """Returns the definition for key, or the default one for None (goals created before versioning)."""
+        key = key or self.default_key
+        definition = self._definitions.get(key) if key else None
+        if definition is None:
+            raise ValueError(f"Unknown workflow '{key}'")
+        return definition
+
+    def keys(self) -> List[str]:
+        return sorted(self._definitions)
+
+    def __iter__(self) -> Iterator[WorkflowDefinition]:
+        return iter(self._definitions.values())
+
+    @classmethod
+    def load(cls, *directories: Optional[Path], default: str = settings.WORKFLOW_DEFAULT) -> "WorkflowRegistry":
+        registry = cls(default=default)
+        for directory in directories:
+            if directory is None:
+                continue
+            for path in sorted(Path(directory).glob("*.json")):
+                registry.register(load_workflow(path))
+        registry.get(default)  # fail at startup, not on the first transition
+        return registry
+
+_registry: Optional[WorkflowRegistry] = None
+
+def default_registry() -> WorkflowRegistry:
+    """The process-wide registry: built-in definitions plus WORKFLOW_DEFINITIONS_DIR, loaded once."""
+    global _registry
+    if _registry is None:
+        _registry = WorkflowRegistry.load(BUILTIN_DIR, settings.WORKFLOW_DEFINITIONS_DIR)
+    return _registry
@@ -1,68 +1,195 @@
-from typing import Any, TYPE_CHECKING
-from uuid import UUID
+import asyncio
+from typing import Any, Dict, List, Optional, Sequence, Tuple, TYPE_CHECKING
+from uuid import UUID, uuid4
 from datetime import datetime, timezone
 
-from src.core.workflow.state import WorkflowState, validate_transition
+from sqlalchemy import insert, update
+from sqlalchemy.orm.attributes import set_committed_value
+
+from src.core.workflow.state import WorkflowState, TransitionConflictError
 from src.core.db.session import AsyncSessionLocal
 from src.core.db.models import Goal
+from src.core.db.cache import EntityCache, entity_cache
+from src.core.workflow.definition import WorkflowRegistry, default_registry
+from src.core.workflow.history import WorkflowHistory
+from src.shared.config import settings
+from src.shared.models import TaskPriority
 
 if TYPE_CHECKING:
     from src.core.bus.bus import MessageBus
 
-from src.core.workflow.guards import check_guards
+from src.core.workflow.guards import GuardResultCache, check_guards
 
 class WorkflowEngine:
     def __init__(
         self, 
         bus: "MessageBus", 
-        session_factory: Any = AsyncSessionLocal
+        session_factory: Any = AsyncSessionLocal,
+        cache: EntityCache = entity_cache,
+        max_transition_retries: int = settings.TRANSITION_MAX_RETRIES,
+        history: Optional[WorkflowHistory] = None,
+        guard_cache: Optional[GuardResultCache] = None,
+        workflows: Optional[WorkflowRegistry] = None
     ) -> None:
         self.bus: "MessageBus" = bus
         self.session_factory = session_factory
+        self.cache: EntityCache = cache
+        self.max_transition_retries: int = max_transition_retries
+        self.history: WorkflowHistory = history or WorkflowHistory(session_factory, cache=cache)
+        self.guard_cache: GuardResultCache = guard_cache or GuardResultCache()
+        self.workflows: WorkflowRegistry = workflows or default_registry()
 
-    async def initialize_goal(self, title: str, description: str) -> UUID:
-        """Starts a new orchestration cycle (N1)."""
+    async def initialize_goal(
+        self,
+        title: str,
+        description: str,
+        workflow: Optional[str] = None,
+        priority: TaskPriority = TaskPriority.MEDIUM
+    ) -> UUID:
+        """
+        Starts a new orchestration cycle in the initial state of the given workflow
+        definition (default: settings.WORKFLOW_DEFAULT). Raises ValueError for unknown keys.
+        The goal's tasks inherit its priority.
+        """
+        definition = self.workflows.get(workflow)
         async with self.session_factory() as session:
             goal = Goal(
+                id=uuid4(),
                 title=title,
                 description=description,
-                status=WorkflowState.INITIALIZATION.value
+                status=definition.initial.value,
+                version=1,
+                workflow=definition.key,
+                priority=TaskPriority(priority).value,
+                created_at=datetime.now(timezone.utc)
             )
             session.add(goal)
+            await session.flush()
+            await self.history.record(session, goal.id, 1, None, goal.status, goal.created_at)
             await session.commit()
             await session.refresh(goal)
+            self.cache.put(goal)
             
             await self.bus.publish("workflow.goal_started", {
                 "goal_id": str(goal.id), 
                 "title": title,
+                "workflow": goal.workflow,
                 "timestamp": datetime.now(timezone.utc).isoformat()
             })
             
             return goal.id
 
-    async def transition_phase(self, goal_id: UUID, target_state: WorkflowState) -> bool:
-        """Attempts to move the goal to the next phase."""
+    async def initialize_goals(
+        self,
+        goals: Sequence[Tuple[str, str]],
+        publish_batch_size: int = settings.GOAL_PUBLISH_BATCH_SIZE,
+        workflow: Optional[str] = None,
+        priority: TaskPriority = TaskPriority.MEDIUM
+    ) -> List[UUID]:
+        """
+        Starts many orchestration cycles at once: a single multi-row INSERT in one
+        transaction, then goal_started events published in batches, yielding to the
+        event loop between batches so request handling and agents keep up.
+        """
+        definition = self.workflows.get(workflow)
+        now = datetime.now(timezone.utc)
+        rows: List[Dict[str, Any]] = [
+            {
+                "id": uuid4(),
+                "title": title,
+                "description": description,
+                "status": definition.initial.value,
+                "workflow": definition.key,
+                "priority": TaskPriority(priority).value,
+                "created_at": now
+            }
+            for title, description in goals
+        ]
+        if not rows:
+            return []
+
         async with self.session_factory() as session:
-            goal = await session.get(Goal, goal_id)
-            if not goal:
-                raise ValueError(f"Goal {goal_id} not found")
-            
-            # 1. Validate Transition
-            current_state = WorkflowState(goal.status)
-            validate_transition(current_state, target_state)
-            
-            # 2. Check Guards
-            await check_guards(goal, target_state)
-            
-            # 3. Update State
-            previous_state = current_state
-            goal.status = target_state.value
+            await session.execute(insert(Goal), rows)
+            await self.history.record_created(session, rows)
             await session.commit()
-            
-            # 4. Trigger Entry Actions (Side effects)
-            await self._on_enter_state(goal, target_state, previous_state)
-            
-            return True
+
+        timestamp = now.isoformat()
+        for start in range(0, len(rows), publish_batch_size):
+            for row in rows[start:start + publish_batch_size]:
+                await self.bus.publish("workflow.goal_started", {
+                    "goal_id": str(row["id"]),
+                    "title": row["title"],
+                    "workflow": definition.key,
+                    "timestamp": timestamp
+                })
+            await asyncio.sleep(0)
+
+        return [row["id"] for row in rows]
+
+    async def transition_phase(self, goal_id: UUID, target_state: WorkflowState) -> bool:
+        """
+        Attempts to move the goal to the next phase.
+
+        The status is written with a compare-and-swap on the goal version:
+
+            UPDATE goals SET status=:target, version=:v + 1 WHERE id=:id AND version=:v;
+
+        If another writer got there first, the goal is re-read and the transition
+        validated again, up to max_transition_retries times. Since every transition
+        leaves its source state, at most one of two racing transitions can succeed.
+        """
+        for _ in range(self.max_transition_retries + 1):
+            async with self.session_factory() as session:
+                goal = await self.cache.get_for_update(session, Goal, goal_id)
+                if not goal:
+                    raise ValueError(f"Goal {goal_id} not found")
+                
+                # 1. Validate Transition against the definition the goal runs under
+                definition = self.workflows.get(goal.workflow)
+                current_state = WorkflowState(goal.status)
+                definition.validate(current_state, target_state)
+                
+                # 2. Check Guards
+                await check_guards(goal, target_state, self.guard_cache, definition)
+                
+                # 3. Update State (compare-and-swap)
+                previous_state = current_state
+                expected_version = goal.version
+                try:
+                    result = await session.execute(
+                        update(Goal)
+                        .where(Goal.id == goal_id, Goal.version == expected_version)
+                        .values(status=target_state.value, version=expected_version + 1),
+                        execution_options={"synchronize_session": False}
+                    )
+                    if result.rowcount != 1:
+                        # Lost the race: drop the stale snapshot and re-read
+                        await session.rollback()
+                        self.cache.invalidate(Goal, goal_id)
+                        continue
+                    # The event commits with the status it explains
+                    await self.history.record(
+                        session, goal_id, expected_version + 1,
+                        previous_state.value, target_state.value, datetime.now(timezone.utc)
+                    )
+                    await session.commit()
+                except Exception:
+                    self.cache.invalidate(Goal, goal_id)
+                    raise
+                self.guard_cache.invalidate(goal_id)
+                set_committed_value(goal, "status", target_state.value)
+                set_committed_value(goal, "version", expected_version + 1)
+                self.cache.put(goal)
+                
+                # 4. Trigger Entry Actions (Side effects)
+                await self._on_enter_state(goal, target_state, previous_state)
+                
+                return True
+
+        raise TransitionConflictError(
+            f"Goal {goal_id} changed concurrently {self.max_transition_retries + 1} times; "
+            f"transition to {target_state.value} abandoned"
+        )
 
     async def _on_enter_state(
         self, 
@@ -75,5 +202,6 @@ class WorkflowEngine:
             "goal_id": str(goal.id),
             "previous_state": previous_state.value,
             "new_state": state.value,
+            "workflow": goal.workflow,
             "timestamp": datetime.now(timezone.utc).isoformat()
         })
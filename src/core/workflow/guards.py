@@ -1,39 +1,291 @@
-from typing import Awaitable, Callable, Dict, List, Tuple
+import asyncio
+from collections import OrderedDict
+from contextlib import asynccontextmanager
+from contextvars import ContextVar
+from typing import Any, AsyncIterator, Awaitable, Callable, Dict, List, Optional, Sequence, Set, Tuple, TYPE_CHECKING
+from uuid import UUID
+
+from sqlalchemy.ext.asyncio import AsyncSession, async_object_session
+
 from src.core.db.models import Goal
+from src.core.db.progress import task_counts
+from src.core.db.session import AsyncSessionLocal
 from src.core.workflow.state import WorkflowState, TransitionError
+from src.shared.config import settings
+from src.shared.models import TaskState
+
+if TYPE_CHECKING:
+    from src.core.workflow.definition import WorkflowDefinition
 
 # Guards are async functions that take a Goal and return True if valid, or raise/return False.
 GuardFunction = Callable[[Goal], Awaitable[bool]]
 
+class GuardSpec:
+    """What check_guards needs to schedule a guard: its relative cost and prerequisites."""
+    __slots__ = ("func", "name", "cost", "depends_on", "cacheable")
+
+    def __init__(
+        self,
+        func: GuardFunction,
+        cost: float,
+        depends_on: Sequence[GuardFunction],
+        cacheable: bool
+    ) -> None:
+        self.func: GuardFunction = func
+        self.name: str = func.__name__
+        self.cost: float = cost
+        self.depends_on: Tuple[GuardFunction, ...] = tuple(depends_on)
+        self.cacheable: bool = cacheable
+
+_SPECS: Dict[GuardFunction, GuardSpec] = {}
+_BY_NAME: Dict[str, GuardFunction] = {}
+_PLANS: Dict[Tuple[GuardFunction, ...], List[List[GuardSpec]]] = {}
+
+def guard(
+    cost: float = 1.0,
+    depends_on: Sequence[GuardFunction] = (),
+    cacheable: bool = True
+) -> Callable[[GuardFunction], GuardFunction]:
+    """
+    Declares a guard's scheduling metadata and registers it by function name, which is
+    how workflow definitions refer to it.
+
+    cost: rough relative expense; guards above settings.GUARD_CHEAP_COST (DB queries,
+        LLM calls) only start once every cheap guard of the transition has passed.
+    depends_on: guards that must pass before this one runs.
+    cacheable: the outcome depends only on the goal row, so it can be memoized per
+        goal version. Guards that read other data (tasks, artifacts) must pass False,
+        and query through guard_session.
+    """
+    def decorator(func: GuardFunction) -> GuardFunction:
+        _SPECS[func] = GuardSpec(func, cost, depends_on, cacheable)
+        _BY_NAME[func.__name__] = func
+        _PLANS.clear()
+        return func
+    return decorator
+
+def resolve_guard(name: str) -> GuardFunction:
+    """Looks up a declared guard by name. Raises KeyError for unknown names."""
+    return _BY_NAME[name]
+
+def _spec_for(func: GuardFunction) -> GuardSpec:
+    spec = _SPECS.get(func)
+    if spec is None:
+        # Undeclared guards are treated as cheap and goal-local
+        spec = _SPECS[func] = GuardSpec(func, 1.0, (), True)
+    return spec
+
+class GuardResultCache:
+    """
+    Memoizes guard outcomes per (goal id, goal version, guard). Any status change bumps
+    the goal version, so stale entries are never hit; `invalidate` just frees them early,
+    touching only that goal's entries.
+    """
+
+    def __init__(self, max_entries: int = settings.GUARD_CACHE_SIZE) -> None:
+        self.max_entries: int = max_entries
+        self._entries: "OrderedDict[Tuple[UUID, int, str], Optional[str]]" = OrderedDict()
+        self._by_goal: Dict[UUID, Set[Tuple[UUID, int, str]]] = {}
+        self.hits: int = 0
+        self.misses: int = 0
+
+    def get(self, goal: Goal, spec: GuardSpec) -> Tuple[bool, Optional[str]]:
+        """Returns (found, failure message or None if the guard passed)."""
+        key = (goal.id, goal.version, spec.name)
+        if key in self._entries:
+            self.hits += 1
+            self._entries.move_to_end(key)
+            return True, self._entries[key]
+        self.misses += 1
+        return False, None
+
+    def put(self, goal: Goal, spec: GuardSpec, failure: Optional[str]) -> None:
+        key = (goal.id, goal.version, spec.name)
+        self._entries[key] = failure
+        self._entries.move_to_end(key)
+        self._by_goal.setdefault(goal.id, set()).add(key)
+        while len(self._entries) > self.max_entries:
+            self._forget(self._entries.popitem(last=False)[0])
+
+    def invalidate(self, goal_id: UUID) -> None:
+        for key in self._by_goal.pop(goal_id, ()):
+            del self._entries[key]
+
+    def _forget(self, key: Tuple[UUID, int, str]) -> None:
+        keys = self._by_goal.get(key[0])
+        if keys is not None:
+            keys.discard(key)
+            if not keys:
+                del self._by_goal[key[0]]
+
+    def stats(self) -> Dict[str, Any]:
+        return {"size": len(self._entries), "hits": self.hits, "misses": self.misses}
+
+class _GuardCheck:
+    """State shared by the guards of one check_guards call."""
+    __slots__ = ("goal", "task_counts")
+
+    def __init__(self, goal: Goal) -> None:
+        self.goal: Goal = goal
+        self.task_counts: Optional["asyncio.Task[Dict[str, int]]"] = None
+
+_CHECK: ContextVar[Optional[_GuardCheck]] = ContextVar("guard_check", default=None)
+_CONCURRENT: ContextVar[bool] = ContextVar("guard_concurrent", default=False)
+
+@asynccontextmanager
+async def guard_session(goal: Goal) -> AsyncIterator[AsyncSession]:
+    """
+    A session for a guard's queries. A guard running alone in its stage uses the
+    transition's session, so it sees that transaction's changes; guards running
+    concurrently each get their own, as one AsyncSession must not run two queries at once.
+    """
+    session = None if _CONCURRENT.get() else async_object_session(goal)
+    if session is not None:
+        yield session
+        return
+    async with AsyncSessionLocal() as own:
+        yield own
+
+@guard(cost=0.1)
 async def guard_goal_defined(goal: Goal) -> bool:
     """Ensure the Goal has basic metadata (title and description)."""
     if not goal.title or not goal.description:
         raise TransitionError("Goal title and description are required.")
     return True
 
+async def _task_counts(goal: Goal) -> Dict[str, int]:
+    """Task counts per state, read once per check and shared by every guard that needs them."""
+    check = _CHECK.get()
+    if check is None or check.goal is not goal:
+        return await _read_task_counts(goal)
+    if check.task_counts is None:
+        check.task_counts = asyncio.ensure_future(_read_task_counts(goal))
+    return await check.task_counts
+
+async def _read_task_counts(goal: Goal) -> Dict[str, int]:
+    async with guard_session(goal) as session:
+        return await task_counts(session, goal.id)
+
+@guard(cost=10.0, cacheable=False)
 async def guard_task_decomposition_done(goal: Goal) -> bool:
+    """Ensure Tasks have been generated."""
+    if not sum((await _task_counts(goal)).values()):
+        raise TransitionError("Goal has no tasks yet.")
+    return True
+
+@guard(cost=10.0, cacheable=False)
+async def guard_tasks_finished(goal: Goal) -> bool:
+    """Ensure no task of the goal is still pending or running."""
+    counts = await _task_counts(goal)
+    outstanding = counts[TaskState.PENDING.value] + counts[TaskState.ACTIVE.value]
+    if outstanding:
+        raise TransitionError(f"{outstanding} tasks are still pending or active.")
+    return True
+
+@guard(cost=10.0, cacheable=False)
+async def guard_tasks_succeeded(goal: Goal) -> bool:
+    """Ensure every task of the goal completed (failed ones may still be retried)."""
+    failed = (await _task_counts(goal))[TaskState.FAILED.value]
+    if failed:
+        raise TransitionError(f"{failed} tasks failed.")
+    return True
+
+def plan_guards(guards: Sequence[GuardFunction]) -> List[List[GuardSpec]]:
     """
-    Ensure Tasks have been generated. 
-    Currently a placeholder for future implementation.
+    Orders guards into stages that run one after another; guards within a stage run
+    concurrently. Prerequisites are pulled in and come first, and cheap guards come
+    before expensive ones, so a failing cheap check never waits on (or pays for) an
+    expensive one.
     """
-    return True
+    key = tuple(guards)
+    plan = _PLANS.get(key)
+    if plan is None:
+        plan = _PLANS[key] = _plan(guards)
+    return plan
+
+def _plan(guards: Sequence[GuardFunction]) -> List[List[GuardSpec]]:
+    specs: Dict[GuardFunction, GuardSpec] = {}
+    pending = list(guards)
+    while pending:
+        spec = _spec_for(pending.pop())
+        if spec.func not in specs:
+            specs[spec.func] = spec
+            pending.extend(spec.depends_on)
+
+    done: Set[GuardFunction] = set()
+    stages: List[List[GuardSpec]] = []
+    while len(done) < len(specs):
+        ready = [s for s in specs.values() if s.func not in done and all(d in done for d in s.depends_on)]
+        if not ready:
+            cycle = ", ".join(s.name for s in specs.values() if s.func not in done)
+            raise TransitionError(f"Guard dependency cycle between: {cycle}")
+        cheap = [s for s in ready if s.cost <= settings.GUARD_CHEAP_COST]
+        stage = sorted(cheap or ready, key=lambda s: s.cost)
+        stages.append(stage)
+        done.update(s.func for s in stage)
+    return stages
+
+async def _run_guard(goal: Goal, spec: GuardSpec, cache: Optional[GuardResultCache]) -> None:
+    if not spec.cacheable:
+        cache = None
+    if cache is not None:
+        found, failure = cache.get(goal, spec)
+        if found:
+            if failure is not None:
+                raise TransitionError(failure)
+            return
+
+    try:
+        valid = await spec.func(goal)
+        failure = None if valid else f"Guard '{spec.name}' failed."
+    except TransitionError as e:
+        failure = str(e)
+    except Exception as e:
+        # Unexpected errors may be transient: never memoized
+        raise TransitionError(f"Guard '{spec.name}' raised unexpected error: {e}") from e
+
+    if cache is not None:
+        cache.put(goal, spec, failure)
+    if failure is not None:
+        raise TransitionError(failure)
+
+async def _run_concurrent_guard(goal: Goal, spec: GuardSpec, cache: Optional[GuardResultCache]) -> None:
+    _CONCURRENT.set(True) # this task's own context: guard_session hands out a separate session
+    await _run_guard(goal, spec, cache)
+
+async def check_guards(
+    goal: Goal,
+    target_state: WorkflowState,
+    cache: Optional[GuardResultCache] = None,
+    workflow: Optional["WorkflowDefinition"] = None
+) -> None:
+    """
+    Checks all guards the goal's workflow declares for the transition from its current
+    status to the target state. Each stage runs concurrently; the first failure cancels
+    the guards still running. The goal's task counts are queried at most once per check.
+    """
+    if workflow is None:
+        from src.core.workflow.definition import default_registry
+        workflow = default_registry().get(goal.workflow)
+    guards = workflow.guards(WorkflowState(goal.status), target_state)
+    if not guards:
+        return
 
-# Map (From, To) -> List[Guard]
-TRANSITION_GUARDS: Dict[Tuple[WorkflowState, WorkflowState], List[GuardFunction]] = {
-    (WorkflowState.INITIALIZATION, WorkflowState.TASK_DECOMPOSITION): [guard_goal_defined],
-}
-
-async def check_guards(goal: Goal, target_state: WorkflowState) -> None:
-    """Checks all guards for the transition from the current goal status to the target state."""
-    current_state = WorkflowState(goal.status)
-    guards = TRANSITION_GUARDS.get((current_state, target_state), [])
-    
-    for guard in guards:
-        try:
-            valid = await guard(goal)
-            if not valid:
-                 raise TransitionError(f"Guard '{guard.__name__}' failed.")
-        except TransitionError:
-            raise
-        except Exception as e:
-            raise TransitionError(f"Guard '{guard.__name__}' raised unexpected error: {e}") from e
+    check = _GuardCheck(goal)
+    token = _CHECK.set(check)
+    try:
+        for stage in plan_guards(guards):
+            if len(stage) == 1:
+                await _run_guard(goal, stage[0], cache)
+                continue
+            tasks = [asyncio.create_task(_run_concurrent_guard(goal, spec, cache)) for spec in stage]
+            try:
+                await asyncio.gather(*tasks)
+            except BaseException:
+                for task in tasks:
+                    task.cancel()
+                raise
+    finally:
+        _CHECK.reset(token)
+        if check.task_counts is not None and not check.task_counts.done():
+            check.task_counts.cancel()
@@ -0,0 +1,270 @@
+import logging
+import time
+from datetime import datetime
+from typing import Any, Dict, Iterable, List, Optional, Sequence, cast
+from uuid import UUID
+
+from sqlalchemy import Table, and_, bindparam, func, insert, select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from src.core.db.cache import EntityCache, entity_cache
+from src.core.db.models import Goal, GoalEvent, GoalSnapshot
+from src.core.db.session import AsyncSessionLocal, as_utc
+from src.shared.config import settings
+
+logger = logging.getLogger(__name__)
+
+class GoalHistory:
+    """
+    A goal's workflow state folded from its transition events: the current status
+    and version, when it was entered, how often each state was entered and how long
+    the goal spent in each state it has left.
+    """
+    __slots__ = ("goal_id", "status", "version", "entered_at", "visits", "time_in_state")
+
+    def __init__(self, goal_id: UUID) -> None:
+        self.goal_id: UUID = goal_id
+        self.status: Optional[str] = None
+        self.version: int = 0
+        self.entered_at: Optional[datetime] = None
+        self.visits: Dict[str, int] = {}
+        self.time_in_state: Dict[str, float] = {}
+
+    def apply(self, version: int, to_state: str, occurred_at: datetime) -> None:
+        occurred_at = as_utc(occurred_at)
+        if self.status is not None and self.entered_at is not None:
+            spent = (occurred_at - self.entered_at).total_seconds()
+            self.time_in_state[self.status] = self.time_in_state.get(self.status, 0.0) + spent
+        self.status = to_state
+        self.version = version
+        self.entered_at = occurred_at
+        self.visits[to_state] = self.visits.get(to_state, 0) + 1
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "status": self.status,
+            "version": self.version,
+            "entered_at": self.entered_at.isoformat() if self.entered_at else None,
+            "visits": self.visits,
+            "time_in_state": self.time_in_state,
+        }
+
+    @classmethod
+    def from_dict(cls, goal_id: UUID, data: Dict[str, Any]) -> "GoalHistory":
+        history = cls(goal_id)
+        history.status = data.get("status")
+        history.version = data.get("version", 0)
+        entered_at = data.get("entered_at")
+        history.entered_at = datetime.fromisoformat(entered_at) if entered_at else None
+        history.visits = dict(data.get("visits", {}))
+        history.time_in_state = dict(data.get("time_in_state", {}))
+        return history
+
+class WorkflowHistory:
+    """
+    Event store for goal transitions.
+
+    Every status change appends a GoalEvent in the transaction that makes it, and
+    every `snapshot_interval`-th version of a goal also stores its folded GoalHistory.
+    Point-in-time reads start from the nearest snapshot and replay the events after
+    it; `rebuild` does the same for all goals in one ordered scan.
+    """
+
+    def __init__(
+        self,
+        session_factory: Any = AsyncSessionLocal,
+        snapshot_interval: int = settings.WORKFLOW_SNAPSHOT_INTERVAL,
+        cache: EntityCache = entity_cache
+    ) -> None:
+        self.session_factory = session_factory
+        self.snapshot_interval: int = snapshot_interval
+        self.cache: EntityCache = cache
+
+    async def record(
+        self,
+        session: AsyncSession,
+        goal_id: UUID,
+        version: int,
+        from_state: Optional[str],
+        to_state: str,
+        occurred_at: datetime
+    ) -> None:
+        """Appends one transition. The caller owns the transaction."""
+        session.add(GoalEvent(
+            goal_id=goal_id, version=version, from_state=from_state, to_state=to_state, occurred_at=occurred_at
+        ))
+        if self.snapshot_interval and version % self.snapshot_interval == 0:
+            await session.flush()
+            history = await self.load(session, goal_id)
+            if history is not None:
+                session.add(GoalSnapshot(
+                    goal_id=goal_id, version=history.version, occurred_at=occurred_at, state=history.to_dict()
+                ))
+
+    async def record_created(self, session: AsyncSession, goals: Sequence[Dict[str, Any]]) -> None:
+        """Appends the creation event (version 1) for freshly inserted goal rows."""
+        if goals:
+            await session.execute(insert(GoalEvent), [
+                {
+                    "goal_id": goal["id"],
+                    "version": 1,
+                    "from_state": None,
+                    "to_state": goal["status"],
+                    "occurred_at": goal["created_at"],
+                }
+                for goal in goals
+            ])
+
+    async def load(
+        self, session: AsyncSession, goal_id: UUID, at: Optional[datetime] = None
+    ) -> Optional[GoalHistory]:
+        """Folds a goal's history as of `at` (default: now), starting from its nearest snapshot."""
+        snapshot_query = (
+            select(GoalSnapshot)
+            .where(GoalSnapshot.goal_id == goal_id)
+            .order_by(GoalSnapshot.version.desc())
+            .limit(1)
+        )
+        if at is not None:
+            snapshot_query = snapshot_query.where(GoalSnapshot.occurred_at <= at)
+        snapshot = (await session.scalars(snapshot_query)).first()
+
+        history = GoalHistory.from_dict(goal_id, snapshot.state) if snapshot else None
+        event_query = (
+            select(GoalEvent.version, GoalEvent.to_state, GoalEvent.occurred_at)
+            .where(GoalEvent.goal_id == goal_id, GoalEvent.version > (snapshot.version if snapshot else 0))
+            .order_by(GoalEvent.version)
+        )
+        if at is not None:
+            event_query = event_query.where(GoalEvent.occurred_at <= at)
+        for version, to_state, occurred_at in (await session.execute(event_query)).all():
+            if history is None:
+                history = GoalHistory(goal_id)
+            history.apply(version, to_state, occurred_at)
+        return history
+
+    async def state_at(self, goal_id: UUID, at: Optional[datetime] = None) -> Optional[GoalHistory]:
+        async with self.session_factory() as session:
+            return await self.load(session, goal_id, at)
+
+    async def events(self, goal_id: UUID, at: Optional[datetime] = None) -> List[Dict[str, Any]]:
+        query = (
+            select(GoalEvent.version, GoalEvent.from_state, GoalEvent.to_state, GoalEvent.occurred_at)
+            .where(GoalEvent.goal_id == goal_id)
+            .order_by(GoalEvent.version)
+        )
+        if at is not None:
+            query = query.where(GoalEvent.occurred_at <= at)
+        async with self.session_factory() as session:
+            return [row._asdict() for row in (await session.execute(query)).all()]
+
+    async def replay(
+        self,
+        goal_ids: Optional[Iterable[UUID]] = None,
+        at: Optional[datetime] = None,
+        batch_size: int = 10000
+    ) -> Dict[UUID, GoalHistory]:
+        """
+        Folds many goals at once: one query for their latest snapshots, then one
+        scan of only the events after them, streamed in (goal_id, version) order.
+        """
+        ids = list(goal_ids) if goal_ids is not None else None
+
+        latest = select(GoalSnapshot.goal_id, func.max(GoalSnapshot.version).label("version"))
+        if at is not None:
+            latest = latest.where(GoalSnapshot.occurred_at <= at)
+        if ids is not None:
+            latest = latest.where(GoalSnapshot.goal_id.in_(ids))
+        latest_sq = latest.group_by(GoalSnapshot.goal_id).subquery()
+
+        events = (
+            select(GoalEvent.goal_id, GoalEvent.version, GoalEvent.to_state, GoalEvent.occurred_at)
+            .outerjoin(latest_sq, latest_sq.c.goal_id == GoalEvent.goal_id)
+            .where(GoalEvent.version > func.coalesce(latest_sq.c.version, 0))
+            .order_by(GoalEvent.goal_id, GoalEvent.version)
+        )
+        if at is not None:
+            events = events.where(GoalEvent.occurred_at <= at)
+        if ids is not None:
+            events = events.where(GoalEvent.goal_id.in_(ids))
+
+        states: Dict[UUID, GoalHistory] = {}
+        async with self.session_factory() as session:
+            snapshots = await session.execute(
+                select(GoalSnapshot.goal_id, GoalSnapshot.state).join(
+                    latest_sq,
+                    and_(GoalSnapshot.goal_id == latest_sq.c.goal_id, GoalSnapshot.version == latest_sq.c.version)
+                )
+            )
+            for goal_id, state in snapshots.all():
+                states[goal_id] = GoalHistory.from_dict(goal_id, state)
+
+            result = await session.stream(events.execution_options(yield_per=batch_size))
+            async for partition in result.partitions(batch_size):
+                for goal_id, version, to_state, occurred_at in partition:
+                    history = states.get(goal_id)
+                    if history is None:
+                        history = states[goal_id] = GoalHistory(goal_id)
+                    history.apply(version, to_state, occurred_at)
+        return states
+
+    async def rebuild(
+        self,
+        goal_ids: Optional[Iterable[UUID]] = None,
+        apply: bool = False,
+        batch_size: int = 10000
+    ) -> Dict[str, Any]:
+        """
+        Replays the event log and compares it with goals.status/version. With apply=True,
+        diverged goals are rewritten from their history (e.g. after a crash or a schema change).
+        Each rewrite is a compare-and-swap on the version read here: goals that moved on
+        meanwhile are left alone and reported as skipped.
+        """
+        started = time.perf_counter()
+        ids = list(goal_ids) if goal_ids is not None else None
+        states = await self.replay(ids, batch_size=batch_size)
+
+        diverged: List[Dict[str, Any]] = []
+        async with self.session_factory() as session:
+            query = select(Goal.id, Goal.status, Goal.version)
+            if ids is not None:
+                query = query.where(Goal.id.in_(ids))
+            for goal_id, status, version in (await session.execute(query)).all():
+                history = states.get(goal_id)
+                if history is not None and (history.status, history.version) != (status, version):
+                    diverged.append({
+                        "b_id": goal_id, "b_observed": version, "b_status": history.status, "b_version": history.version
+                    })
+
+            skipped: List[UUID] = []
+            if apply and diverged:
+                # Core executemany: the ORM's bulk update by primary key cannot carry the version check
+                goals = cast(Table, Goal.__table__)
+                cas = (
+                    update(goals)
+                    .where(goals.c.id == bindparam("b_id"), goals.c.version == bindparam("b_observed"))
+                    .values(status=bindparam("b_status"), version=bindparam("b_version"))
+                )
+                for start in range(0, len(diverged), batch_size):
+                    await session.execute(cas, diverged[start:start + batch_size])
+                # Rowcounts of an executemany are not reported per row: read back which rows took the rewrite
+                wanted = {row["b_id"]: (row["b_status"], row["b_version"]) for row in diverged}
+                for start in range(0, len(diverged), batch_size):
+                    chunk = [row["b_id"] for row in diverged[start:start + batch_size]]
+                    current = await session.execute(select(Goal.id, Goal.status, Goal.version).where(Goal.id.in_(chunk)))
+                    skipped.extend(goal_id for goal_id, status, version in current.all() if wanted[goal_id] != (status, version))
+                await session.commit()
+                for row in diverged:
+                    self.cache.invalidate(Goal, row["b_id"])
+                if skipped:
+                    logger.warning("Skipped %s goal(s) that changed during the rebuild", len(skipped))
+
+        elapsed = time.perf_counter() - started
+        logger.info("Replayed %s goals in %.2fs (%s diverged)", len(states), elapsed, len(diverged))
+        return {
+            "goals": len(states),
+            "diverged": len(diverged),
+            "applied": apply,
+            "skipped": [str(goal_id) for goal_id in skipped],
+            "elapsed_seconds": round(elapsed, 3),
+        }
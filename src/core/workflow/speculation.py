@@ -0,0 +1,139 @@
+import math
+from collections import OrderedDict, deque
+from dataclasses import dataclass
+from typing import Any, Deque, Dict, List, Optional
+
+from src.shared.config import settings
+from src.shared.models import TaskPriority, TaskState
+
+class LatencyTracker:
+    """Recent claim-to-result latencies per task type, for tail percentiles."""
+
+    def __init__(self, samples: int = settings.LATENCY_SAMPLES) -> None:
+        self.samples: int = samples
+        self._latencies: Dict[str, Deque[float]] = {}
+
+    def record(self, task_type: str, seconds: float) -> None:
+        window = self._latencies.get(task_type)
+        if window is None:
+            window = self._latencies[task_type] = deque(maxlen=self.samples)
+        window.append(seconds)
+
+    def count(self, task_type: str) -> int:
+        return len(self._latencies.get(task_type, ()))
+
+    def percentile(self, task_type: str, q: float) -> Optional[float]:
+        """The q-th percentile (0-100, nearest rank) of the type's recent latencies."""
+        window = self._latencies.get(task_type)
+        if not window:
+            return None
+        ordered = sorted(window)
+        rank = math.ceil(q / 100.0 * len(ordered))
+        return ordered[max(0, min(len(ordered), rank) - 1)]
+
+    def stats(self) -> Dict[str, Dict[str, Any]]:
+        return {
+            task_type: {
+                "samples": len(window),
+                "p50": self.percentile(task_type, 50),
+                "p99": self.percentile(task_type, 99),
+            }
+            for task_type, window in self._latencies.items()
+        }
+
+@dataclass
+class _Run:
+    replicas: int
+    failed: int = 0
+
+class SpeculationPolicy:
+    """
+    Decides how many copies of a task run at once, and which copy's result counts.
+
+    Only CRITICAL tasks are speculated, and only while their type's p99 latency is at
+    least `min_p99` seconds, or too few samples exist to tell. Each extra copy spends
+    LLM quota to cut the tail: the task finishes with its fastest successful copy,
+    and the others are cancelled. Copies rotate through `models` when it is set, so
+    a slow or failing model configuration does not hold the task up.
+    """
+
+    def __init__(
+        self,
+        replicas: int = settings.SPECULATIVE_REPLICAS,
+        min_p99: float = settings.SPECULATIVE_MIN_P99,
+        min_samples: int = settings.SPECULATIVE_MIN_SAMPLES,
+        models: Optional[List[str]] = None,
+        latency: Optional[LatencyTracker] = None,
+        max_running: int = 10000
+    ) -> None:
+        self.replicas: int = replicas
+        self.min_p99: float = min_p99
+        self.min_samples: int = min_samples
+        self.models: List[str] = list(settings.SPECULATIVE_MODELS if models is None else models)
+        self.latency: LatencyTracker = latency or LatencyTracker()
+        self.max_running: int = max_running
+        self._running: "OrderedDict[str, _Run]" = OrderedDict()
+
+        self.speculated: int = 0
+        self.copies: int = 0
+        self.wins: int = 0 # Tasks decided by their first successful copy
+        self.exhausted: int = 0 # Tasks whose copies all failed
+        self.untracked: int = 0 # Failed copies of tasks this process does not track; left to the lease
+
+    def replicas_for(self, task_type: str, priority: str) -> int:
+        if self.replicas <= 1 or priority != TaskPriority.CRITICAL.value:
+            return 1
+        if self.latency.count(task_type) < self.min_samples:
+            return self.replicas
+        p99 = self.latency.percentile(task_type, 99)
+        return self.replicas if p99 is not None and p99 >= self.min_p99 else 1
+
+    def model_for(self, replica: int) -> Optional[str]:
+        return self.models[replica % len(self.models)] if self.models else None
+
+    def begin(self, task_id: str, replicas: int) -> None:
+        """Registers a task dispatched as `replicas` copies."""
+        self._running[task_id] = _Run(replicas)
+        self._running.move_to_end(task_id)
+        while len(self._running) > self.max_running:
+            self._running.popitem(last=False) # Copies that never reported (their lease re-queues the task)
+        self.speculated += 1
+        self.copies += replicas
+
+    def settle(self, task_id: str, status: str, replica: Optional[int] = None) -> bool:
+        """
+        Counts one copy's result. True if it decides the task: the first success, or
+        the last copy failing. Results of tasks that were not speculated always decide.
+
+        Tracking lives in this process's memory, so a copy can report a task that is
+        not tracked here (its goal moved to another shard, or it was evicted). Such a
+        failure does not decide the task: the other copies may still succeed, and if
+        none does, the task's lease expires and re-queues it.
+        """
+        run = self._running.get(task_id)
+        if run is None:
+            if replica is not None and status == TaskState.FAILED.value:
+                self.untracked += 1
+                return False
+            return True
+        if status == TaskState.FAILED.value:
+            run.failed += 1
+            if run.failed < run.replicas:
+                return False
+            self.exhausted += 1
+        else:
+            self.wins += 1
+        del self._running[task_id]
+        return True
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "replicas": self.replicas,
+            "running": len(self._running),
+            "speculated": self.speculated,
+            "copies": self.copies,
+            "wins": self.wins,
+            "exhausted": self.exhausted,
+            "untracked": self.untracked,
+            "latency": self.latency.stats(),
+        }
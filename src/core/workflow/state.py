@@ -1,5 +1,5 @@
 from enum import Enum
-from typing import Dict, List, Set
+from typing import List
 
 from pydantic import BaseModel
 
@@ -20,30 +20,17 @@ class TransitionError(Exception):
     """Raised when an invalid state transition is attempted."""
     pass
 
+class TransitionConflictError(TransitionError):
+    """Raised when concurrent writers kept changing the goal until the retry budget ran out."""
+    pass
+
 class WorkflowTransition(BaseModel):
-    """Represents a valid transition between two workflow states."""
+    """A valid transition between two workflow states; required_conditions names its guards."""
     from_state: WorkflowState
     to_state: WorkflowState
     required_conditions: List[str] = []
 
-# Define allowed transitions (Adjacency List)
-TRANSITION_MAP: Dict[WorkflowState, Set[WorkflowState]] = {
-    WorkflowState.INITIALIZATION: {WorkflowState.TASK_DECOMPOSITION},
-    WorkflowState.TASK_DECOMPOSITION: {WorkflowState.DESIGN_IMPLEMENTATION},
-    WorkflowState.DESIGN_IMPLEMENTATION: {WorkflowState.EXECUTION_MONITORING},
-    WorkflowState.EXECUTION_MONITORING: {
-        WorkflowState.META_COMMUNICATION, 
-        WorkflowState.KICKLANG_INTEGRATION,
-        WorkflowState.EXECUTION_MONITORING, # Loop N4->N4
-        WorkflowState.SUSPENDED
-    },
-    WorkflowState.META_COMMUNICATION: {WorkflowState.EXECUTION_MONITORING, WorkflowState.INITIALIZATION},
-    WorkflowState.KICKLANG_INTEGRATION: {WorkflowState.COMPLETED},
-    WorkflowState.SUSPENDED: {WorkflowState.INITIALIZATION, WorkflowState.EXECUTION_MONITORING}, # Manual recovery
-}
-
 def validate_transition(current: WorkflowState, target: WorkflowState) -> bool:
-    """Validates if a transition from the current state to the target state is allowed."""
-    if target not in TRANSITION_MAP.get(current, set()):
-        raise TransitionError(f"Invalid transition: {current} -> {target}")
-    return True
+    """Validates a transition against the default workflow definition."""
+    from src.core.workflow.definition import default_registry
+    return default_registry().get().validate(current, target)
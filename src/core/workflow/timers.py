@@ -0,0 +1,333 @@
+import asyncio
+import logging
+import math
+import time
+from datetime import datetime, timezone
+from typing import Any, Dict, Hashable, List, Optional, Sequence, Tuple, TYPE_CHECKING, cast
+from uuid import UUID
+
+from sqlalchemy import exists, select, update
+from sqlalchemy.orm import aliased
+
+from src.core.db.cache import entity_cache
+from src.core.db.claims import notify_tasks_pending
+from src.core.db.models import Goal, Task
+from src.core.db.progress import record_progress
+from src.core.workflow.state import WorkflowState, TransitionError
+from src.shared.config import settings
+from src.shared.constants import AGENT_STATUS_TOPIC
+from src.shared.models import AgentHeartbeat, TaskState
+
+if TYPE_CHECKING:
+    from src.core.bus.bus import MessageBus, MessageEnvelope
+    from src.core.workflow.engine import WorkflowEngine
+
+logger = logging.getLogger(__name__)
+
+class Timer:
+    __slots__ = ("key", "tick", "data", "level", "slot")
+
+    def __init__(self, key: Hashable, tick: int, data: Any) -> None:
+        self.key: Hashable = key
+        self.tick: int = tick
+        self.data: Any = data
+        self.level: int = 0
+        self.slot: int = 0
+
+class TimerWheel:
+    """
+    Hierarchical timing wheel (Varghese & Lauck).
+
+    Level L has 2**slot_bits slots of 2**(slot_bits*L) ticks each. A timer sits in
+    the lowest level whose span covers its delay and is cascaded one level down
+    whenever the level above wraps into its slot, so insert and cancel are O(1)
+    dict operations and advancing costs O(1) per tick plus O(1) per timer cascade.
+    Timers are keyed: scheduling an existing key replaces it.
+    """
+
+    def __init__(self, tick: float = settings.TIMER_TICK, slot_bits: int = 6, levels: int = 5, now: Optional[float] = None) -> None:
+        self.tick: float = tick
+        self._bits: int = slot_bits
+        self._mask: int = (1 << slot_bits) - 1
+        self._levels: List[List[Dict[Hashable, Timer]]] = [
+            [{} for _ in range(1 << slot_bits)] for _ in range(levels)
+        ]
+        self._timers: Dict[Hashable, Timer] = {}
+        self._origin: float = time.monotonic() if now is None else now
+        self._current: int = 0
+        self.horizon: int = 1 << (slot_bits * levels)
+
+    def __len__(self) -> int:
+        return len(self._timers)
+
+    def __contains__(self, key: Hashable) -> bool:
+        return key in self._timers
+
+    def schedule(self, key: Hashable, delay: float, data: Any = None) -> Timer:
+        """Fires `data` under `key` after `delay` seconds (rounded up to a tick)."""
+        ticks = max(1, math.ceil(delay / self.tick))
+        if ticks >= self.horizon:
+            raise ValueError(f"Delay {delay}s is beyond the wheel horizon ({self.horizon * self.tick}s)")
+        self.cancel(key)
+        timer = Timer(key, self._current + ticks, data)
+        self._timers[key] = timer
+        self._place(timer)
+        return timer
+
+    def cancel(self, key: Hashable) -> bool:
+        timer = self._timers.pop(key, None)
+        if timer is None:
+            return False
+        del self._levels[timer.level][timer.slot][key]
+        return True
+
+    def advance(self, now: Optional[float] = None) -> List[Timer]:
+        """Moves the wheel up to `now` (monotonic seconds) and returns the expired timers."""
+        now = time.monotonic() if now is None else now
+        target = int((now - self._origin) / self.tick)
+        expired: List[Timer] = []
+        while self._current < target:
+            if not self._timers:
+                # Nothing to cascade or expire: jump straight to the target tick
+                self._current = target
+                break
+            self._current += 1
+            for level in range(len(self._levels) - 1, 0, -1):
+                if self._current & ((1 << (self._bits * level)) - 1) == 0:
+                    self._cascade(level, (self._current >> (self._bits * level)) & self._mask)
+            bucket = self._levels[0][self._current & self._mask]
+            if bucket:
+                for timer in bucket.values():
+                    del self._timers[timer.key]
+                expired.extend(bucket.values())
+                bucket.clear()
+        return expired
+
+    def _cascade(self, level: int, slot: int) -> None:
+        bucket = self._levels[level][slot]
+        if not bucket:
+            return
+        timers = list(bucket.values())
+        bucket.clear()
+        for timer in timers:
+            self._place(timer)
+
+    def _place(self, timer: Timer) -> None:
+        delta = max(0, timer.tick - self._current)
+        level = 0
+        while level < len(self._levels) - 1 and delta >= 1 << (self._bits * (level + 1)):
+            level += 1
+        timer.level = level
+        timer.slot = (timer.tick >> (self._bits * level)) & self._mask
+        self._levels[level][timer.slot][timer.key] = timer
+
+# Timer kinds, the first element of each key
+STATE_TIMEOUT = "state"
+TASK_LEASE = "lease"
+TASK_RETRY = "retry"
+
+class WorkflowTimers:
+    """
+    Time-driven workflow actions on a single TimerWheel:
+
+    - state timeouts: a goal that stays in a state longer than settings.GOAL_STATE_TIMEOUTS
+      allows is escalated (workflow.goal_timeout) and moved to SUSPENDED;
+    - task leases: an Active task that no agent heartbeat reports as running for
+      TASK_LEASE_SECONDS is re-queued as Pending;
+    - delayed retries: a Failed task is re-queued after an exponential backoff, up to
+      TASK_MAX_RETRIES times.
+
+    Task results count once the Director has applied them and published
+    workflow.task_settled: a stale result (a lease already re-queued the task) or a
+    single copy of a speculatively executed task never cancels a lease or retries.
+
+    Runs on the process that owns the agents. Timers are rebuilt from the DB on start,
+    measured from the restart.
+    """
+
+    def __init__(
+        self,
+        bus: "MessageBus",
+        engine: "WorkflowEngine",
+        tick: float = settings.TIMER_TICK,
+        state_timeouts: Optional[Dict[str, float]] = None,
+        lease_seconds: float = settings.TASK_LEASE_SECONDS,
+        max_retries: int = settings.TASK_MAX_RETRIES,
+        retry_backoff: float = settings.TASK_RETRY_BACKOFF
+    ) -> None:
+        self.bus: "MessageBus" = bus
+        self.engine: "WorkflowEngine" = engine
+        self.wheel: TimerWheel = TimerWheel(tick)
+        self.state_timeouts: Dict[str, float] = dict(
+            settings.GOAL_STATE_TIMEOUTS if state_timeouts is None else state_timeouts
+        )
+        self.lease_seconds: float = lease_seconds
+        self.max_retries: int = max_retries
+        self.retry_backoff: float = retry_backoff
+
+        self._attempts: Dict[str, int] = {}
+        self._loop_task: Optional[asyncio.Task[None]] = None
+        self._subscribed: bool = False
+
+        self.fired: Dict[str, int] = {STATE_TIMEOUT: 0, TASK_LEASE: 0, TASK_RETRY: 0}
+
+    async def start(self) -> None:
+        await self._seed()
+        if not self._subscribed:
+            self._subscribed = True
+            await self.bus.subscribe("workflow.goal_started", self._on_goal_started)
+            await self.bus.subscribe("workflow.state_change", self._on_state_change)
+            await self.bus.subscribe("agents.*.task", self._on_task_assigned)
+            await self.bus.subscribe("workflow.task_settled", self._on_task_settled)
+            await self.bus.subscribe(AGENT_STATUS_TOPIC, self._on_heartbeat)
+        self._loop_task = asyncio.create_task(self._tick_loop())
+
+    async def stop(self) -> None:
+        if self._loop_task:
+            self._loop_task.cancel()
+            try:
+                await self._loop_task
+            except asyncio.CancelledError:
+                pass
+            self._loop_task = None
+
+    def stats(self) -> Dict[str, Any]:
+        return {"pending": len(self.wheel), "tick": self.wheel.tick, "fired": dict(self.fired)}
+
+    # -- Scheduling -------------------------------------------------------
+
+    def watch_state(self, goal_id: str, state: str) -> None:
+        timeout = self.state_timeouts.get(state)
+        if timeout:
+            self.wheel.schedule((STATE_TIMEOUT, goal_id), timeout, state)
+        else:
+            self.wheel.cancel((STATE_TIMEOUT, goal_id))
+
+    def lease(self, task_id: str) -> None:
+        self.wheel.schedule((TASK_LEASE, task_id), self.lease_seconds)
+
+    async def _seed(self) -> None:
+        async with self.engine.session_factory() as session:
+            if self.state_timeouts:
+                goals = await session.execute(
+                    select(Goal.id, Goal.status).where(Goal.status.in_(list(self.state_timeouts)))
+                )
+                for goal_id, status in goals.all():
+                    self.watch_state(str(goal_id), status)
+            # Expanded parents stay Active until their subtasks finish; no agent heartbeats them
+            child = aliased(Task)
+            tasks = await session.scalars(
+                select(Task.id).where(Task.status == TaskState.ACTIVE.value, ~exists().where(child.parent_id == Task.id))
+            )
+            for task_id in tasks.all():
+                self.lease(str(task_id))
+
+    async def _on_goal_started(self, envelope: "MessageEnvelope") -> None:
+        self.watch_state(str(envelope.payload.get("goal_id")), WorkflowState.INITIALIZATION.value)
+
+    async def _on_state_change(self, envelope: "MessageEnvelope") -> None:
+        self.watch_state(str(envelope.payload.get("goal_id")), str(envelope.payload.get("new_state")))
+
+    async def _on_task_assigned(self, envelope: "MessageEnvelope") -> None:
+        payload = envelope.payload
+        task_id = payload.get("id") if isinstance(payload, dict) else getattr(payload, "id", None)
+        if task_id:
+            self.lease(str(task_id))
+
+    async def _on_heartbeat(self, envelope: "MessageEnvelope") -> None:
+        payload = envelope.payload
+        if isinstance(payload, AgentHeartbeat):
+            task_ids = [*payload.running_task_ids, payload.current_task_id]
+        elif isinstance(payload, dict):
+            task_ids = [*(payload.get("running_task_ids") or ()), payload.get("current_task_id")]
+        else:
+            return
+        # An agent runs several tasks at once: renew every one it reports.
+        # Only renew leases that exist: a heartbeat must not resurrect a finished task
+        for task_id in {str(t) for t in task_ids if t}:
+            if (TASK_LEASE, task_id) in self.wheel:
+                self.lease(task_id)
+
+    async def _on_task_settled(self, envelope: "MessageEnvelope") -> None:
+        task_id = str(envelope.payload.get("task_id"))
+        self.wheel.cancel((TASK_LEASE, task_id))
+        if envelope.payload.get("status") != TaskState.FAILED.value:
+            self._attempts.pop(task_id, None)
+            return
+        attempt = self._attempts.get(task_id, 0)
+        if attempt >= self.max_retries:
+            self._attempts.pop(task_id, None)
+            logger.warning("Task %s failed after %s retries; giving up", task_id, attempt)
+            return
+        self._attempts[task_id] = attempt + 1
+        self.wheel.schedule((TASK_RETRY, task_id), self.retry_backoff * (2 ** attempt))
+
+    # -- Firing -----------------------------------------------------------
+
+    async def _tick_loop(self) -> None:
+        while True:
+            try:
+                await asyncio.sleep(self.wheel.tick)
+                expired = self.wheel.advance()
+                if expired:
+                    await self.fire(expired)
+            except asyncio.CancelledError:
+                break
+            except Exception as e:
+                logger.error("Error in workflow timer loop: %s", e, exc_info=True)
+
+    async def fire(self, expired: Sequence[Timer]) -> None:
+        leases: List[str] = []
+        retries: List[str] = []
+        for timer in expired:
+            kind, target = cast(Tuple[str, str], timer.key)
+            self.fired[kind] += 1
+            if kind == STATE_TIMEOUT:
+                await self._suspend(target, timer.data)
+            elif kind == TASK_LEASE:
+                leases.append(target)
+            elif kind == TASK_RETRY:
+                retries.append(target)
+        if leases:
+            await self.requeue(leases, TaskState.ACTIVE.value, "lease expired")
+        if retries:
+            await self.requeue(retries, TaskState.FAILED.value, "retry")
+
+    async def _suspend(self, goal_id: str, state: str) -> None:
+        timeout = self.state_timeouts.get(state)
+        await self.bus.publish("workflow.goal_timeout", {"goal_id": goal_id, "state": state, "timeout": timeout})
+        try:
+            await self.engine.transition_phase(UUID(goal_id), WorkflowState.SUSPENDED)
+            logger.warning("Goal %s exceeded %ss in %s; suspended", goal_id, timeout, state)
+        except (TransitionError, ValueError) as e:
+            # Already moved on, or SUSPENDED is not reachable from this state
+            logger.info("Goal %s timed out in %s but was not suspended: %s", goal_id, state, e)
+
+    async def requeue(self, task_ids: Sequence[str], from_status: str, reason: str) -> int:
+        """Moves tasks still in `from_status` back to Pending and asks the Director to re-assign them."""
+        now = datetime.now(timezone.utc)
+        per_goal: Dict[UUID, int] = {}
+        async with self.engine.session_factory() as session:
+            result = await session.execute(
+                update(Task)
+                .where(Task.id.in_([UUID(t) for t in task_ids]), Task.status == from_status)
+                .values(status=TaskState.PENDING.value, assigned_to=None, updated_at=now)
+                .returning(Task.id, Task.goal_id),
+                execution_options={"synchronize_session": False}
+            )
+            rows = result.all()
+            for _, goal_id in rows:
+                per_goal[goal_id] = per_goal.get(goal_id, 0) + 1
+            for goal_id, count in per_goal.items():
+                await record_progress(session, goal_id, {from_status: -count, TaskState.PENDING.value: count})
+                await notify_tasks_pending(session, goal_id)
+            await session.commit()
+
+        for task_id, _ in rows:
+            entity_cache.invalidate(Task, task_id)
+        for goal_id, count in per_goal.items():
+            logger.info("Re-queued %s task(s) of goal %s (%s)", count, goal_id, reason)
+            await self.bus.publish("workflow.tasks_requeued", {
+                "goal_id": str(goal_id), "task_count": count, "reason": reason
+            })
+        return len(rows)
@@ -1,38 +1,36 @@
 # Shared module
-from src.shared.models import (
-    AgentRole,
-    TaskState,
-    AgentStatus,
-    TaskPriority,
-    Task,
-    Phase,
-    Communication,
-    AgentTask,
-    AgentHeartbeat,
-)
-from src.shared.constants import (
-    SYSTEM_NAME,
-    SYSTEM_VERSION,
-    SYSTEM_MODE,
-    WORKFLOW_TOPIC,
-    AGENT_LOG_TOPIC,
-    AGENT_STATUS_TOPIC,
-)
+# Exports resolve lazily (PEP 562) so that e.g. `src.shared.constants` can be
+# imported without pulling in pydantic through the models module.
+from importlib import import_module
+from typing import Any, Dict
 
-__all__ = [
-    "AgentRole",
-    "TaskState",
-    "AgentStatus",
-    "TaskPriority",
-    "Task",
-    "Phase",
-    "Communication",
-    "AgentTask",
-    "AgentHeartbeat",
-    "SYSTEM_NAME",
-    "SYSTEM_VERSION",
-    "SYSTEM_MODE",
-    "WORKFLOW_TOPIC",
-    "AGENT_LOG_TOPIC",
-    "AGENT_STATUS_TOPIC",
-]
+_EXPORTS: Dict[str, str] = {
+    "AgentRole": "src.shared.enums",
+    "TaskState": "src.shared.enums",
+    "AgentStatus": "src.shared.enums",
+    "TaskPriority": "src.shared.enums",
+    "Task": "src.shared.models",
+    "Phase": "src.shared.models",
+    "Communication": "src.shared.models",
+    "AgentTask": "src.shared.models",
+    "AgentHeartbeat": "src.shared.models",
+    "SYSTEM_NAME": "src.shared.constants",
+    "SYSTEM_VERSION": "src.shared.constants",
+    "SYSTEM_MODE": "src.shared.constants",
+    "WORKFLOW_TOPIC": "src.shared.constants",
+    "AGENT_LOG_TOPIC": "src.shared.constants",
+    "AGENT_STATUS_TOPIC": "src.shared.constants",
+    "AGENT_STATUS_DELTA_TOPIC": "src.shared.constants",
+    "AGENT_SNAPSHOT_TOPIC": "src.shared.constants",
+    "CLUSTER_PEER_JOINED_TOPIC": "src.shared.constants",
+}
+
+def __getattr__(name: str) -> Any:
+    module = _EXPORTS.get(name)
+    if module is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(import_module(module), name)
+    globals()[name] = value
+    return value
+
+__all__ = list(_EXPORTS)
@@ -1,5 +1,6 @@
 from pydantic_settings import BaseSettings, SettingsConfigDict
 from pathlib import Path
+from typing import Dict, List, Optional
 
 class Settings(BaseSettings):
     model_config = SettingsConfigDict(
@@ -13,15 +14,96 @@ class Settings(BaseSettings):
     APP_VERSION: str = "0.1.0"
     DEBUG: bool = False
     
+    # CLI
+    API_URL: str = "http://localhost:8000" # Base URL the `ocs` CLI talks to
+    
     # Paths
     BASE_DIR: Path = Path(__file__).resolve().parent.parent.parent
     ARTIFACTS_DIR: Path = BASE_DIR / "artifacts"
     
-    # Database
+    # Database (use postgresql+asyncpg://... for multi-process workers)
     DATABASE_URL: str = f"sqlite+aiosqlite:///{BASE_DIR}/ocs.db"
+    DB_POOL_SIZE: int = 10 # Ignored for SQLite
+    DB_MAX_OVERFLOW: int = 20
+    ENTITY_CACHE_SIZE: int = 10000 # Goal/Task rows kept in the read-through cache
+    
+    # Artifacts
+    ARTIFACT_KEYFRAME_INTERVAL: int = 8 # Every K-th version is stored in full; the rest as deltas
+    ARTIFACT_VERSION_CACHE_SIZE: int = 256 # Reconstructed versions kept in the LRU cache
+    
+    # Audit
+    AUDIT_BUFFER_SIZE: int = 10000 # Ring buffer capacity for pending audit entries
+    AUDIT_BATCH_SIZE: int = 500
+    AUDIT_FLUSH_INTERVAL: float = 1.0 # Seconds between background flushes
+    AUDIT_RETENTION_DAYS: int = 30
+    
+    # Agent logs
+    LOG_BUFFER_SIZE: int = 100000 # Lines kept in the in-memory log index
+    LOG_INGEST_INTERVAL: float = 0.5 # Seconds between ingestion batches
+    LOG_MAX_PENDING: int = 10000 # Queued lines that force an ingestion batch before the next tick
+    LOG_MAX_MESSAGE_LENGTH: int = 4096
+    LOG_SPILL_DIR: Optional[Path] = None # Evicted lines are appended here as daily NDJSON files when set
+    
+    # HTTP
+    COMPRESSION_MIN_SIZE: int = 1024 # Bytes; smaller responses are sent uncompressed
+    TASK_RESPONSE_CACHE_SIZE: int = 5000 # Completed tasks kept pre-serialized
+    
+    # Bus
+    BUS_ORDERED_TOPIC_PREFIXES: List[str] = ["workflow."] # Events here are delivered in order per payload goal_id
+    
+    # Streaming
+    STREAM_CLIENT_BUFFER: int = 1000 # Pending events per WS/SSE client before it is disconnected as too slow
+    STREAM_MAX_CLIENTS: int = 10000
+    STREAM_REPLAY_SIZE: int = 5000 # Recent events kept for Last-Event-ID resumption
+    
+    # Multi-worker (uvicorn --workers N on one host)
+    MULTI_WORKER: bool = False # Elect one owner process for the agents and bridge the buses over a Unix socket
+    CLUSTER_DIR: Path = BASE_DIR / ".ocs" # Owner lock file and bus socket
+    CLUSTER_POLL_INTERVAL: float = 2.0 # Seconds between owner-election / reconnect attempts
+    
+    # Director sharding (goals are consistent-hashed onto shards; with MULTI_WORKER every worker runs shards)
+    DIRECTOR_SHARDS: int = 1 # Shards per process
+    DIRECTOR_SHARD_CONCURRENCY: int = 64 # Goals a shard processes at once; each goal's events stay in order
+    DIRECTOR_SHARD_REPLICAS: int = 64 # Points per shard on the hash ring
+    DIRECTOR_SHARD_ANNOUNCE_INTERVAL: float = 5.0 # Seconds between membership announcements
+    DIRECTOR_SHARD_TTL: float = 15.0 # A node that has not announced for this long loses its goals
+    DIRECTOR_HANDOFF_TIMEOUT: float = 2.0 # Max seconds a new owner holds a moved goal's events for the old owner
+    
+    # Agents
+    AGENT_STALL_MISSED_BEATS: int = 3 # Missed heartbeat intervals before an agent is marked STALLED
+    AGENT_SNAPSHOT_INTERVAL: float = 30.0 # Seconds between compact registry snapshots on the bus
     
     # Workflow
+    WORKFLOW_DEFAULT: str = "ocs@1" # Definition (name@version) for goals created without one
+    WORKFLOW_DEFINITIONS_DIR: Optional[Path] = None # Extra *.json workflow definitions loaded next to the built-in ones
+    GOAL_BACKLOG_LIMIT: int = 1000 # Undecomposed goals before new submissions get 429
+    GOAL_BULK_MAX_ITEMS: int = 10000
+    GOAL_PUBLISH_BATCH_SIZE: int = 200 # goal_started events published between event-loop yields
+    WORKFLOW_SNAPSHOT_INTERVAL: int = 16 # Every N-th goal version also stores its folded history
+    GUARD_CHEAP_COST: float = 1.0 # Guards declared above this cost start only after the cheap ones pass
+    GUARD_CACHE_SIZE: int = 10000 # Memoized (goal version, guard) outcomes
+    TRANSITION_MAX_RETRIES: int = 3 # Re-reads after losing a compare-and-swap on the goal version
     MAX_REFINEMENT_LOOPS: int = 3
     AUTO_APPROVE_THRESHOLD: float = 0.95
 
+    # Timers
+    TIMER_TICK: float = 0.5 # Seconds per timer-wheel slot
+    GOAL_STATE_TIMEOUTS: Dict[str, float] = {"N4_EXECUTION_MONITORING": 86400.0} # Seconds in a state before the goal is SUSPENDED
+    TASK_LEASE_SECONDS: float = 300.0 # Active tasks not reported by any agent heartbeat are re-queued after this
+    TASK_MAX_RETRIES: int = 2 # Delayed re-queues of a Failed task
+    TASK_RETRY_BACKOFF: float = 5.0 # Seconds before the first retry; doubles per attempt
+
+    # Task trees (tasks are expanded lazily, when the Director claims them)
+    TASK_EXPANSION_COMPLEXITY: int = 7 # Tasks Lyra rates at least this complex (1-10) are split instead of executed
+    TASK_MAX_DEPTH: int = 3 # Levels of subtasks below a goal's top-level tasks
+    TASK_MAX_BREADTH: int = 5 # Tasks created per decomposition or expansion
+    TASK_MAX_PER_GOAL: int = 200 # Once a goal has this many tasks, complex tasks are executed as they are
+
+    # Speculative execution (CRITICAL tasks run as several copies; the first success wins)
+    SPECULATIVE_REPLICAS: int = 2 # Copies per speculated task; 1 disables speculation
+    SPECULATIVE_MIN_P99: float = 30.0 # Seconds; task types with a faster p99 run as one copy
+    SPECULATIVE_MIN_SAMPLES: int = 20 # Fewer latency samples than this: the tail is unknown, so speculate
+    SPECULATIVE_MODELS: List[str] = [] # LLM model per copy, round robin; empty: every copy uses the default model
+    LATENCY_SAMPLES: int = 512 # Recent claim-to-result latencies kept per task type
+
 settings = Settings()
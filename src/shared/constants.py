@@ -1,4 +1,4 @@
-from .models import AgentRole
+from .enums import AgentRole
 
 SYSTEM_NAME = "Orion Collective System (OCS)"
 SYSTEM_VERSION = "0.1.0"
@@ -8,6 +8,9 @@ SYSTEM_MODE = "Development"
 WORKFLOW_TOPIC = "workflow.task_result"
 AGENT_LOG_TOPIC = "agent.log"
 AGENT_STATUS_TOPIC = "system.heartbeat"
+AGENT_STATUS_DELTA_TOPIC = "system.agent_status"
+AGENT_SNAPSHOT_TOPIC = "system.agent_snapshot"
+CLUSTER_PEER_JOINED_TOPIC = "cluster.peer_joined"
 
 DEFAULT_PRINCIPLES = [
     "HierarchicalPlanning",
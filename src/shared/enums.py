@@ -0,0 +1,32 @@
+from enum import Enum
+
+class AgentRole(str, Enum):
+    DIRECTOR = "Director"
+    LYRA = "Lyra"
+    GPTASE = "GPTASe"
+    TASE = "TASe"
+    UTASE = "uTASe"
+    PUTASE = "puTASe"
+    AURORA = "Aurora"
+    KODAX = "Kodax"
+    DELIVERABLE_INTEGRATOR = "Deliverable_Integrator"
+    USER = "User"
+    SYSTEM = "System"
+
+class TaskState(str, Enum):
+    PENDING = "Pending"
+    ACTIVE = "Active"
+    COMPLETED = "Completed"
+    FAILED = "Failed"
+
+class AgentStatus(str, Enum):
+    IDLE = "Idle"
+    WORKING = "Working"
+    ERROR = "Error"
+    STALLED = "Stalled"
+
+class TaskPriority(str, Enum):
+    LOW = "Low"
+    MEDIUM = "Medium"
+    HIGH = "High"
+    CRITICAL = "Critical"
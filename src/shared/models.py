@@ -1,40 +1,10 @@
-from enum import Enum
 from typing import List, Optional, Any, Dict
 from datetime import datetime, timezone
 from uuid import uuid4
 from pydantic import BaseModel, Field, ConfigDict
 
-class AgentRole(str, Enum):
-    DIRECTOR = "Director"
-    LYRA = "Lyra"
-    GPTASE = "GPTASe"
-    TASE = "TASe"
-    UTASE = "uTASe"
-    PUTASE = "puTASe"
-    AURORA = "Aurora"
-    KODAX = "Kodax"
-    DELIVERABLE_INTEGRATOR = "Deliverable_Integrator"
-    USER = "User"
-    SYSTEM = "System"
-
-class TaskState(str, Enum):
-    PENDING = "Pending"
-    ACTIVE = "Active"
-    COMPLETED = "Completed"
-    FAILED = "Failed"
-
-class AgentStatus(str, Enum):
-    IDLE = "Idle"
-    WORKING = "Working"
-    ERROR = "Error"
-    STALLED = "Stalled"
-
-class TaskPriority(str, Enum):
-    LOW = "Low"
-    MEDIUM = "Medium"
-    HIGH = "High"
-    CRITICAL = "Critical"
-
+# Enums live in a pydantic-free module so constants and the CLI can import them cheaply
+from src.shared.enums import AgentRole as AgentRole, TaskState as TaskState, AgentStatus as AgentStatus, TaskPriority as TaskPriority
 
 class KickLangSerializable(BaseModel):
     """Mixin to provide KickLang serialization capability."""
@@ -83,12 +53,17 @@ class AgentTask(KickLangSerializable):
     context_refs: List[str] = Field(default_factory=list)
     constraints: TaskConstraints = Field(default_factory=TaskConstraints)
     assigned_to: str # AgentID
+    goal_id: Optional[str] = None # Echoed in the result so it reaches the goal's Director shard
     priority: TaskPriority = TaskPriority.MEDIUM
+    replica: Optional[int] = None # Speculative copy number; echoed in the result
+    model: Optional[str] = None # LLM model override for this copy
     created_at: datetime = Field(default_factory=lambda: datetime.now(timezone.utc))
 
 class AgentHeartbeat(BaseModel):
     agent_id: str
     status: AgentStatus
     current_task_id: Optional[str] = None
+    running_task_ids: List[str] = Field(default_factory=list) # Every task the agent is running; each renews its lease
+    interval: Optional[float] = None # Seconds until the next keepalive; drives STALLED detection
     timestamp: datetime = Field(default_factory=lambda: datetime.now(timezone.utc))
 
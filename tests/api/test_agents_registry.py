@@ -0,0 +1,34 @@
+import asyncio
+import pytest
+from src.api.routers.agents import AgentRegistryService, _agent_registry
+from src.core.bus.bus import InMemoryMessageBus
+from src.shared.models import AgentHeartbeat, AgentStatus
+
+@pytest.mark.asyncio
+async def test_registry_publishes_deltas_and_detects_stalls():
+    _agent_registry.clear()
+    bus = InMemoryMessageBus()
+    registry = AgentRegistryService(bus, missed_beats=2)
+    deltas = []
+    async def delta_cb(env):
+        deltas.append(env.payload)
+    await bus.subscribe("system.agent_status", delta_cb)
+    await registry.start_listening()
+
+    for _ in range(3):
+        await bus.publish("system.heartbeat", AgentHeartbeat(agent_id="a1", status=AgentStatus.IDLE, interval=0.05))
+    await bus.publish("system.heartbeat", {"agent_id": "a1", "status": "Working", "current_task_id": "t1", "interval": 0.05})
+    await asyncio.sleep(0.02)
+
+    assert [d["status"] for d in deltas] == ["Idle", "Working"]
+    record = _agent_registry["a1"]
+    assert record.current_task_id == "t1"
+
+    assert await registry.sweep(record.last_seen + 0.05) == []
+    assert await registry.sweep(record.last_seen + 0.2) == ["a1"]
+    await asyncio.sleep(0.02)
+    await registry.stop()
+
+    assert record.status == AgentStatus.STALLED
+    assert deltas[-1] == {"agent_id": "a1", "status": "Stalled", "current_task_id": "t1"}
+    _agent_registry.clear()
@@ -0,0 +1,117 @@
+import asyncio
+import json
+import pytest
+from unittest.mock import patch
+from src.api.broadcast import SlowClientError, StreamHub
+from src.core.bus.bus import InMemoryMessageBus
+
+async def _drain(client, count):
+    received = []
+    async for _, data in client:
+        received.append(json.loads(data))
+        if len(received) == count:
+            break
+    return received
+
+@pytest.mark.asyncio
+async def test_hub_encodes_once_and_fans_out():
+    bus = InMemoryMessageBus()
+    hub = StreamHub(bus, client_buffer=10)
+    await hub.start()
+    clients = [hub.connect() for _ in range(50)]
+    filtered = hub.connect(["agent.log"])
+
+    with patch.object(StreamHub, "encode", wraps=StreamHub.encode) as encode:
+        await bus.publish("workflow.state_change", {"goal_id": "g1"})
+        await bus.publish("agent.log", {"message": "hi"})
+        await asyncio.sleep(0.05)
+        assert encode.call_count == 2
+
+    for client in clients:
+        events = await _drain(client, 2)
+        assert [e["topic"] for e in events] == ["workflow.state_change", "agent.log"]
+    assert [e["topic"] for e in await _drain(filtered, 1)] == ["agent.log"]
+
+@pytest.mark.asyncio
+async def test_slow_client_is_disconnected():
+    bus = InMemoryMessageBus()
+    hub = StreamHub(bus, client_buffer=2, max_clients=1)
+    await hub.start()
+    slow = hub.connect()
+
+    with pytest.raises(RuntimeError):
+        hub.connect()
+
+    for i in range(3):
+        await bus.publish("agent.log", {"i": i})
+    await asyncio.sleep(0.05)
+
+    assert hub.client_count == 0 and hub.disconnected_slow == 1
+    with pytest.raises(SlowClientError):
+        await _drain(slow, 1)
+
+@pytest.mark.asyncio
+async def test_filters_and_last_event_id_replay():
+    bus = InMemoryMessageBus()
+    hub = StreamHub(bus, replay_size=3)
+    await hub.start()
+    assert hub.last_event_id == hub.event_id(0)
+
+    for i in range(4):
+        await bus.publish("workflow.state_change", {"goal_id": f"g{i % 2}", "i": i})
+    await bus.publish("agent.log", {"goal_id": "g1"})
+    await asyncio.sleep(0.05)
+
+    # Ring holds events 3..5; resuming after 3 is gapless.
+    resumed = hub.connect(["workflow.*"], goal_id="g1", last_event_id=hub.event_id(3))
+    assert not resumed.gap
+    events = await _drain(resumed, 1)
+    assert [(e["id"], e["payload"]["i"]) for e in events] == [(hub.event_id(4), 3)]
+
+    # Resuming from an evicted id replays what is left and flags the gap.
+    stale = hub.connect(last_event_id=hub.event_id(0))
+    assert stale.gap
+    assert [e["id"] for e in await _drain(stale, 3)] == [hub.event_id(n) for n in (3, 4, 5)]
+
+    # An id issued by another worker's hub (or before a restart) is a gap, not a replay.
+    other = StreamHub(InMemoryMessageBus())
+    foreign = hub.connect(last_event_id=other.event_id(4))
+    assert foreign.gap
+    hub.disconnect(foreign)
+    assert [e async for e in foreign] == []
+
+    with pytest.raises(ValueError):
+        hub.connect(["bad(*"])
+
+class QuietSocket:
+    """A WebSocket whose client hangs up without ever being sent anything."""
+
+    def __init__(self):
+        self.hung_up = asyncio.Event()
+        self.sent = []
+
+    async def accept(self):
+        pass
+
+    async def receive(self):
+        await self.hung_up.wait()
+        return {"type": "websocket.disconnect", "code": 1001}
+
+    async def send_text(self, data):
+        self.sent.append(data)
+
+@pytest.mark.asyncio
+async def test_websocket_releases_its_slot_when_the_client_hangs_up():
+    from src.api.routers.logs import websocket_endpoint
+
+    bus = InMemoryMessageBus()
+    hub = StreamHub(bus, max_clients=1)
+    socket = QuietSocket()
+    # A filter that never matches: no send would ever notice the disconnect
+    endpoint = asyncio.create_task(websocket_endpoint(socket, hub, topics="nothing.*", goal_id=None, last_event_id=None))
+    await asyncio.sleep(0.05)
+    assert hub.client_count == 1
+
+    socket.hung_up.set()
+    await asyncio.wait_for(endpoint, 1)
+    assert hub.client_count == 0 and socket.sent == []
@@ -1,3 +1,4 @@
+import asyncio
 import pytest
 from httpx import AsyncClient, ASGITransport
 from src.api.main import app, lifespan
@@ -23,10 +24,172 @@ async def test_create_and_query_goal():
             goal_id = response.json()["id"]
             assert goal_id is not None
             
-            # 2. Transition
+            # 2. The Director approves new goals right away, without a manual /advance
+            for _ in range(50):
+                response = await ac.get(f"/api/v1/workflow/goals/{goal_id}/history")
+                assert response.status_code == 200
+                if response.json()["state"]["status"] != WorkflowState.INITIALIZATION.value:
+                    break
+                await asyncio.sleep(0.02)
+            assert response.json()["state"]["status"] == WorkflowState.TASK_DECOMPOSITION.value
+            
+            # 3. Transition: N2 -> N2 is not part of the workflow
             response = await ac.post(f"/api/v1/workflow/goals/{goal_id}/advance", json={
                 "target_state": WorkflowState.TASK_DECOMPOSITION.value
             })
             
-            assert response.status_code == 200
-            assert response.json()["new_state"] == WorkflowState.TASK_DECOMPOSITION.value
+            assert response.status_code == 400
+
+@pytest.mark.asyncio
+async def test_artifact_content_range_request(tmp_path):
+    from src.api.deps import get_artifacts
+    from src.core.artifacts.service import ArtifactService
+    from src.core.artifacts.store import BlobStore
+    from src.core.db.session import AsyncSessionLocal, create_tables
+    from src.core.db.models import Goal, Task, Artifact
+
+    await create_tables()
+
+    service = ArtifactService(session_factory=AsyncSessionLocal, blobs=BlobStore(root=tmp_path, mmap_threshold=8))
+    async with AsyncSessionLocal() as session:
+        goal = Goal(title="Range Goal", description="Desc")
+        artifact = Artifact(task=Task(goal=goal, title="T", type="DESIGN"), name="a.txt", path="a.txt", media_type="text/plain")
+        session.add(artifact)
+        await session.commit()
+    await service.add_version(artifact.id, "0123456789abcdef", "GPTASe")
+
+    app.dependency_overrides[get_artifacts] = lambda: service
+    try:
+        async with AsyncClient(transport=ASGITransport(app=app), base_url="http://test") as ac:
+            full = await ac.get(f"/api/v1/artifacts/{artifact.id}/content")
+            partial = await ac.get(f"/api/v1/artifacts/{artifact.id}/versions/1/content", headers={"Range": "bytes=4-7"})
+            invalid = await ac.get(f"/api/v1/artifacts/{artifact.id}/content", headers={"Range": "bytes=99-"})
+    finally:
+        app.dependency_overrides.clear()
+
+    assert full.status_code == 200
+    assert full.text == "0123456789abcdef"
+    assert partial.status_code == 206
+    assert partial.content == b"4567"
+    assert partial.headers["content-range"] == "bytes 4-7/16"
+    assert invalid.status_code == 416
+
+@pytest.mark.asyncio
+async def test_query_logs_endpoint():
+    from datetime import datetime, timezone
+    from src.api.deps import get_log_index
+    from src.core.logs.index import LogIndex
+
+    index = LogIndex(capacity=10)
+    index.append(datetime.now(timezone.utc), "Director", "INFO", "Goal started")
+    index.append(datetime.now(timezone.utc), "Lyra", "ERROR", "Decomposition failed")
+
+    app.dependency_overrides[get_log_index] = lambda: index
+    try:
+        async with AsyncClient(transport=ASGITransport(app=app), base_url="http://test") as ac:
+            response = await ac.get("/api/v1/logs", params={"level": "error", "q": "failed"})
+    finally:
+        app.dependency_overrides.clear()
+
+    assert response.status_code == 200
+    assert [e["agent_id"] for e in response.json()["entries"]] == ["Lyra"]
+    from src.api.deps import get_hub
+    assert response.json()["last_event_id"] == get_hub().last_event_id
+
+@pytest.mark.asyncio
+async def test_list_goals():
+    from src.core.db.session import create_tables
+    await create_tables()
+    async with AsyncClient(transport=ASGITransport(app=app), base_url="http://test") as ac:
+        created = await ac.post("/api/v1/workflow/goals", json={"title": "Listed Goal", "description": "Desc"})
+        response = await ac.get("/api/v1/workflow/goals", params={"limit": 500})
+
+    assert response.status_code == 200
+    assert created.json()["id"] in [g["id"] for g in response.json()]
+
+@pytest.mark.asyncio
+async def test_bulk_goal_submission_and_admission_control():
+    import json
+    from src.api.deps import get_admission, _bus
+    from src.core.db.session import create_tables
+    from src.core.workflow.admission import AdmissionController
+
+    await create_tables()
+    admission = AdmissionController(_bus, max_backlog=3)
+    app.dependency_overrides[get_admission] = lambda: admission
+    try:
+        async with AsyncClient(transport=ASGITransport(app=app), base_url="http://test") as ac:
+            ndjson = "\n".join(json.dumps({"title": f"Bulk {i}", "description": "d"}) for i in range(3))
+            created = await ac.post("/api/v1/workflow/goals/bulk", content=ndjson, headers={"Content-Type": "application/x-ndjson"})
+            # The admitted goals hold their slots until their goal_started events arrive
+            assert admission.backlog == 3
+            rejected = await ac.post("/api/v1/workflow/goals/bulk", json=[{"title": "Late", "description": "d"}])
+            oversized = await ac.post("/api/v1/workflow/goals/bulk", json=[{"title": f"Big {i}", "description": "d"} for i in range(4)])
+            invalid = await ac.post("/api/v1/workflow/goals/bulk", json=[{"title": "No description"}])
+    finally:
+        app.dependency_overrides.clear()
+
+    assert created.status_code == 201 and created.json()["count"] == 3
+    assert rejected.status_code == 429 and int(rejected.headers["retry-after"]) >= 1
+    assert oversized.status_code == 413
+    assert invalid.status_code == 422 and invalid.json()["detail"]["index"] == 0
+
+@pytest.mark.asyncio
+async def test_task_responses_are_compressed_and_cached():
+    from src.api.deps import get_task_responses
+    from src.api.responses import TaskResponseCache
+    from src.core.db.session import AsyncSessionLocal, create_tables
+    from src.core.db.models import Goal, Task
+    from src.shared.models import TaskState
+
+    await create_tables()
+    async with AsyncSessionLocal() as session:
+        goal = Goal(title="Compressed Goal", description="Desc")
+        task = Task(goal=goal, title="Big", type="CODING", status=TaskState.COMPLETED.value, result={"output": "x" * 50000})
+        session.add(task)
+        await session.commit()
+
+    cache = TaskResponseCache(max_entries=10)
+    app.dependency_overrides[get_task_responses] = lambda: cache
+    try:
+        async with AsyncClient(transport=ASGITransport(app=app), base_url="http://test") as ac:
+            listed = await ac.get(f"/api/v1/workflow/goals/{goal.id}/tasks", headers={"Accept-Encoding": "gzip"})
+            single = await ac.get(f"/api/v1/workflow/tasks/{task.id}", headers={"Accept-Encoding": "identity"})
+            health = await ac.get("/health", headers={"Accept-Encoding": "gzip"})
+    finally:
+        app.dependency_overrides.clear()
+
+    assert listed.headers["content-encoding"] == "gzip"
+    assert int(listed.headers["content-length"]) < 1000
+    assert listed.json()[0]["result"]["output"] == "x" * 50000
+    assert "content-encoding" not in single.headers
+    assert single.json()["id"] == str(task.id)
+    assert (cache.misses, cache.hits) == (1, 1)
+    assert "content-encoding" not in health.headers
+
+@pytest.mark.asyncio
+async def test_goal_summary():
+    from uuid import uuid4
+    from src.core.db.session import AsyncSessionLocal, create_tables
+    from src.core.db.models import Goal, Task
+    from src.shared.models import TaskState
+
+    await create_tables()
+    async with AsyncSessionLocal() as session:
+        goal = Goal(title="Summary Goal", description="Desc", status=WorkflowState.EXECUTION_MONITORING.value)
+        session.add_all([goal] + [
+            Task(goal=goal, title=f"T{i}", type="CODING", status=status)
+            for i, status in enumerate([TaskState.PENDING.value, TaskState.COMPLETED.value, TaskState.COMPLETED.value])
+        ])
+        await session.commit()
+
+    async with AsyncClient(transport=ASGITransport(app=app), base_url="http://test") as ac:
+        response = await ac.get(f"/api/v1/workflow/goals/{goal.id}/summary")
+        missing = await ac.get(f"/api/v1/workflow/goals/{uuid4()}/summary")
+
+    assert response.status_code == 200
+    body = response.json()
+    assert body["status"] == WorkflowState.EXECUTION_MONITORING.value
+    assert body["counts"] == {"Pending": 1, "Active": 0, "Completed": 2, "Failed": 0}
+    assert body["percent_complete"] == pytest.approx(66.7)
+    assert missing.status_code == 404
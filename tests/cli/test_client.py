@@ -0,0 +1,74 @@
+import httpx
+import pytest
+from src.cli.client import OCSClient
+
+def _handler(request: httpx.Request) -> httpx.Response:
+    if request.url.path == "/api/v1/workflow/goals":
+        offset = int(request.url.params["offset"])
+        total = 5
+        page = [{"id": str(i), "title": f"G{i}"} for i in range(offset, min(offset + 2, total))]
+        return httpx.Response(200, json=page)
+    if request.url.path == "/api/v1/stream/stream":
+        assert request.url.params["topics"] == "agent.log"
+        body = b": ping\n\nid: 7\nevent: message\ndata: {\"topic\": \"agent.log\"}\n\nid: 8\ndata: {\"topic\":\ndata:  \"x\"}\n\n"
+        return httpx.Response(200, content=body, headers={"content-type": "text/event-stream"})
+    return httpx.Response(404)
+
+@pytest.mark.asyncio
+async def test_goal_pages_are_fetched_incrementally():
+    async with OCSClient("http://test", transport=httpx.MockTransport(_handler)) as client:
+        pages = [page async for page in client.iter_goals(page_size=2)]
+    assert [[g["id"] for g in page] for page in pages] == [["0", "1"], ["2", "3"], ["4"]]
+
+async def _take(stream, count):
+    events = []
+    async for event in stream:
+        events.append(event)
+        if len(events) == count:
+            break
+    return events
+
+@pytest.mark.asyncio
+async def test_stream_parses_sse_events():
+    async with OCSClient("http://test", transport=httpx.MockTransport(_handler)) as client:
+        events = await _take(client.stream(topics="agent.log"), 2)
+    assert [(e.id, e.event) for e in events] == [("7", "message"), ("8", "message")]
+    assert events[0].json() == {"topic": "agent.log"}
+    assert events[1].json() == {"topic": "x"}
+
+@pytest.mark.asyncio
+async def test_stream_reconnects_and_resumes_after_eof_and_connect_errors():
+    requests = []
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        requests.append(request.headers.get("last-event-id"))
+        if len(requests) == 2:
+            raise httpx.ConnectError("worker restarting", request=request)
+        body = f"id: e-{len(requests)}\ndata: {{}}\n\n".encode()
+        return httpx.Response(200, content=body, headers={"content-type": "text/event-stream"})
+
+    async with OCSClient("http://test", transport=httpx.MockTransport(handler)) as client:
+        events = await _take(client.stream(last_event_id="e-0", backoff=0), 3)
+    # Clean EOF after e-1, a refused connection, then two resumed connections
+    assert [e.id for e in events] == ["e-1", "e-3", "e-4"]
+    assert requests == ["e-0", "e-1", "e-1", "e-3"]
+
+@pytest.mark.asyncio
+async def test_following_logs_warns_about_missed_lines(monkeypatch):
+    from rich.console import Console
+    from src.cli import client as client_module, main
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        if request.url.path == "/api/v1/logs":
+            return httpx.Response(200, json={"entries": [], "last_event_id": "old-1"})
+        if request.headers.get("last-event-id") == "old-1":
+            body = b"event: gap\ndata: old-1\n\nid: new-1\ndata: {\"timestamp\": \"t\", \"payload\": {\"agent_id\": \"Lyra\", \"message\": \"hi\"}}\n\n"
+            return httpx.Response(200, content=body, headers={"content-type": "text/event-stream"})
+        raise RuntimeError("stop following")
+
+    monkeypatch.setattr(client_module, "OCSClient", lambda: OCSClient("http://test", transport=httpx.MockTransport(handler)))
+    monkeypatch.setattr(main, "console", Console(record=True, width=200))
+    with pytest.raises(RuntimeError, match="stop following"):
+        await main._show_logs(follow=True, agent=None, level=None, search=None, limit=10)
+    output = main.console.export_text().splitlines()
+    assert "lines were missed" in output[0] and "hi" in output[1]
@@ -0,0 +1,33 @@
+import subprocess
+import sys
+from pathlib import Path
+from typing import Dict
+
+ROOT = Path(__file__).resolve().parents[2]
+
+# Cumulative import time of src.cli.main, in microseconds
+CLI_IMPORT_BUDGET_US = 150_000
+HEAVY_MODULES = ("google.genai", "sqlalchemy", "fastapi", "httpx")
+
+def _import_times(module: str) -> Dict[str, int]:
+    """Runs `python -X importtime -c 'import module'` and returns cumulative times per module."""
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        cwd=ROOT, capture_output=True, text=True, check=True
+    )
+    times: Dict[str, int] = {}
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _, cumulative, name = line.split("|")
+        times[name.strip()] = int(cumulative)
+    return times
+
+def test_cli_cold_start_within_budget():
+    # Best of three runs, so a noisy neighbour doesn't fail the build.
+    runs = [_import_times("src.cli.main") for _ in range(3)]
+    assert min(run["src.cli.main"] for run in runs) < CLI_IMPORT_BUDGET_US
+    assert not [m for m in HEAVY_MODULES if m in runs[0]]
+
+def test_api_startup_does_not_import_genai():
+    assert "google.genai" not in _import_times("src.api.deps")
@@ -0,0 +1,54 @@
+import asyncio
+import pytest
+from unittest.mock import AsyncMock, MagicMock
+from src.core.bus.bus import InMemoryMessageBus
+from src.core.workflow.admission import AdmissionController
+
+def _empty_session_factory():
+    session = AsyncMock()
+    session.scalars.return_value = MagicMock(all=MagicMock(return_value=[]))
+    return MagicMock(return_value=MagicMock(__aenter__=AsyncMock(return_value=session), __aexit__=AsyncMock()))
+
+@pytest.mark.asyncio
+async def test_backlog_follows_workflow_events():
+    bus = InMemoryMessageBus()
+    admission = AdmissionController(bus, session_factory=_empty_session_factory(), max_backlog=2)
+    await admission.start()
+
+    for goal_id in ("g1", "g2", "g3"):
+        await bus.publish("workflow.goal_started", {"goal_id": goal_id})
+    await asyncio.sleep(0.01)
+    assert admission.backlog == 3
+    assert admission.retry_after() == admission.default_retry_after
+
+    await bus.publish("workflow.tasks_generated", {"goal_id": "g1"})
+    await asyncio.sleep(0.01)
+    await bus.publish("workflow.state_change", {"goal_id": "g2", "new_state": "SUSPENDED"})
+    await asyncio.sleep(0.01)
+
+    assert admission.backlog == 1
+    assert admission.retry_after() is None
+
+def test_batches_are_admitted_only_if_they_fit_whole():
+    admission = AdmissionController(InMemoryMessageBus(), max_backlog=3, default_retry_after=7)
+    admission._backlog.update({"g1", "g2"})
+    assert admission.retry_after(1) is None  # exactly at the limit
+    assert admission.retry_after(2) == 7
+    assert admission.fits(3) and not admission.fits(4)
+
+@pytest.mark.asyncio
+async def test_reservations_hold_room_until_the_goals_start():
+    bus = InMemoryMessageBus()
+    admission = AdmissionController(bus, session_factory=_empty_session_factory(), max_backlog=3, default_retry_after=7)
+    await admission.start()
+
+    # Two requests admitted back to back, before either has inserted anything
+    assert admission.reserve(2) is None
+    assert admission.reserve(2) == 7 and admission.backlog == 2
+    assert admission.reserve(1) is None and admission.backlog == 3
+
+    admission.release(1)  # that insert failed
+    for goal_id in ("g1", "g2", "g2"):
+        await bus.publish("workflow.goal_started", {"goal_id": goal_id})
+    await asyncio.sleep(0.01)
+    assert admission.backlog == 2 and admission._reserved == 0
@@ -67,3 +67,70 @@ async def test_agent_task_execution():
     assert results[0]["result"] == "processed"
 
     await agent.stop()
+
+@pytest.mark.asyncio
+async def test_heartbeats_are_coalesced():
+    bus = InMemoryMessageBus()
+    agent = MockAgent("quiet-agent", bus)
+    agent.heartbeat_interval = 10.0
+
+    heartbeats = []
+    async def hb_cb(env: MessageEnvelope):
+        heartbeats.append(env.payload)
+    await bus.subscribe("system.heartbeat", hb_cb)
+
+    await agent.start()
+    # Unchanged status is not re-published
+    await agent._emit_heartbeat()
+    await agent._emit_heartbeat()
+    await asyncio.sleep(0.05)
+    assert len(heartbeats) == 1
+
+    # A task run publishes exactly its two transitions
+    await bus.publish("agents.quiet-agent.task", AgentTask(type="test", payload={}, assigned_to="quiet-agent"))
+    await asyncio.sleep(0.05)
+    await agent.stop()
+
+    assert [hb.status for hb in heartbeats] == [AgentStatus.IDLE, AgentStatus.WORKING, AgentStatus.IDLE]
+
+class GatedAgent(BaseAgent):
+    """Runs each task until its gate is opened."""
+
+    def __init__(self, agent_id, bus):
+        super().__init__(agent_id, bus, heartbeat_interval=10.0)
+        self.gates = {}
+
+    async def process_task(self, task: AgentTask) -> Any:
+        await self.gates.setdefault(task.id, asyncio.Event()).wait()
+        return "done"
+
+@pytest.mark.asyncio
+async def test_heartbeats_report_every_running_task():
+    bus = InMemoryMessageBus()
+    agent = GatedAgent("busy-agent", bus)
+    heartbeats = []
+    async def hb_cb(env: MessageEnvelope):
+        heartbeats.append(env.payload)
+    await bus.subscribe("system.heartbeat", hb_cb)
+
+    await agent.start()
+    for task_id in ("A", "B"):
+        agent.gates[task_id] = asyncio.Event()
+        await bus.publish("agents.busy-agent.task", AgentTask(id=task_id, type="test", payload={}, assigned_to="busy-agent"))
+    await asyncio.sleep(0.05)
+    assert heartbeats[-1].running_task_ids == ["A", "B"]
+
+    # B finishing first leaves the agent working on A
+    agent.gates["B"].set()
+    await asyncio.sleep(0.05)
+    assert (heartbeats[-1].status, heartbeats[-1].current_task_id, heartbeats[-1].running_task_ids) == (AgentStatus.WORKING, "A", ["A"])
+
+    agent.gates["A"].set()
+    await asyncio.sleep(0.05)
+    await agent.stop()
+    assert (heartbeats[-1].status, heartbeats[-1].running_task_ids) == (AgentStatus.IDLE, [])
+
+    # A stopped agent takes no new tasks
+    await bus.publish("agents.busy-agent.task", AgentTask(id="C", type="test", payload={}, assigned_to="busy-agent"))
+    await asyncio.sleep(0.05)
+    assert "C" not in agent.gates and agent._runs == {}
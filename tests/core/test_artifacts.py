@@ -0,0 +1,88 @@
+
+import pytest
+from src.core.artifacts.store import BlobStore
+from src.core.artifacts.service import ArtifactService
+from src.core.db.session import AsyncSessionLocal, create_tables
+from src.core.db.models import Goal, Task, Artifact
+
+@pytest.fixture
+def blob_store(tmp_path):
+    return BlobStore(root=tmp_path, mmap_threshold=16)
+
+def test_blob_store_deduplicates_identical_content(blob_store):
+    first = blob_store.put(b"same content")
+    second = blob_store.put(b"same content")
+
+    assert first == second
+    assert len(list(blob_store.root.rglob("*"))) == 2  # one fan-out dir + one blob
+    assert blob_store.read(first) == b"same content"
+
+def test_blob_store_maps_large_blobs(blob_store):
+    small = blob_store.put(b"tiny")
+    large = blob_store.put(b"x" * 1024)
+
+    with blob_store.open(small) as view:
+        assert not view.is_mapped
+    with blob_store.open(large) as view:
+        assert view.is_mapped
+        assert b"".join(view.iter_range(10, 19, chunk_size=3)) == b"x" * 10
+
+def test_blob_store_rejects_invalid_digest(blob_store):
+    with pytest.raises(ValueError):
+        blob_store.path_for("../../etc/passwd")
+
+@pytest.mark.asyncio
+async def test_artifact_service_keeps_only_metadata_in_db(blob_store):
+    await create_tables()
+    async with AsyncSessionLocal() as session:
+        goal = Goal(title="Artifact Goal", description="Desc")
+        task = Task(goal=goal, title="Write doc", type="DESIGN")
+        artifact = Artifact(task=task, name="doc.md", path="doc.md")
+        session.add_all([goal, task, artifact])
+        await session.commit()
+
+    service = ArtifactService(session_factory=AsyncSessionLocal, blobs=blob_store)
+    v1 = await service.add_version(artifact.id, "# Draft", "Lyra")
+    v2 = await service.add_version(artifact.id, "# Draft", "GPTASe")
+
+    assert (v1.version_number, v2.version_number) == (1, 2)
+    assert v1.content is None
+    assert v1.blob_digest == v2.blob_digest
+
+    current = await service.get_version(artifact.id)
+    assert current.version_number == 2
+    assert await service.read_content(current) == "# Draft"
+
+def test_delta_round_trip():
+    from src.core.artifacts.delta import encode_delta, apply_delta
+
+    base = "".join(f"line {i}\n" for i in range(200))
+    target = base.replace("line 50\n", "line fifty\n") + "appended"
+    delta = encode_delta(base, target)
+
+    assert len(delta) < len(target.encode())
+    assert apply_delta(base, delta) == target
+
+@pytest.mark.asyncio
+async def test_artifact_versions_form_delta_chains(blob_store):
+    from src.core.artifacts.service import VersionCache
+
+    await create_tables()
+    async with AsyncSessionLocal() as session:
+        goal = Goal(title="Delta Goal", description="Desc")
+        artifact = Artifact(task=Task(goal=goal, title="Refine", type="DESIGN"), name="spec.md", path="spec.md")
+        session.add(artifact)
+        await session.commit()
+
+    service = ArtifactService(session_factory=AsyncSessionLocal, blobs=blob_store, keyframe_interval=4)
+    body = "".join(f"requirement {i}\n" for i in range(100))
+    contents = [body + f"revision {n}\n" for n in range(1, 11)]
+    versions = [await service.add_version(artifact.id, text, "Lyra") for text in contents]
+
+    assert [v.encoding for v in versions] == ["raw", "delta", "delta", "delta"] * 2 + ["raw", "delta"]
+    assert versions[2].base_version_number == 2
+
+    # Reconstruct every version from storage alone
+    service.cache = VersionCache(max_entries=16)
+    for version, expected in zip(versions, contents, strict=True):
+        assert await service.read_content(version) == expected
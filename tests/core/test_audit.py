@@ -0,0 +1,57 @@
+
+import pytest
+import asyncio
+from datetime import datetime, timedelta, timezone
+from uuid import uuid4
+from sqlalchemy import select, func
+from src.core.audit.writer import AuditWriter, partition_key
+from src.core.bus.bus import InMemoryMessageBus, MessageEnvelope
+from src.core.db.session import AsyncSessionLocal, create_tables
+from src.core.db.models import AuditLog
+
+@pytest.mark.asyncio
+async def test_audit_writer_buffers_and_bulk_inserts():
+    await create_tables()
+    bus = InMemoryMessageBus()
+    writer = AuditWriter(bus, session_factory=AsyncSessionLocal, batch_size=2, flush_interval=60)
+    await writer.start()
+
+    goal_id = uuid4()
+    await bus.publish("workflow.state_change", {"goal_id": str(goal_id), "new_state": "N2_TASK_DECOMPOSITION"})
+    await bus.publish("agent.log", {"agent_id": "Lyra", "level": "INFO", "message": "hi"})
+    await bus.publish("system.heartbeat", {"agent_id": "Lyra"})  # not audited
+    await asyncio.sleep(0.1)
+
+    await writer.stop()
+    assert writer.written == 2
+
+    async with AsyncSessionLocal() as session:
+        rows = (await session.execute(select(AuditLog).where(AuditLog.entity_id == goal_id))).scalars().all()
+    assert len(rows) == 1
+    assert rows[0].action_type == "workflow.state_change"
+    assert rows[0].entity_type == "goal"
+
+@pytest.mark.asyncio
+async def test_audit_writer_ring_buffer_drops_oldest():
+    writer = AuditWriter(InMemoryMessageBus(), buffer_size=2)
+    for i in range(3):
+        await writer.record(MessageEnvelope(topic="agent.log", payload={"message": str(i)}))
+
+    assert writer.dropped == 1
+    assert [row["metadata_json"]["message"] for row in writer._buffer] == ["1", "2"]
+
+@pytest.mark.asyncio
+async def test_audit_writer_purges_expired_partitions():
+    await create_tables()
+    writer = AuditWriter(InMemoryMessageBus(), session_factory=AsyncSessionLocal, retention_days=7)
+    old = datetime.now(timezone.utc) - timedelta(days=30)
+    marker = str(uuid4())
+    await writer.record(MessageEnvelope(topic="agent.log", payload={"message": marker}, timestamp=old))
+    await writer.flush()
+
+    assert await writer.purge_expired() >= 1
+    async with AsyncSessionLocal() as session:
+        remaining = await session.scalar(
+            select(func.count()).select_from(AuditLog).where(AuditLog.partition_key <= partition_key(old))
+        )
+    assert remaining == 0
@@ -41,3 +41,64 @@ async def test_bus_multiple_subscribers():
     await asyncio.sleep(0.1)
     
     assert count == 3
+
+@pytest.mark.asyncio
+async def test_bus_pattern_subscription():
+    bus = InMemoryMessageBus()
+    received = []
+
+    async def callback(env):
+        received.append(env.topic)
+
+    await bus.subscribe("workflow.*", callback)
+
+    await bus.publish("workflow.state_change", {})
+    await bus.publish("workflow.task_result", {})
+    await bus.publish("agent.log", {})
+    await asyncio.sleep(0.1)
+
+    assert sorted(received) == ["workflow.state_change", "workflow.task_result"]
+
+@pytest.mark.asyncio
+async def test_bus_orders_events_per_goal_and_parallelizes_goals():
+    bus = InMemoryMessageBus()
+    log = []
+
+    async def on_state_change(env):
+        log.append(("start", env.payload["goal_id"], env.payload["n"]))
+        await asyncio.sleep(0.05)
+        log.append(("end", env.payload["goal_id"], env.payload["n"]))
+
+    async def on_tasks_generated(env):
+        log.append(("tasks", env.payload["goal_id"], env.payload["n"]))
+
+    await bus.subscribe("workflow.state_change", on_state_change)
+    await bus.subscribe("workflow.tasks_generated", on_tasks_generated)
+
+    for goal in ("g1", "g2"):
+        await bus.publish("workflow.state_change", {"goal_id": goal, "n": 1})
+        await bus.publish("workflow.tasks_generated", {"goal_id": goal, "n": 2})
+    await asyncio.sleep(0.01)
+    assert [entry for entry in log if entry[0] == "tasks"] == [] # still behind the slow state_change
+    await asyncio.sleep(0.1)
+
+    for goal in ("g1", "g2"):
+        assert [(kind, seq) for kind, g, seq in log if g == goal] == [("start", 1), ("end", 1), ("tasks", 2)]
+    assert log.index(("start", "g2", 1)) < log.index(("end", "g1", 1)) # the two goals ran side by side
+    assert bus.stats()["lanes"] == 0
+
+@pytest.mark.asyncio
+async def test_bus_leaves_unkeyed_topics_concurrent():
+    bus = InMemoryMessageBus()
+    received = []
+
+    async def callback(env):
+        await asyncio.sleep(0.05 if env.payload["n"] == 0 else 0)
+        received.append(env.payload["n"])
+
+    await bus.subscribe("agents.GPTASe.task", callback)
+    for n in range(2):
+        await bus.publish("agents.GPTASe.task", {"goal_id": "g1", "n": n})
+    await asyncio.sleep(0.1)
+
+    assert received == [1, 0]
@@ -0,0 +1,88 @@
+import pytest
+from src.core.db.cache import EntityCache
+from src.core.db.session import AsyncSessionLocal, create_tables
+from src.core.db.models import Goal
+from src.core.workflow.state import WorkflowState
+
+async def _seed_goal() -> Goal:
+    async with AsyncSessionLocal() as session:
+        goal = Goal(title="Cached Goal", description="Desc")
+        session.add(goal)
+        await session.commit()
+        return goal
+
+@pytest.mark.asyncio
+async def test_read_through_hits_and_misses():
+    await create_tables()
+    goal = await _seed_goal()
+    cache = EntityCache(max_entries=10)
+
+    async with AsyncSessionLocal() as session:
+        first = await cache.get(session, Goal, goal.id)
+        second = await cache.get(session, Goal, goal.id)
+
+    assert first.title == second.title == "Cached Goal"
+    assert cache.stats()["hits"] == 1 and cache.stats()["misses"] == 1
+
+@pytest.mark.asyncio
+async def test_write_through_update_and_invalidate():
+    await create_tables()
+    goal = await _seed_goal()
+    cache = EntityCache(max_entries=10)
+
+    async with AsyncSessionLocal() as session:
+        await cache.get(session, Goal, goal.id)
+
+    # Writer path: merge the cached snapshot, update, publish the committed row.
+    async with AsyncSessionLocal() as session:
+        editable = await cache.get_for_update(session, Goal, goal.id)
+        editable.status = WorkflowState.TASK_DECOMPOSITION.value
+        await session.commit()
+        cache.put(editable)
+
+    async with AsyncSessionLocal() as session:
+        assert (await session.get(Goal, goal.id)).status == WorkflowState.TASK_DECOMPOSITION.value
+        assert (await cache.get(session, Goal, goal.id)).status == WorkflowState.TASK_DECOMPOSITION.value
+
+    cache.invalidate(Goal, goal.id)
+    assert cache.stats()["size"] == 0 and cache.stats()["invalidations"] == 1
+
+@pytest.mark.asyncio
+async def test_eviction_is_lru():
+    await create_tables()
+    goals = [await _seed_goal() for _ in range(3)]
+    cache = EntityCache(max_entries=2)
+
+    async with AsyncSessionLocal() as session:
+        for goal in goals:
+            await cache.get(session, Goal, goal.id)
+
+    assert cache.stats()["size"] == 2
+    assert (Goal, goals[0].id) not in cache._entries
+
+@pytest.mark.asyncio
+async def test_a_write_during_a_load_wins_and_leaves_no_stamp_behind():
+    await create_tables()
+    goal = await _seed_goal()
+    cache = EntityCache(max_entries=10)
+
+    class WriteDuringLoad:
+        """A session whose load is overtaken by a write to the same row."""
+        def __init__(self, session):
+            self.session = session
+
+        async def get(self, model, ident):
+            loaded = await self.session.get(model, ident)
+            cache.invalidate(model, ident)
+            return loaded
+
+    async with AsyncSessionLocal() as session:
+        assert await cache.get(WriteDuringLoad(session), Goal, goal.id) is not None
+    assert cache.stats()["size"] == 0  # the stale load was not cached
+
+    for _ in range(3):
+        cache.invalidate(Goal, goal.id)
+    async with AsyncSessionLocal() as session:
+        await cache.get(session, Goal, goal.id)
+    assert cache.stats()["size"] == 1
+    assert cache._stamps == {} and cache._loading == {}
@@ -0,0 +1,72 @@
+
+import os
+import asyncio
+import pytest
+from uuid import uuid4
+from sqlalchemy.dialects import postgresql
+from src.core.db.claims import claim_candidates_query, claim_pending_tasks
+from src.core.db.session import AsyncSessionLocal, create_tables
+from src.core.db.models import Goal, Task
+from src.shared.models import TaskState
+
+def test_claim_query_uses_skip_locked_on_postgres():
+    sql = str(claim_candidates_query(uuid4(), limit=5).compile(dialect=postgresql.dialect()))
+    assert sql.rstrip().endswith("FOR UPDATE SKIP LOCKED")
+    assert "LIMIT" in sql and "tasks.status =" in sql and "tasks.goal_id =" in sql
+
+async def _seed_goal(session_factory, task_count: int) -> Goal:
+    async with session_factory() as session:
+        goal = Goal(title="Claim Goal", description="Desc")
+        session.add_all([goal] + [Task(goal=goal, title=f"T{i}", type="CODING", status=TaskState.PENDING.value) for i in range(task_count)])
+        await session.commit()
+        return goal
+
+@pytest.mark.asyncio
+async def test_claim_pending_tasks_assigns_each_task_once():
+    await create_tables()
+    goal = await _seed_goal(AsyncSessionLocal, 3)
+
+    async with AsyncSessionLocal() as session:
+        first = await claim_pending_tasks(session, "GPTASe", goal_id=goal.id, limit=2)
+        await session.commit()
+    async with AsyncSessionLocal() as session:
+        second = await claim_pending_tasks(session, "GPTASe", goal_id=goal.id)
+        await session.commit()
+    async with AsyncSessionLocal() as session:
+        third = await claim_pending_tasks(session, "GPTASe", goal_id=goal.id)
+
+    assert len(first) == 2 and len(second) == 1 and third == []
+    assert {t.id for t in first}.isdisjoint({t.id for t in second})
+    assert all(t.status == TaskState.ACTIVE.value and t.assigned_to == "GPTASe" for t in first + second)
+
+@pytest.mark.asyncio
+async def test_concurrent_claims_on_postgres():
+    """Runs against a real PostgreSQL instance when OCS_TEST_POSTGRES_URL is set (e.g. a local container)."""
+    url = os.getenv("OCS_TEST_POSTGRES_URL")
+    if not url:
+        pytest.skip("OCS_TEST_POSTGRES_URL not set")
+    pytest.importorskip("asyncpg")
+
+    from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker
+    from src.core.db.models import Base
+
+    pg_engine = create_async_engine(url, pool_size=10)
+    async with pg_engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+    factory = async_sessionmaker(pg_engine, expire_on_commit=False)
+    goal = await _seed_goal(factory, 50)
+
+    async def worker(n: int) -> list:
+        claimed = []
+        while True:
+            async with factory() as session:
+                batch = await claim_pending_tasks(session, f"worker-{n}", goal_id=goal.id, limit=3)
+                await session.commit()
+            if not batch:
+                return claimed
+            claimed.extend(t.id for t in batch)
+
+    results = await asyncio.gather(*(worker(n) for n in range(8)))
+    all_claimed = [task_id for claimed in results for task_id in claimed]
+    assert len(all_claimed) == len(set(all_claimed)) == 50
+    await pg_engine.dispose()
@@ -0,0 +1,76 @@
+import asyncio
+import pytest
+from src.core.bus.bus import InMemoryMessageBus
+from src.core.cluster import BusBridge, ClusterMember, FileLock
+
+def test_file_lock_is_exclusive(tmp_path):
+    first, second = FileLock(tmp_path / "owner.lock"), FileLock(tmp_path / "owner.lock")
+    assert first.acquire()
+    assert not second.acquire()
+    first.release()
+    assert second.acquire()
+    second.release()
+
+def _collect(received, name):
+    async def cb(env):
+        received.append((name, env.topic, env.source_id))
+    return cb
+
+@pytest.mark.asyncio
+async def test_bridge_relays_between_workers_without_echo(tmp_path):
+    owner_bus, a_bus, b_bus = InMemoryMessageBus(), InMemoryMessageBus(), InMemoryMessageBus()
+    owner, a, b = (BusBridge(bus, tmp_path / "bus.sock") for bus in (owner_bus, a_bus, b_bus))
+    await owner.serve()
+    assert await a.connect() and await b.connect()
+    await asyncio.sleep(0.05) # let the owner accept both connections
+
+    received = []
+    for name, bus in (("owner", owner_bus), ("a", a_bus), ("b", b_bus)):
+        await bus.subscribe(".*", _collect(received, name))
+
+    await a_bus.publish("workflow.goal_started", {"goal_id": "x"}, source_id="api-a")
+    await owner_bus.publish("agent.log", {"message": "hi"}, source_id="Director")
+    await asyncio.sleep(0.2)
+
+    assert sorted(received) == sorted([
+        ("a", "workflow.goal_started", "api-a"),
+        ("owner", "workflow.goal_started", "api-a"),
+        ("b", "workflow.goal_started", "api-a"),
+        ("owner", "agent.log", "Director"),
+        ("a", "agent.log", "Director"),
+        ("b", "agent.log", "Director"),
+    ])
+    for bridge in (a, b, owner):
+        await bridge.close()
+
+@pytest.mark.asyncio
+async def test_only_one_member_runs_agents(tmp_path):
+    elected = []
+    async def on_elected(name):
+        elected.append(name)
+
+    first = ClusterMember(InMemoryMessageBus(), lambda: on_elected("first"), cluster_dir=tmp_path, poll_interval=0.05)
+    second = ClusterMember(InMemoryMessageBus(), lambda: on_elected("second"), cluster_dir=tmp_path, poll_interval=0.05)
+    await first.start()
+    await second.start()
+    await asyncio.sleep(0.1)
+    assert elected == ["first"] and second.bridge.connected
+
+    # Owner goes away: the survivor takes over.
+    await first.stop()
+    await asyncio.sleep(0.2)
+    assert elected == ["first", "second"] and second.is_owner
+    await second.stop()
+
+@pytest.mark.asyncio
+async def test_owner_bridge_closes_with_workers_still_connected(tmp_path):
+    owner, worker = BusBridge(InMemoryMessageBus(), tmp_path / "bus.sock"), BusBridge(InMemoryMessageBus(), tmp_path / "bus.sock")
+    await owner.serve()
+    assert await worker.connect()
+    await asyncio.sleep(0.05) # let the owner accept the connection
+    assert owner.connected
+
+    # Server.wait_closed() waits for open connections on Python 3.12+
+    await asyncio.wait_for(owner.close(), timeout=2)
+    assert not owner.connected and not owner.is_server
+    await worker.close()
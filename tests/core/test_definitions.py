@@ -0,0 +1,85 @@
+import json
+import pytest
+from uuid import uuid4
+from unittest.mock import AsyncMock, MagicMock
+
+from src.core.db.models import Goal
+from src.core.workflow.definition import (
+    BUILTIN_DIR, WorkflowDefinitionError, WorkflowRegistry, WorkflowSpec, compile_workflow, default_registry
+)
+from src.core.workflow.engine import WorkflowEngine
+from src.core.workflow.guards import guard_goal_defined
+from src.core.workflow.state import WorkflowState, TransitionError
+
+S = WorkflowState
+
+def _spec(version: int = 2, **overrides) -> WorkflowSpec:
+    data = {
+        "name": "ocs",
+        "version": version,
+        "initial": S.INITIALIZATION,
+        "transitions": [
+            {"from_state": S.INITIALIZATION, "to_state": S.TASK_DECOMPOSITION},
+            {"from_state": S.TASK_DECOMPOSITION, "to_state": S.COMPLETED},
+        ],
+    }
+    data.update(overrides)
+    return WorkflowSpec.model_validate(data)
+
+def test_builtin_definition_matches_the_standard_cycle():
+    workflow = default_registry().get()
+    assert workflow.key == "ocs@1" and workflow.initial == S.INITIALIZATION
+    assert workflow.allows(S.INITIALIZATION, S.TASK_DECOMPOSITION)
+    assert not workflow.allows(S.INITIALIZATION, S.EXECUTION_MONITORING)
+    assert workflow.allows(S.EXECUTION_MONITORING, S.EXECUTION_MONITORING)
+    assert workflow.can_reach(S.INITIALIZATION, S.COMPLETED)
+    assert not workflow.can_reach(S.COMPLETED, S.INITIALIZATION)
+    assert workflow.guards(S.INITIALIZATION, S.TASK_DECOMPOSITION) == (guard_goal_defined,)
+    assert [r.action for r in workflow.reactions(S.TASK_DECOMPOSITION)] == ["delegate"]
+    with pytest.raises(TransitionError):
+        workflow.validate(S.COMPLETED, S.INITIALIZATION)
+
+@pytest.mark.parametrize("overrides, message", [
+    ({"transitions": [{"from_state": S.INITIALIZATION, "to_state": S.COMPLETED, "required_conditions": ["no_such_guard"]}]},
+     "unknown guard"),
+    ({"transitions": [
+        {"from_state": S.INITIALIZATION, "to_state": S.COMPLETED},
+        {"from_state": S.SUSPENDED, "to_state": S.COMPLETED},
+    ]}, "unreachable"),
+    ({"reactions": {S.INITIALIZATION: [{"action": "advance", "target": S.COMPLETED}]}}, "not a transition"),
+])
+def test_invalid_definitions_are_rejected(overrides, message):
+    with pytest.raises(WorkflowDefinitionError, match=message):
+        compile_workflow(_spec(**overrides))
+
+def test_registry_loads_directories_and_rejects_duplicates(tmp_path):
+    (tmp_path / "ocs-v2.json").write_text(_spec().model_dump_json(), encoding="utf-8")
+    registry = WorkflowRegistry.load(BUILTIN_DIR, tmp_path)
+    assert registry.keys() == ["ocs@1", "ocs@2"]
+    assert registry.get().key == "ocs@1"
+
+    (tmp_path / "copy.json").write_text(json.dumps(json.loads(_spec().model_dump_json())), encoding="utf-8")
+    with pytest.raises(WorkflowDefinitionError, match="already registered"):
+        WorkflowRegistry.load(BUILTIN_DIR, tmp_path)
+
+@pytest.mark.asyncio
+async def test_goals_keep_the_version_they_started_under():
+    registry = WorkflowRegistry([default_registry().get(), compile_workflow(_spec())], default="ocs@1")
+    session = AsyncMock()
+    session.add = MagicMock()
+    session.execute = AsyncMock(return_value=MagicMock(rowcount=1))
+    factory = MagicMock()
+    factory.return_value.__aenter__.return_value = session
+    engine = WorkflowEngine(bus=AsyncMock(), session_factory=factory, workflows=registry)
+
+    goal_v1 = Goal(id=uuid4(), title="T", description="D", status=S.TASK_DECOMPOSITION.value, version=2)
+    goal_v2 = Goal(id=uuid4(), title="T", description="D", status=S.TASK_DECOMPOSITION.value, version=2, workflow="ocs@2")
+    session.get.side_effect = lambda model, goal_id, **_: {goal_v1.id: goal_v1, goal_v2.id: goal_v2}[goal_id]
+
+    # ocs@2 finishes right after decomposition; ocs@1 goals still go through design
+    assert await engine.transition_phase(goal_v2.id, S.COMPLETED)
+    with pytest.raises(TransitionError, match="ocs@1"):
+        await engine.transition_phase(goal_v1.id, S.COMPLETED)
+
+    with pytest.raises(ValueError, match="Unknown workflow"):
+        await engine.initialize_goal("T", "D", workflow="ocs@9")
@@ -87,3 +87,85 @@ async def test_director_logs_and_delegates_on_state_change(mock_bus, mock_engine
         "title": "Delegated Goal",
         "description": "Desc"
     })
+
+@pytest.mark.asyncio
+async def test_director_advances_when_the_last_task_finishes():
+    from src.core.db.claims import claim_pending_tasks
+    from src.core.db.models import Goal, Task
+    from src.core.db.progress import record_progress
+    from src.core.db.session import AsyncSessionLocal, create_tables
+    from src.core.workflow.engine import WorkflowEngine
+    from src.core.workflow.state import TransitionError
+    from src.shared.models import TaskState
+
+    await create_tables()
+    bus = AsyncMock()
+    engine = WorkflowEngine(bus=bus)
+    director = DirectorAgent(bus=bus, engine=engine)
+    goal_id = await engine.initialize_goal("Pipeline", "Desc")
+    await engine.transition_phase(goal_id, WorkflowState.TASK_DECOMPOSITION)
+
+    async with AsyncSessionLocal() as session:
+        session.add_all([Task(goal_id=goal_id, title=f"T{i}", type="CODING", status=TaskState.PENDING.value) for i in range(2)])
+        await record_progress(session, goal_id, {TaskState.PENDING.value: 2})
+        await session.commit()
+    async with AsyncSessionLocal() as session:
+        tasks = await claim_pending_tasks(session, "GPTASe", goal_id=goal_id)
+        await session.commit()
+
+    async def report(task, status):
+        payload = {"task_id": str(task.id), "status": status, "result": "ok"}
+        await director.on_task_result(MessageEnvelope(topic="workflow.task_result", payload=payload, source_id="test"))
+        async with AsyncSessionLocal() as session:
+            return (await session.get(Goal, goal_id)).status
+
+    # No sleeps and no /advance calls: the last result moves the goal on
+    assert await report(tasks[0], TaskState.COMPLETED.value) == WorkflowState.TASK_DECOMPOSITION.value
+    assert await report(tasks[1], TaskState.FAILED.value) == WorkflowState.DESIGN_IMPLEMENTATION.value
+
+    await engine.transition_phase(goal_id, WorkflowState.EXECUTION_MONITORING)
+    with pytest.raises(TransitionError, match="1 tasks failed"):
+        await engine.transition_phase(goal_id, WorkflowState.KICKLANG_INTEGRATION)
+
+@pytest.mark.asyncio
+async def test_director_ignores_results_for_tasks_it_no_longer_runs():
+    from src.core.db.claims import claim_pending_tasks
+    from src.core.db.models import Task
+    from src.core.db.progress import get_progress, record_progress, summarize
+    from src.core.db.session import AsyncSessionLocal, create_tables
+    from src.core.workflow.engine import WorkflowEngine
+    from src.core.workflow.timers import WorkflowTimers
+    from src.shared.models import TaskState
+
+    await create_tables()
+    bus = AsyncMock()
+    engine = WorkflowEngine(bus=bus)
+    director = DirectorAgent(bus=bus, engine=engine)
+    goal_id = await engine.initialize_goal("Stale results", "Desc")
+
+    async with AsyncSessionLocal() as session:
+        session.add_all([Task(goal_id=goal_id, title=f"T{i}", type="CODING", status=TaskState.PENDING.value) for i in range(2)])
+        await record_progress(session, goal_id, {TaskState.PENDING.value: 2})
+        await session.commit()
+    async with AsyncSessionLocal() as session:
+        done, requeued = await claim_pending_tasks(session, "GPTASe", goal_id=goal_id)
+        await session.commit()
+
+    async def report(task, status, agent_id="GPTASe"):
+        payload = {"task_id": str(task.id), "status": status, "result": "ok", "agent_id": agent_id}
+        await director.on_task_result(MessageEnvelope(topic="workflow.task_result", payload=payload, source_id=agent_id))
+        async with AsyncSessionLocal() as session:
+            return (await session.get(Task, task.id)).status
+
+    assert await report(done, TaskState.COMPLETED.value, agent_id="Lyra") == TaskState.ACTIVE.value
+    assert await report(done, TaskState.COMPLETED.value) == TaskState.COMPLETED.value
+    # A late result of a run whose lease had expired flips nothing
+    assert await report(done, TaskState.FAILED.value) == TaskState.COMPLETED.value
+    await WorkflowTimers(bus=bus, engine=engine).requeue([str(requeued.id)], TaskState.ACTIVE.value, "lease expired")
+    assert await report(requeued, TaskState.FAILED.value) == TaskState.PENDING.value
+
+    settled = [call.args[1]["task_id"] for call in bus.publish.call_args_list if call.args[0] == "workflow.task_settled"]
+    assert settled == [str(done.id)]
+    async with AsyncSessionLocal() as session:
+        counts = summarize(await get_progress(session, goal_id))["counts"]
+    assert counts == {TaskState.PENDING.value: 1, TaskState.ACTIVE.value: 0, TaskState.COMPLETED.value: 1, TaskState.FAILED.value: 0}
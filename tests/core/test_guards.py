@@ -0,0 +1,193 @@
+import asyncio
+import time
+import pytest
+from uuid import uuid4
+
+from src.core.db.models import Goal
+from src.core.workflow.definition import WorkflowDefinition, WorkflowSpec, compile_workflow
+from src.core.workflow.guards import GuardResultCache, check_guards, guard, plan_guards
+from src.core.workflow.state import WorkflowState, WorkflowTransition, TransitionError
+
+TRANSITION = (WorkflowState.INITIALIZATION, WorkflowState.TASK_DECOMPOSITION)
+
+def _goal(version: int = 1) -> Goal:
+    return Goal(id=uuid4(), title="T", description="D", status=WorkflowState.INITIALIZATION.value, version=version)
+
+def _workflow(*guards) -> WorkflowDefinition:
+    """A one-transition workflow whose only edge requires the given guards."""
+    return compile_workflow(WorkflowSpec(
+        name="guards-test", version=1, initial=TRANSITION[0],
+        transitions=[WorkflowTransition(
+            from_state=TRANSITION[0], to_state=TRANSITION[1],
+            required_conditions=[g.__name__ for g in guards]
+        )]
+    ))
+
+@pytest.mark.asyncio
+async def test_independent_guards_run_concurrently():
+    @guard(cost=0.5)
+    async def slow_a(goal):
+        await asyncio.sleep(0.1)
+        return True
+
+    @guard(cost=0.5)
+    async def slow_b(goal):
+        await asyncio.sleep(0.1)
+        return True
+
+    workflow = _workflow(slow_a, slow_b)
+    started = time.perf_counter()
+    await check_guards(_goal(), TRANSITION[1], workflow=workflow)
+    assert time.perf_counter() - started < 0.18
+
+@pytest.mark.asyncio
+async def test_first_failure_cancels_the_rest():
+    calls = []
+
+    @guard(cost=0.5)
+    async def hangs(goal):
+        try:
+            await asyncio.sleep(10)
+        except asyncio.CancelledError:
+            calls.append("cancelled")
+            raise
+        return True
+
+    @guard(cost=0.5)
+    async def fails(goal):
+        raise TransitionError("nope")
+
+    @guard(cost=50.0)
+    async def expensive(goal):
+        calls.append("expensive")
+        return True
+
+    workflow = _workflow(hangs, fails, expensive)
+    with pytest.raises(TransitionError, match="nope"):
+        await asyncio.wait_for(check_guards(_goal(), TRANSITION[1], workflow=workflow), timeout=1)
+    await asyncio.sleep(0)
+    assert calls == ["cancelled"]
+
+def test_plan_orders_dependencies_and_cost():
+    @guard(cost=0.1)
+    async def base(goal): return True
+
+    @guard(cost=5.0)
+    async def costly(goal): return True
+
+    @guard(cost=0.2, depends_on=[base])
+    async def child(goal): return True
+
+    stages = plan_guards([costly, child])
+    assert [[s.name for s in stage] for stage in stages] == [["base"], ["child"], ["costly"]]
+
+@pytest.mark.asyncio
+async def test_outcomes_are_memoized_per_goal_version():
+    calls = []
+
+    @guard(cost=0.1)
+    async def counted(goal):
+        calls.append(goal.version)
+        return goal.version > 1
+
+    @guard(cost=0.1, cacheable=False)
+    async def uncached(goal):
+        calls.append("uncached")
+        return True
+
+    workflow = _workflow(counted, uncached)
+    cache = GuardResultCache()
+    goal = _goal()
+    for _ in range(2):
+        with pytest.raises(TransitionError, match="counted"):
+            await check_guards(goal, TRANSITION[1], cache, workflow)
+    assert calls.count(1) == 1 and cache.hits == 1
+
+    goal.version = 2
+    await check_guards(goal, TRANSITION[1], cache, workflow)
+    assert calls.count(2) == 1
+    assert calls.count("uncached") == 3
+
+@pytest.mark.asyncio
+async def test_invalidate_frees_only_that_goals_entries():
+    @guard(cost=0.1)
+    async def passes(goal):
+        return True
+
+    cache = GuardResultCache(max_entries=3)
+    goals = [_goal() for _ in range(2)]
+    for goal in goals:
+        await check_guards(goal, TRANSITION[1], cache, _workflow(passes))
+    goals[0].version = 2
+    await check_guards(goals[0], TRANSITION[1], cache, _workflow(passes))
+
+    cache.invalidate(goals[0].id)
+    assert [key[0] for key in cache._entries] == [goals[1].id]
+    assert set(cache._by_goal) == {goals[1].id}
+
+    for version in range(2, 6):  # evicting entries drops them from the index too
+        goals[1].version = version
+        await check_guards(goals[1], TRANSITION[1], cache, _workflow(passes))
+    assert cache._by_goal == {goals[1].id: set(cache._entries)} and len(cache._entries) == 3
+
+@pytest.mark.asyncio
+async def test_task_guards_run_together_on_one_count_query():
+    from unittest.mock import patch
+    from src.core.db.models import Task
+    from src.core.db.session import AsyncSessionLocal, create_tables
+    from src.core.workflow import guards
+    from src.shared.models import TaskState
+
+    await create_tables()
+    goal = Goal(id=uuid4(), title="T", description="D", status=WorkflowState.EXECUTION_MONITORING.value)
+    async with AsyncSessionLocal() as session:
+        session.add(goal)
+        session.add_all([Task(goal_id=goal.id, title=f"T{i}", type="CODING", status=status)
+                         for i, status in enumerate((TaskState.COMPLETED.value, TaskState.FAILED.value))])
+        await session.commit()
+
+    names = ("guard_task_decomposition_done", "guard_tasks_finished", "guard_tasks_succeeded")
+    stages = plan_guards([guards.resolve_guard(name) for name in names])
+    assert [sorted(s.name for s in stage) for stage in stages] == [sorted(names)]
+
+    async with AsyncSessionLocal() as session:
+        goal = await session.get(Goal, goal.id)
+        with patch.object(guards, "task_counts", wraps=guards.task_counts) as counted:
+            with pytest.raises(TransitionError, match="1 tasks failed"):
+                await check_guards(goal, WorkflowState.KICKLANG_INTEGRATION)
+        assert counted.call_count == 1
+
+@pytest.mark.asyncio
+async def test_concurrent_guards_query_in_their_own_sessions():
+    from sqlalchemy.ext.asyncio import async_object_session
+    from src.core.db.session import AsyncSessionLocal, create_tables
+    from src.core.workflow.guards import guard_session
+
+    sessions = []
+
+    async def record(goal):
+        async with guard_session(goal) as session:
+            sessions.append(session)
+            await asyncio.sleep(0.01)
+        return True
+
+    @guard(cost=20.0, cacheable=False)
+    async def db_a(goal):
+        return await record(goal)
+
+    @guard(cost=20.0, cacheable=False)
+    async def db_b(goal):
+        return await record(goal)
+
+    both = [db_a, db_b]
+    await create_tables()
+    async with AsyncSessionLocal() as session:
+        goal = _goal()
+        session.add(goal)
+        await session.flush()
+        await check_guards(goal, TRANSITION[1], workflow=_workflow(*both))
+        assert len(sessions) == 2 and len({id(s) for s in sessions}) == 2 and session not in sessions
+
+        sessions.clear()
+        await check_guards(goal, TRANSITION[1], workflow=_workflow(both[0]))
+        assert sessions == [async_object_session(goal)]
@@ -0,0 +1,134 @@
+import pytest
+from datetime import datetime, timezone
+from unittest.mock import AsyncMock
+from sqlalchemy import func, select, update
+
+from src.core.db.cache import EntityCache
+from src.core.db.models import Goal, GoalSnapshot
+from src.core.db.session import AsyncSessionLocal, create_tables
+from src.core.workflow.definition import WorkflowRegistry, WorkflowSpec, compile_workflow, default_registry
+from src.core.workflow.engine import WorkflowEngine
+from src.core.workflow.history import WorkflowHistory
+from src.core.workflow.state import WorkflowState, WorkflowTransition
+
+PATH = [
+    WorkflowState.TASK_DECOMPOSITION,
+    WorkflowState.DESIGN_IMPLEMENTATION,
+    WorkflowState.EXECUTION_MONITORING,
+    WorkflowState.EXECUTION_MONITORING,
+]
+
+def _unguarded() -> WorkflowRegistry:
+    """The default transitions without their guards: these goals have no tasks to wait for."""
+    default = default_registry().get()
+    transitions = [WorkflowTransition(from_state=s, to_state=t) for s in default.states for t in default.targets(s)]
+    spec = WorkflowSpec(name=default.name, version=default.version, initial=default.initial, transitions=transitions)
+    return WorkflowRegistry([compile_workflow(spec)], default=default.key)
+
+def _engine(snapshot_interval: int = 2) -> WorkflowEngine:
+    cache = EntityCache()
+    history = WorkflowHistory(AsyncSessionLocal, snapshot_interval=snapshot_interval, cache=cache)
+    return WorkflowEngine(
+        bus=AsyncMock(), session_factory=AsyncSessionLocal, cache=cache, history=history, workflows=_unguarded()
+    )
+
+@pytest.mark.asyncio
+async def test_transitions_are_recorded_and_snapshotted():
+    await create_tables()
+    engine = _engine()
+    goal_id = await engine.initialize_goal("History", "Desc")
+    await engine.transition_phase(goal_id, PATH[0])
+    midpoint = datetime.now(timezone.utc)
+    for state in PATH[1:]:
+        await engine.transition_phase(goal_id, state)
+
+    events = await engine.history.events(goal_id)
+    assert [e["version"] for e in events] == [1, 2, 3, 4, 5]
+    assert events[0]["from_state"] is None and events[-1]["to_state"] == WorkflowState.EXECUTION_MONITORING.value
+
+    async with AsyncSessionLocal() as session:
+        versions = (await session.scalars(select(GoalSnapshot.version).where(GoalSnapshot.goal_id == goal_id))).all()
+    assert sorted(versions) == [2, 4]
+
+    current = await engine.history.state_at(goal_id)
+    assert current.status == WorkflowState.EXECUTION_MONITORING.value and current.version == 5
+    assert current.visits[WorkflowState.EXECUTION_MONITORING.value] == 2
+    assert set(current.time_in_state) >= {WorkflowState.INITIALIZATION.value, WorkflowState.DESIGN_IMPLEMENTATION.value}
+
+    past = await engine.history.state_at(goal_id, at=midpoint)
+    assert past.status == WorkflowState.TASK_DECOMPOSITION.value and past.version == 2
+
+@pytest.mark.asyncio
+async def test_bulk_replay_matches_and_repairs_goals():
+    await create_tables()
+    engine = _engine(snapshot_interval=3)
+    goal_ids = await engine.initialize_goals([(f"Bulk {i}", "Desc") for i in range(20)])
+    for goal_id in goal_ids[:10]:
+        for state in PATH:
+            await engine.transition_phase(goal_id, state)
+
+    states = await engine.history.replay(goal_ids)
+    for goal_id in goal_ids[:3] + goal_ids[-3:]:
+        single = await engine.history.state_at(goal_id)
+        assert states[goal_id].to_dict() == single.to_dict()
+
+    # Simulate a lost write: goals.status no longer matches the log
+    async with AsyncSessionLocal() as session:
+        await session.execute(update(Goal).where(Goal.id.in_(goal_ids[:5])).values(status="SUSPENDED"))
+        await session.commit()
+
+    report = await engine.history.rebuild(goal_ids)
+    assert report["goals"] == 20 and report["diverged"] == 5 and not report["applied"]
+
+    report = await engine.history.rebuild(goal_ids, apply=True)
+    assert report["diverged"] == 5 and report["applied"] and report["skipped"] == []
+    async with AsyncSessionLocal() as session:
+        statuses = (await session.execute(
+            select(Goal.status, func.count()).where(Goal.id.in_(goal_ids)).group_by(Goal.status)
+        )).all()
+    assert dict(statuses) == {WorkflowState.EXECUTION_MONITORING.value: 10, WorkflowState.INITIALIZATION.value: 10}
+
+class _RacingSession:
+    """Lets another transaction bump a goal's version just before the first UPDATE runs."""
+
+    def __init__(self, session, goal_id):
+        self._session, self._goal_id, self._raced = session, goal_id, False
+
+    def __getattr__(self, name):
+        return getattr(self._session, name)
+
+    async def execute(self, statement, *args, **kwargs):
+        if statement.is_dml and not self._raced:
+            self._raced = True
+            async with AsyncSessionLocal() as other:
+                await other.execute(update(Goal).where(Goal.id == self._goal_id).values(version=Goal.version + 1))
+                await other.commit()
+        return await self._session.execute(statement, *args, **kwargs)
+
+@pytest.mark.asyncio
+async def test_rebuild_does_not_overwrite_goals_that_moved_on():
+    await create_tables()
+    engine = _engine()
+    goal_ids = await engine.initialize_goals([(f"Raced {i}", "Desc") for i in range(3)])
+    async with AsyncSessionLocal() as session:
+        await session.execute(update(Goal).where(Goal.id.in_(goal_ids)).values(status="SUSPENDED"))
+        await session.commit()
+
+    class RacingFactory:
+        def __call__(self):
+            return self
+
+        async def __aenter__(self):
+            self._session = AsyncSessionLocal()
+            return _RacingSession(await self._session.__aenter__(), goal_ids[0])
+
+        async def __aexit__(self, *exc):
+            await self._session.__aexit__(*exc)
+
+    history = WorkflowHistory(session_factory=RacingFactory(), cache=EntityCache())
+    report = await history.rebuild(goal_ids, apply=True)
+    assert report["diverged"] == 3 and report["skipped"] == [str(goal_ids[0])]
+    async with AsyncSessionLocal() as session:
+        rows = dict((await session.execute(select(Goal.id, Goal.status).where(Goal.id.in_(goal_ids)))).all())
+    assert rows[goal_ids[0]] == "SUSPENDED"
+    assert {rows[g] for g in goal_ids[1:]} == {WorkflowState.INITIALIZATION.value}
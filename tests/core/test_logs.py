@@ -0,0 +1,53 @@
+import asyncio
+import json
+import pytest
+from datetime import datetime, timedelta, timezone
+from src.core.bus.bus import InMemoryMessageBus
+from src.core.logs.index import LogIndex
+
+T0 = datetime(2025, 1, 1, tzinfo=timezone.utc)
+
+def _fill(index: LogIndex, count: int) -> None:
+    for i in range(count):
+        index.append(T0 + timedelta(seconds=i), f"agent-{i % 2}", "ERROR" if i % 3 == 0 else "INFO", f"line {i}")
+
+def test_query_filters_use_indexes():
+    index = LogIndex(capacity=100, spill_dir=None)
+    _fill(index, 12)
+
+    assert [e["seq"] for e in index.query(limit=3)] == [11, 10, 9]
+    assert [e["message"] for e in index.query(agent_id="agent-0", level="error")] == ["line 6", "line 0"]
+    assert [e["seq"] for e in index.query(since=T0 + timedelta(seconds=9), until=T0 + timedelta(seconds=10))] == [10, 9]
+    assert [e["seq"] for e in index.query(text="LINE 1")] == [11, 10, 1]
+    assert [e["seq"] for e in index.query(limit=2, before_seq=5)] == [4, 3]
+    assert index.query(agent_id="unknown") == []
+
+@pytest.mark.asyncio
+async def test_ring_is_bounded_and_spills(tmp_path):
+    bus = InMemoryMessageBus()
+    index = LogIndex(bus, capacity=5, ingest_interval=0.01, spill_dir=tmp_path)
+    await index.start()
+
+    for i in range(8):
+        await bus.publish("agent.log", {"agent_id": "Lyra", "level": "INFO", "message": f"msg {i}"})
+    await asyncio.sleep(0.1)
+    await index.stop()
+
+    assert len(index) == 5 and index.first_seq == 3
+    assert [e["message"] for e in index.query(agent_id="Lyra")] == [f"msg {i}" for i in range(7, 2, -1)]
+    assert all(seq >= 3 for seq in index._by_agent[0])
+
+    spilled = [json.loads(line) for f in tmp_path.iterdir() for line in f.read_text().splitlines()]
+    assert [row["message"] for row in spilled] == ["msg 0", "msg 1", "msg 2"]
+
+@pytest.mark.asyncio
+async def test_a_burst_is_ingested_before_the_next_tick(tmp_path):
+    index = LogIndex(capacity=4, ingest_interval=60, max_pending=3, max_message_length=5, spill_dir=tmp_path)
+    await index.start()
+    _fill(index, 10)
+    assert len(index._pending) < 3 and index._next_seq == 9
+
+    await asyncio.sleep(0.05)  # the evicted rows are written out without waiting a minute
+    assert index.spilled == 6 and index._spill == []
+    await index.stop()
+    assert [e["message"] for e in index.query(limit=1)] == ["line "]
@@ -16,6 +16,7 @@ def mock_session():
     session.add = MagicMock()
     session.commit = AsyncMock()
     session.get = AsyncMock()
+    session.scalar = AsyncMock(return_value=None) # the goal has no tasks yet
     return session
 
 @pytest.fixture
@@ -62,3 +63,15 @@ async def test_lyra_reacts_to_decomposition_request(mock_bus, mock_session_facto
         "goal_id": goal_id,
         "task_count": 2
     })
+
+@pytest.mark.asyncio
+async def test_lyra_does_not_decompose_a_goal_twice(mock_bus, mock_session_factory, mock_session):
+    lyra = LyraAgent(bus=mock_bus, session_factory=mock_session_factory)
+    mock_session.scalar.return_value = uuid4() # a task of the goal exists
+
+    payload = {"goal_id": str(uuid4()), "title": "Test Goal"}
+    await lyra.on_decompose_request(MessageEnvelope(topic="agent.lyra.decompose", payload=payload, source_id="director"))
+
+    mock_session.add.assert_not_called()
+    mock_bus.publish.assert_not_called()
+    assert lyra._decomposing == set()
@@ -0,0 +1,76 @@
+import pytest
+from uuid import uuid4
+from datetime import datetime, timedelta, timezone
+from src.core.db.claims import claim_pending_tasks
+from src.core.db.models import Goal, GoalProgress, Task
+from src.core.db.progress import get_progress, record_progress, record_transition, summarize
+from src.core.db.session import AsyncSessionLocal, create_tables
+from src.shared.models import TaskState
+
+async def _create_tasks(count: int, track: bool = True) -> Goal:
+    async with AsyncSessionLocal() as session:
+        goal = Goal(title="Progress Goal", description="Desc")
+        session.add_all([goal] + [Task(goal=goal, title=f"T{i}", type="CODING", status=TaskState.PENDING.value) for i in range(count)])
+        await session.flush()
+        if track:
+            await record_progress(session, goal.id, {TaskState.PENDING.value: count})
+        await session.commit()
+        return goal
+
+@pytest.mark.asyncio
+async def test_counters_follow_claims_and_results():
+    await create_tables()
+    goal = await _create_tasks(4)
+
+    async with AsyncSessionLocal() as session:
+        claimed = await claim_pending_tasks(session, "GPTASe", goal_id=goal.id, limit=3)
+        await session.commit()
+
+    start = datetime.now(timezone.utc)
+    async with AsyncSessionLocal() as session:
+        for _, status in zip(claimed[:2], [TaskState.COMPLETED.value, TaskState.FAILED.value], strict=True):
+            await record_transition(session, goal.id, TaskState.ACTIVE.value, status,
+                                    started_at=start, now=start + timedelta(seconds=10))
+        await session.commit()
+
+    async with AsyncSessionLocal() as session:
+        summary = summarize(await get_progress(session, goal.id))
+
+    assert summary["counts"] == {"Pending": 1, "Active": 1, "Completed": 1, "Failed": 1}
+    assert summary["total"] == 4 and summary["percent_complete"] == 50.0
+    assert summary["avg_latency_seconds"] == pytest.approx(10.0)
+    assert summary["eta_seconds"] is not None and summary["eta_seconds"] > 0
+
+@pytest.mark.asyncio
+async def test_first_update_backfills_unflushed_tasks():
+    await create_tables()
+    async with AsyncSessionLocal() as session:
+        goal = Goal(id=uuid4(), title="Progress Goal", description="Desc")
+        session.add_all([goal] + [Task(goal=goal, title=f"T{i}", type="CODING", status=TaskState.PENDING.value) for i in range(2)])
+        # As Lyra does: no counter row yet, tasks still pending in the session
+        await record_progress(session, goal.id, {TaskState.PENDING.value: 2})
+        await session.commit()
+
+    async with AsyncSessionLocal() as session:
+        progress = await session.get(GoalProgress, goal.id)
+        assert progress.pending == 2
+
+@pytest.mark.asyncio
+async def test_untracked_goal_is_backfilled_from_tasks():
+    await create_tables()
+    goal = await _create_tasks(3, track=False)
+
+    async with AsyncSessionLocal() as session:
+        # First update finds no row: the backfill already counts this claim
+        await claim_pending_tasks(session, "GPTASe", goal_id=goal.id, limit=1)
+        await session.commit()
+
+    async with AsyncSessionLocal() as session:
+        progress = await session.get(GoalProgress, goal.id)
+        assert (progress.pending, progress.active) == (2, 1)
+
+def test_summary_of_finished_goal_has_zero_eta():
+    progress = GoalProgress(pending=0, active=0, completed=2, failed=0, latency_total=4.0, latency_count=2)
+    summary = summarize(progress)
+    assert summary["percent_complete"] == 100.0
+    assert summary["avg_latency_seconds"] == 2.0 and summary["eta_seconds"] == 0.0
@@ -0,0 +1,130 @@
+import asyncio
+import time
+import pytest
+from collections import Counter
+
+from src.core.bus.bus import InMemoryMessageBus, MessageEnvelope
+from src.core.cluster.bridge import BusBridge
+from src.core.cluster.ring import HashRing
+from src.core.cluster.sharding import Shard, ShardCoordinator
+
+KEYS = [f"goal-{i}" for i in range(10000)]
+
+def test_ring_balances_and_moves_few_keys():
+    ring = HashRing([f"node-{i}" for i in range(4)])
+    before = {key: ring.owner(key) for key in KEYS}
+    counts = Counter(before.values())
+    assert min(counts.values()) > 0.5 * len(KEYS) / 4
+
+    ring.add("node-4")
+    moved = [key for key in KEYS if ring.owner(key) != before[key]]
+    assert 0.1 < len(moved) / len(KEYS) < 0.3
+    assert {ring.owner(key) for key in moved} == {"node-4"}
+
+@pytest.mark.asyncio
+async def test_shard_keeps_per_key_order_and_runs_keys_concurrently():
+    shard = Shard("local/0", concurrency=8)
+    log = []
+
+    async def handler(envelope):
+        key, seq = envelope.payload["goal_id"], envelope.payload["seq"]
+        log.append(("start", key, seq))
+        await asyncio.sleep(0.05 if seq == 0 else 0)
+        log.append(("end", key, seq))
+
+    started = time.perf_counter()
+    for seq in range(3):
+        for key in ("a", "b"):
+            shard.submit(key, handler, MessageEnvelope(topic="t", payload={"goal_id": key, "seq": seq}, source_id="test"))
+    await shard.drain()
+
+    assert time.perf_counter() - started < 0.09 # a and b overlapped
+    for key in ("a", "b"):
+        events = [(kind, seq) for kind, k, seq in log if k == key]
+        assert events == [("start", 0), ("end", 0), ("start", 1), ("end", 1), ("start", 2), ("end", 2)]
+    assert shard.stats() == {"lanes": 0, "queued": 0, "processed": 6}
+
+def _node(bus, node_id, handoff_timeout=0.4):
+    return ShardCoordinator(
+        bus, shards=2, clustered=True, node_id=node_id,
+        handoff_timeout=handoff_timeout, announce_interval=60, member_ttl=120
+    )
+
+@pytest.mark.asyncio
+async def test_nodes_split_goals_and_hand_them_off_in_order():
+    bus = InMemoryMessageBus()
+    log = []
+
+    def handler_for(node):
+        async def handler(envelope):
+            key, seq = envelope.payload["goal_id"], envelope.payload["seq"]
+            log.append((node.node_id, "start", key, seq))
+            await asyncio.sleep(envelope.payload.get("sleep", 0))
+            log.append((node.node_id, "end", key, seq))
+        return handler
+
+    async def join(node):
+        await node.start()
+        await bus.subscribe("goal.event", node.route(handler_for(node)))
+
+    a, b = _node(bus, "a"), _node(bus, "b")
+    await join(a)
+    await join(b)
+    await asyncio.sleep(0.5)
+    assert a.ring.nodes == b.ring.nodes and len(a.ring) == 4
+
+    for i in range(50):
+        await bus.publish("goal.event", {"goal_id": f"goal-{i}", "seq": 0})
+    await asyncio.sleep(0.05)
+    handled = Counter(key for _, kind, key, _ in log if kind == "end")
+    assert len(handled) == 50 and set(handled.values()) == {1}
+    assert {node for node, *_ in log} == {"a", "b"}
+
+    # A goal that will move to the newcomer, with a slow event still running on its old owner
+    c = _node(bus, "c")
+    after = HashRing(a.ring.nodes | set(c.local))
+    key = next(k for k in KEYS if after.owner(k) in c.local)
+    log.clear()
+    await bus.publish("goal.event", {"goal_id": key, "seq": 1, "sleep": 0.6})
+    await asyncio.sleep(0.01)
+    await join(c)
+    await asyncio.sleep(0.01)
+    await bus.publish("goal.event", {"goal_id": key, "seq": 2})
+    await asyncio.sleep(1.0)
+
+    assert [(kind, seq) for _, kind, _, seq in log] == [("start", 1), ("end", 1), ("start", 2), ("end", 2)]
+    assert log[0][0] in ("a", "b") and log[-1][0] == "c"
+
+    for node in (a, b, c):
+        await node.stop()
+
+@pytest.mark.asyncio
+async def test_nodes_started_before_the_bridge_connects_rejoin_without_claiming_everything(tmp_path):
+    buses = InMemoryMessageBus(), InMemoryMessageBus()
+    a, b = _node(buses[0], "a", handoff_timeout=0.2), _node(buses[1], "b", handoff_timeout=0.2)
+    handled = {"a": [], "b": []}
+    for node, bus in zip((a, b), buses, strict=True):
+        await node.start()
+        await bus.subscribe("goal.event", node.route(lambda envelope, node=node: _record(handled[node.node_id], envelope)))
+    await asyncio.sleep(0.3)
+    assert len(a.ring) == len(b.ring) == 2 # each still thinks it is alone
+
+    owner, worker = BusBridge(buses[0], tmp_path / "bus.sock"), BusBridge(buses[1], tmp_path / "bus.sock")
+    await owner.serve()
+    assert await worker.connect()
+    await asyncio.sleep(0.05)
+    for i in range(20):
+        await buses[0].publish("goal.event", {"goal_id": f"goal-{i}"})
+    await asyncio.sleep(0.5)
+
+    assert a.ring.nodes == b.ring.nodes and len(a.ring) == 4
+    assert not set(handled["a"]) & set(handled["b"]) # no goal was handled by both
+    assert len(handled["a"]) + len(handled["b"]) == 20
+
+    for node in (a, b):
+        await node.stop()
+    await worker.close()
+    await owner.close()
+
+async def _record(handled, envelope):
+    handled.append(envelope.payload["goal_id"])
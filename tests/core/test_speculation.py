@@ -0,0 +1,129 @@
+import asyncio
+import pytest
+from unittest.mock import AsyncMock
+
+from src.core.agents.director import DirectorAgent
+from src.core.agents.gptase import GPTASeAgent, TaskResultSchema
+from src.core.bus.bus import InMemoryMessageBus, MessageEnvelope
+from src.core.db.models import Task
+from src.core.db.progress import record_progress
+from src.core.db.session import AsyncSessionLocal, create_tables
+from src.core.db.tree import new_task
+from src.core.workflow.engine import WorkflowEngine
+from src.core.workflow.speculation import SpeculationPolicy
+from src.shared.models import TaskPriority, TaskState
+
+CRITICAL = TaskPriority.CRITICAL.value
+
+def test_only_critical_tasks_with_a_slow_tail_are_speculated():
+    policy = SpeculationPolicy(replicas=3, min_p99=10.0, min_samples=5)
+    assert policy.replicas_for("CODING", TaskPriority.HIGH.value) == 1
+    assert policy.replicas_for("CODING", CRITICAL) == 3  # no samples yet: the tail is unknown
+
+    for seconds in (1, 1, 2, 2, 3):
+        policy.latency.record("CODING", seconds)
+    assert policy.replicas_for("CODING", CRITICAL) == 1
+    policy.latency.record("CODING", 40)
+    assert policy.latency.percentile("CODING", 99) == 40
+    assert policy.replicas_for("CODING", CRITICAL) == 3
+
+    policy.begin("t1", 3)
+    assert [policy.settle("t1", TaskState.FAILED.value) for _ in range(3)] == [False, False, True]
+    policy.begin("t2", 3)
+    assert policy.settle("t2", TaskState.FAILED.value) is False
+    assert policy.settle("t2", TaskState.COMPLETED.value) is True
+    assert policy.settle("t3", TaskState.FAILED.value) is True  # not speculated
+    assert policy.stats()["wins"] == 1 and policy.stats()["exhausted"] == 1
+
+    # A copy of a task tracked elsewhere (another shard, or evicted) only decides by succeeding
+    assert policy.settle("t4", TaskState.FAILED.value, replica=0) is False
+    assert policy.settle("t4", TaskState.COMPLETED.value, replica=1) is True
+    assert policy.stats()["untracked"] == 1
+
+def _published(bus, topic):
+    return [call.args[1] for call in bus.publish.call_args_list if call.args[0] == topic]
+
+@pytest.mark.asyncio
+async def test_first_successful_copy_wins_and_the_rest_are_cancelled():
+    await create_tables()
+    bus = AsyncMock()
+    engine = WorkflowEngine(bus=bus)
+    director = DirectorAgent(bus=bus, engine=engine, speculation=SpeculationPolicy(replicas=2, models=["flash", "pro"]))
+    goal_id = await engine.initialize_goal("Urgent", "Desc", priority=TaskPriority.CRITICAL)
+
+    tasks = [
+        new_task(goal_id, title=f"T{i}", type="CODING", payload={"priority": CRITICAL}, status=TaskState.PENDING.value)
+        for i in range(2)
+    ]
+    async with AsyncSessionLocal() as session:
+        session.add_all(tasks)
+        await record_progress(session, goal_id, {TaskState.PENDING.value: 2})
+        await session.commit()
+    generated = {"goal_id": str(goal_id), "task_count": 2}
+    await director.on_tasks_generated(MessageEnvelope(topic="workflow.tasks_generated", payload=generated, source_id="test"))
+
+    copies = _published(bus, "agents.GPTASe.task")
+    assert sorted((c["id"], c["replica"], c["model"]) for c in copies) == sorted(
+        (str(t.id), replica, model) for t in tasks for replica, model in ((0, "flash"), (1, "pro"))
+    )
+    assert {c["priority"] for c in copies} == {CRITICAL}
+
+    async def report(task, replica, status, result=None):
+        payload = {"task_id": str(task.id), "status": status, "result": result, "agent_id": "GPTASe", "replica": replica}
+        await director.on_task_result(MessageEnvelope(topic="workflow.task_result", payload=payload, source_id="test"))
+        async with AsyncSessionLocal() as session:
+            return await session.get(Task, task.id)
+
+    # The faster copy decides the task; the slower one is cancelled and its late result ignored
+    assert (await report(tasks[0], 1, TaskState.COMPLETED.value, "fast")).status == TaskState.COMPLETED.value
+    assert _published(bus, "agents.GPTASe.cancel") == [{"task_id": str(tasks[0].id), "keep": 1}]
+    settled = {"goal_id": str(goal_id), "task_id": str(tasks[0].id), "status": TaskState.COMPLETED.value}
+    assert _published(bus, "workflow.task_settled") == [settled]
+    assert (await report(tasks[0], 0, TaskState.COMPLETED.value, "slow")).result == {"output": "fast"}
+
+    # One failed copy does not fail the task while another is still running
+    assert (await report(tasks[1], 0, TaskState.FAILED.value)).status == TaskState.ACTIVE.value
+    assert len(_published(bus, "workflow.task_settled")) == 1
+    assert (await report(tasks[1], 1, TaskState.FAILED.value)).status == TaskState.FAILED.value
+    assert _published(bus, "workflow.task_settled")[-1]["status"] == TaskState.FAILED.value
+    assert director.speculation.latency.count("CODING") == 1
+
+class ModelLLM:
+    """Answers after a delay that depends on the model asked for."""
+    delays = {"slow": 5.0, "fast": 0.01}
+
+    def __init__(self):
+        self.cancelled = []
+
+    async def generate(self, prompt, schema=None, model=None):
+        try:
+            await asyncio.sleep(self.delays[model])
+        except asyncio.CancelledError:
+            self.cancelled.append(model)
+            raise
+        return TaskResultSchema(summary=model, output="done")
+
+@pytest.mark.asyncio
+async def test_agent_cancels_losing_copies():
+    bus = InMemoryMessageBus()
+    llm = ModelLLM()
+    agent = GPTASeAgent(bus=bus, llm=llm)
+    await agent.start()
+    results = []
+
+    async def on_result(envelope):
+        results.append(envelope.payload)
+        await bus.publish("agents.GPTASe.cancel", {"task_id": envelope.payload["task_id"], "keep": envelope.payload["replica"]})
+
+    await bus.subscribe("workflow.task_result", on_result)
+    for replica, model in enumerate(("slow", "fast")):
+        await bus.publish("agents.GPTASe.task", {
+            "id": "t1", "type": "CODING", "title": "Race", "payload": {},
+            "assigned_to": "GPTASe", "replica": replica, "model": model
+        })
+    await asyncio.sleep(0.2)
+    await agent.stop()
+
+    assert [(r["replica"], r["status"]) for r in results] == [(1, TaskState.COMPLETED.value)]
+    assert llm.cancelled == ["slow"]
+    assert agent._runs == {}
@@ -0,0 +1,141 @@
+import asyncio
+import random
+import pytest
+from unittest.mock import AsyncMock
+
+from src.core.bus.bus import InMemoryMessageBus, MessageEnvelope
+from src.core.db.models import Goal, Task
+from src.core.db.session import AsyncSessionLocal, create_tables
+from src.core.db.tree import new_task
+from src.core.workflow.engine import WorkflowEngine
+from src.core.workflow.state import WorkflowState
+from src.core.workflow.timers import TASK_LEASE, TASK_RETRY, TimerWheel, WorkflowTimers
+from src.shared.models import AgentHeartbeat, AgentStatus, TaskState
+
+def test_wheel_fires_each_timer_on_its_tick():
+    wheel = TimerWheel(tick=1.0, slot_bits=3, levels=4, now=0.0)
+    rng = random.Random(7)
+    deadlines = {key: rng.randint(1, wheel.horizon - 1) for key in range(2000)}
+    for key, ticks in deadlines.items():
+        wheel.schedule(key, ticks, data=ticks)
+
+    fired = {}
+    now = 0
+    while len(wheel):
+        now += rng.randint(1, 50)
+        for timer in wheel.advance(float(now)):
+            fired[timer.key] = now
+    for key, ticks in deadlines.items():
+        # Each timer fires in the first advance() that reaches its tick
+        assert ticks <= fired[key] < ticks + 51
+
+def test_wheel_cancel_and_reschedule():
+    wheel = TimerWheel(tick=0.5, now=0.0)
+    wheel.schedule("a", 10.0)
+    wheel.schedule("b", 1000.0)
+    assert wheel.cancel("a") and not wheel.cancel("a")
+    wheel.schedule("b", 2.0)  # replaces the far deadline
+    assert len(wheel) == 1
+    assert [t.key for t in wheel.advance(2.0)] == ["b"]
+    assert wheel.advance(5000.0) == []
+    with pytest.raises(ValueError):
+        wheel.schedule("c", wheel.horizon * wheel.tick)
+
+@pytest.mark.asyncio
+async def test_leases_and_retries_are_scheduled_from_events():
+    timers = WorkflowTimers(bus=AsyncMock(), engine=AsyncMock(), tick=1.0, lease_seconds=30, max_retries=1, retry_backoff=4)
+    task_id = "6f1c1c1e-0000-0000-0000-000000000001"
+
+    await timers._on_task_assigned(MessageEnvelope(topic="agents.GPTASe.task", payload={"id": task_id}, source_id="Director"))
+    assert (TASK_LEASE, task_id) in timers.wheel
+
+    # Heartbeats naming the task push the lease out
+    first_deadline = timers.wheel._timers[(TASK_LEASE, task_id)].tick
+    timers.wheel.advance(timers.wheel._origin + 10)
+    hb = AgentHeartbeat(agent_id="GPTASe", status=AgentStatus.WORKING, current_task_id=task_id)
+    await timers._on_heartbeat(MessageEnvelope(topic="system.heartbeat", payload=hb, source_id="GPTASe"))
+    assert timers.wheel._timers[(TASK_LEASE, task_id)].tick > first_deadline
+
+    # So do heartbeats of an agent running it next to another task
+    other_id = "6f1c1c1e-0000-0000-0000-000000000009"
+    await timers._on_task_assigned(MessageEnvelope(topic="agents.GPTASe.task", payload={"id": other_id}, source_id="Director"))
+    second_deadline = timers.wheel._timers[(TASK_LEASE, task_id)].tick
+    timers.wheel.advance(timers.wheel._origin + 20)
+    hb = {"agent_id": "GPTASe", "status": "Working", "current_task_id": other_id, "running_task_ids": [task_id, other_id]}
+    await timers._on_heartbeat(MessageEnvelope(topic="system.heartbeat", payload=hb, source_id="GPTASe"))
+    assert timers.wheel._timers[(TASK_LEASE, task_id)].tick > second_deadline
+    timers.wheel.cancel((TASK_LEASE, other_id))
+
+    failed = MessageEnvelope(topic="workflow.task_settled", payload={"task_id": task_id, "status": TaskState.FAILED.value}, source_id="Director")
+    await timers._on_task_settled(failed)
+    assert (TASK_LEASE, task_id) not in timers.wheel and (TASK_RETRY, task_id) in timers.wheel
+
+    # Retry budget exhausted: no second retry
+    timers.wheel.cancel((TASK_RETRY, task_id))
+    await timers._on_task_settled(failed)
+    assert (TASK_RETRY, task_id) not in timers.wheel
+
+@pytest.mark.asyncio
+async def test_only_results_the_director_settled_count():
+    bus = InMemoryMessageBus()
+    engine = WorkflowEngine(bus=bus, session_factory=AsyncSessionLocal)
+    await create_tables()
+    timers = WorkflowTimers(bus=bus, engine=engine, tick=1.0, lease_seconds=30, max_retries=1, retry_backoff=4)
+    await timers.start()
+    task_id = "6f1c1c1e-0000-0000-0000-000000000002"
+    try:
+        await bus.publish("agents.GPTASe.task", {"id": task_id, "replica": 0})
+        # A raw result (one copy of several, or a stale run) is not applied by itself
+        failed = {"task_id": task_id, "status": TaskState.FAILED.value, "replica": 0}
+        await bus.publish("workflow.task_result", failed)
+        await asyncio.sleep(0.05)
+        assert (TASK_LEASE, task_id) in timers.wheel and timers._attempts == {}
+
+        await bus.publish("workflow.task_settled", {"goal_id": "g", "task_id": task_id, "status": TaskState.FAILED.value})
+        await asyncio.sleep(0.05)
+        assert (TASK_LEASE, task_id) not in timers.wheel and (TASK_RETRY, task_id) in timers.wheel
+        assert timers._attempts == {task_id: 1}
+    finally:
+        await timers.stop()
+
+@pytest.mark.asyncio
+async def test_expired_lease_requeues_and_state_timeout_suspends():
+    await create_tables()
+    bus = AsyncMock()
+    engine = WorkflowEngine(bus=bus, session_factory=AsyncSessionLocal)
+    async with AsyncSessionLocal() as session:
+        goal = Goal(title="Timers", description="Desc", status=WorkflowState.EXECUTION_MONITORING.value, version=1)
+        task = Task(goal=goal, title="Stuck", type="CODING", status=TaskState.ACTIVE.value, assigned_to="GPTASe")
+        session.add_all([goal, task])
+        await session.commit()
+
+    timers = WorkflowTimers(bus=bus, engine=engine, tick=1.0, state_timeouts={WorkflowState.EXECUTION_MONITORING.value: 60}, lease_seconds=30)
+    await timers._seed()
+    assert ("lease", str(task.id)) in timers.wheel and ("state", str(goal.id)) in timers.wheel
+
+    await timers.fire(timers.wheel.advance(timers.wheel._origin + 61))
+
+    async with AsyncSessionLocal() as session:
+        requeued = await session.get(Task, task.id)
+        suspended = await session.get(Goal, goal.id)
+    assert requeued.status == TaskState.PENDING.value and requeued.assigned_to is None
+    assert suspended.status == WorkflowState.SUSPENDED.value
+    bus.publish.assert_any_call("workflow.tasks_requeued", {"goal_id": str(goal.id), "task_count": 1, "reason": "lease expired"})
+    bus.publish.assert_any_call("workflow.goal_timeout", {"goal_id": str(goal.id), "state": WorkflowState.EXECUTION_MONITORING.value, "timeout": 60})
+    assert timers.fired["lease"] >= 1 and timers.fired["state"] >= 1
+
+@pytest.mark.asyncio
+async def test_expanded_parents_are_not_leased():
+    await create_tables()
+    engine = WorkflowEngine(bus=AsyncMock(), session_factory=AsyncSessionLocal)
+    goal_id = await engine.initialize_goal("Tree timers", "Desc")
+    parent = new_task(goal_id, title="Expanded", type="CODING", status=TaskState.ACTIVE.value, assigned_to="Lyra")
+    child = new_task(goal_id, parent, title="Part", type="CODING", status=TaskState.ACTIVE.value, assigned_to="GPTASe")
+    async with AsyncSessionLocal() as session:
+        session.add_all([parent, child])
+        await session.commit()
+
+    timers = WorkflowTimers(bus=AsyncMock(), engine=engine, tick=1.0, state_timeouts={}, lease_seconds=30)
+    await timers._seed()
+    assert (TASK_LEASE, str(child.id)) in timers.wheel
+    assert (TASK_LEASE, str(parent.id)) not in timers.wheel
@@ -0,0 +1,145 @@
+import pytest
+from sqlalchemy import text
+from unittest.mock import AsyncMock
+from uuid import uuid4
+
+from src.core.agents.director import DirectorAgent
+from src.core.agents.lyra import LyraAgent, TaskDecompositionSchema, TaskModel
+from src.core.bus.bus import MessageEnvelope
+from src.core.db.models import Goal, Task
+from src.core.db.progress import record_progress
+from src.core.db.session import AsyncSessionLocal, create_tables
+from src.core.db.tree import needs_expansion, new_task, subtree, subtree_query
+from src.core.workflow.engine import WorkflowEngine
+from src.core.workflow.state import WorkflowState
+from src.shared.models import TaskState
+
+class SplittingLLM:
+    """Splits whatever it is asked about into two simple subtasks."""
+
+    async def generate(self, prompt, schema=None):
+        title = prompt.split("\n", 1)[0]
+        return TaskDecompositionSchema(tasks=[
+            TaskModel(title=f"{title} / part {i}", type="CODING", description="", complexity=1) for i in (1, 2)
+        ])
+
+def _published(bus, topic):
+    return [call.args[1] for call in bus.publish.call_args_list if call.args[0] == topic]
+
+async def _add_tasks(goal_id, *tasks):
+    async with AsyncSessionLocal() as session:
+        session.add_all(tasks)
+        await record_progress(session, goal_id, {TaskState.PENDING.value: len(tasks)})
+        await session.commit()
+
+@pytest.mark.asyncio
+async def test_subtree_is_one_prefix_scan_in_depth_first_order():
+    await create_tables()
+    engine = WorkflowEngine(bus=AsyncMock())
+    goal_id = await engine.initialize_goal("Tree", "Desc")
+
+    root = new_task(goal_id, title="root", type="DESIGN")
+    children = [new_task(goal_id, root, title=f"child {i}", type="CODING") for i in range(2)]
+    grandchild = new_task(goal_id, children[0], title="grandchild", type="CODING")
+    other = new_task(goal_id, title="other root", type="CODING")
+    async with AsyncSessionLocal() as session:
+        session.add_all([root, *children, grandchild, other])
+        await session.commit()
+
+    assert grandchild.depth == 2 and grandchild.path == f"{root.id.hex}/{children[0].id.hex}/{grandchild.id.hex}/"
+    async with AsyncSessionLocal() as session:
+        tree = await subtree(session, root)
+        assert tree[0].id == root.id and {t.id for t in tree} == {root.id, *(c.id for c in children), grandchild.id}
+        # A parent precedes its descendants
+        assert tree.index(next(t for t in tree if t.id == children[0].id)) + 1 == [t.id for t in tree].index(grandchild.id)
+        assert {t.id for t in await subtree(session, root, max_depth=1)} == {root.id, *(c.id for c in children)}
+        assert [t.id for t in await subtree(session, children[1])] == [children[1].id]
+
+@pytest.mark.asyncio
+async def test_subtree_query_is_an_index_range_scan():
+    await create_tables()
+    task = new_task(uuid4(), title="root", type="DESIGN")
+    async with AsyncSessionLocal() as session:
+        connection = await session.connection()
+        sql = str(subtree_query(task).compile(connection.sync_connection, compile_kwargs={"literal_binds": True}))
+        plan = " ".join(row[-1] for row in (await session.execute(text(f"EXPLAIN QUERY PLAN {sql}"))).all())
+
+    assert "LIKE" not in sql.upper()
+    assert f"tasks.path >= '{task.path}' AND tasks.path < '{task.path[:-1]}0'" in sql
+    assert "USING INDEX ix_tasks_path (path>? AND path<?)" in plan
+
+@pytest.mark.asyncio
+async def test_complex_tasks_expand_when_claimed_and_settle_from_their_subtasks():
+    await create_tables()
+    bus = AsyncMock()
+    engine = WorkflowEngine(bus=bus)
+    director = DirectorAgent(bus=bus, engine=engine)
+    lyra = LyraAgent(bus=bus, llm=SplittingLLM())
+    goal_id = await engine.initialize_goal("Big goal", "Desc")
+    await engine.transition_phase(goal_id, WorkflowState.TASK_DECOMPOSITION)
+
+    big = new_task(goal_id, title="Build it", type="CODING", payload={"complexity": 9}, status=TaskState.PENDING.value)
+    small = new_task(goal_id, title="Document it", type="CODING", payload={"complexity": 2}, status=TaskState.PENDING.value)
+    await _add_tasks(goal_id, big, small)
+    generated = {"goal_id": str(goal_id), "task_count": 2}
+    await director.on_tasks_generated(MessageEnvelope(topic="workflow.tasks_generated", payload=generated, source_id="test"))
+
+    # Only the complex task goes to Lyra; nothing below it exists until now
+    assert _published(bus, "agent.lyra.expand") == [{"goal_id": str(goal_id), "task_id": str(big.id)}]
+    assert [t["id"] for t in _published(bus, "agents.GPTASe.task")] == [str(small.id)]
+
+    expand = MessageEnvelope(topic="agent.lyra.expand", payload={"goal_id": str(goal_id), "task_id": str(big.id)}, source_id="test")
+    await lyra.on_expand_request(expand)
+    await lyra.on_expand_request(expand)  # a duplicate request does not expand twice
+    assert _published(bus, "workflow.tasks_generated")[-1] == {"goal_id": str(goal_id), "task_count": 2, "parent_id": str(big.id)}
+
+    bus.publish.reset_mock()
+    await director.on_tasks_generated(MessageEnvelope(topic="workflow.tasks_generated", payload=generated, source_id="test"))
+    assigned = _published(bus, "agents.GPTASe.task")
+    assert len(assigned) == 2 and all(t["title"].startswith("Task: Build it / part") for t in assigned)
+
+    async def report(task_id, status):
+        payload = {"task_id": task_id, "status": status, "result": "ok"}
+        await director.on_task_result(MessageEnvelope(topic="workflow.task_result", payload=payload, source_id="test"))
+
+    await report(str(small.id), TaskState.COMPLETED.value)
+    await report(assigned[0]["id"], TaskState.COMPLETED.value)
+    async with AsyncSessionLocal() as session:
+        assert (await session.get(Task, big.id)).status == TaskState.ACTIVE.value
+        assert (await session.get(Goal, goal_id)).status == WorkflowState.TASK_DECOMPOSITION.value
+
+    # The last leaf settles its parent, which finishes the goal's tasks
+    await report(assigned[1]["id"], TaskState.COMPLETED.value)
+    async with AsyncSessionLocal() as session:
+        parent = await session.get(Task, big.id)
+        assert parent.status == TaskState.COMPLETED.value
+        assert parent.result == {"subtasks": {TaskState.COMPLETED.value: 2}}
+        assert (await session.get(Goal, goal_id)).status == WorkflowState.DESIGN_IMPLEMENTATION.value
+        assert [t.depth for t in await subtree(session, parent)] == [0, 1, 1]
+
+@pytest.mark.asyncio
+async def test_tasks_over_budget_are_executed_as_leaves():
+    await create_tables()
+    bus = AsyncMock()
+    engine = WorkflowEngine(bus=bus)
+    director = DirectorAgent(bus=bus, engine=engine)
+    lyra = LyraAgent(bus=bus, llm=SplittingLLM(), max_tasks=2)
+    goal_id = await engine.initialize_goal("Capped goal", "Desc")
+
+    big = new_task(goal_id, title="Build it", type="CODING", payload={"complexity": 9}, status=TaskState.PENDING.value)
+    await _add_tasks(goal_id, big)
+    generated = {"goal_id": str(goal_id), "task_count": 1}
+    await director.on_tasks_generated(MessageEnvelope(topic="workflow.tasks_generated", payload=generated, source_id="test"))
+    await lyra.on_expand_request(MessageEnvelope(
+        topic="agent.lyra.expand", payload={"goal_id": str(goal_id), "task_id": str(big.id)}, source_id="test"
+    ))
+
+    assert _published(bus, "workflow.tasks_requeued") == [{"goal_id": str(goal_id), "task_count": 1, "reason": "not expanded"}]
+    async with AsyncSessionLocal() as session:
+        task = await session.get(Task, big.id)
+        assert task.status == TaskState.PENDING.value and task.payload["leaf"] is True
+        assert not needs_expansion(task)
+
+    bus.publish.reset_mock()
+    await director.on_tasks_generated(MessageEnvelope(topic="workflow.tasks_requeued", payload=generated, source_id="test"))
+    assert [t["id"] for t in _published(bus, "agents.GPTASe.task")] == [str(big.id)]
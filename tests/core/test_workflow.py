@@ -3,10 +3,11 @@ import pytest
 from unittest.mock import AsyncMock, MagicMock, patch, ANY
 from uuid import uuid4
 
-from src.core.workflow.state import WorkflowState, TransitionError, validate_transition
+from src.core.workflow.state import WorkflowState, TransitionError, TransitionConflictError, validate_transition
 from src.core.workflow.engine import WorkflowEngine
 from src.core.workflow.guards import check_guards
 from src.core.db.models import Goal
+from src.core.db.cache import EntityCache
 
 # Test validate_transition pure function
 def test_validate_transition_valid():
@@ -30,6 +31,8 @@ def mock_session():
     session.refresh = AsyncMock()
     # Configure get to return None by default, specific tests override it
     session.get = AsyncMock(return_value=None)
+    # The compare-and-swap UPDATE matches one row unless a test simulates a lost race
+    session.execute = AsyncMock(return_value=MagicMock(rowcount=1))
     return session
 
 @pytest.fixture
@@ -64,7 +67,7 @@ async def test_workflow_engine_transition_valid(mock_bus, mock_session_factory,
     
     # Setup a mock goal in INITIALIZATION state
     goal_id = uuid4()
-    mock_goal = Goal(id=goal_id, title="Test", description="Desc", status=WorkflowState.INITIALIZATION.value)
+    mock_goal = Goal(id=goal_id, title="Test", description="Desc", status=WorkflowState.INITIALIZATION.value, version=1)
     mock_session.get.return_value = mock_goal
 
     # Attempt transition to TASK_DECOMPOSITION
@@ -77,6 +80,7 @@ async def test_workflow_engine_transition_valid(mock_bus, mock_session_factory,
         "goal_id": str(goal_id),
         "previous_state": WorkflowState.INITIALIZATION.value,
         "new_state": WorkflowState.TASK_DECOMPOSITION.value,
+        "workflow": None,
         "timestamp": ANY
     })
 
@@ -86,7 +90,7 @@ async def test_workflow_engine_transition_invalid_transition(mock_bus, mock_sess
     
     # Setup a mock goal in INITIALIZATION state
     goal_id = uuid4()
-    mock_goal = Goal(id=goal_id, title="Test", description="Desc", status=WorkflowState.INITIALIZATION.value)
+    mock_goal = Goal(id=goal_id, title="Test", description="Desc", status=WorkflowState.INITIALIZATION.value, version=1)
     mock_session.get.return_value = mock_goal
 
     # Attempt transition directly to EXECUTION (Invalid)
@@ -100,7 +104,7 @@ async def test_workflow_engine_transition_guard_failure(mock_bus, mock_session_f
     
     # Setup a mock goal with MISSING TITLE/DESC to trigger guard failure
     goal_id = uuid4()
-    mock_goal = Goal(id=goal_id, title="", description="", status=WorkflowState.INITIALIZATION.value)
+    mock_goal = Goal(id=goal_id, title="", description="", status=WorkflowState.INITIALIZATION.value, version=1)
     mock_session.get.return_value = mock_goal
 
     # Attempt transition (Should fail due to guard_goal_defined)
@@ -109,3 +113,61 @@ async def test_workflow_engine_transition_guard_failure(mock_bus, mock_session_f
     
     assert "Goal title and description are required" in str(excinfo.value)
 
+
+@pytest.mark.asyncio
+async def test_workflow_engine_transition_retries_after_lost_race(mock_bus, mock_session_factory, mock_session):
+    engine = WorkflowEngine(bus=mock_bus, session_factory=mock_session_factory, cache=EntityCache())
+
+    goal_id = uuid4()
+    stale = Goal(id=goal_id, title="Test", description="Desc", status=WorkflowState.INITIALIZATION.value, version=1)
+    fresh = Goal(id=goal_id, title="Test", description="Desc", status=WorkflowState.TASK_DECOMPOSITION.value, version=2)
+    mock_session.get.side_effect = [stale, fresh]
+    mock_session.execute.return_value = MagicMock(rowcount=0)
+
+    # The re-read shows another writer already made this transition
+    with pytest.raises(TransitionError) as excinfo:
+        await engine.transition_phase(goal_id, WorkflowState.TASK_DECOMPOSITION)
+
+    assert not isinstance(excinfo.value, TransitionConflictError)
+    assert mock_session.rollback.called and not mock_session.commit.called
+    mock_bus.publish.assert_not_called()
+
+@pytest.mark.asyncio
+async def test_workflow_engine_transition_gives_up_after_retries(mock_bus, mock_session_factory, mock_session):
+    engine = WorkflowEngine(bus=mock_bus, session_factory=mock_session_factory, cache=EntityCache(), max_transition_retries=2)
+
+    goal_id = uuid4()
+    mock_session.get.side_effect = lambda *_: Goal(
+        id=goal_id, title="Test", description="Desc", status=WorkflowState.INITIALIZATION.value, version=1
+    )
+    mock_session.execute.return_value = MagicMock(rowcount=0)
+
+    with pytest.raises(TransitionConflictError):
+        await engine.transition_phase(goal_id, WorkflowState.TASK_DECOMPOSITION)
+    assert mock_session.execute.call_count == 3
+
+@pytest.mark.asyncio
+async def test_concurrent_transitions_from_same_state():
+    import asyncio
+    from src.core.db.session import AsyncSessionLocal, create_tables
+
+    await create_tables()
+    bus = AsyncMock()
+    # Separate caches stand in for two workers holding the same snapshot
+    first = WorkflowEngine(bus=bus, session_factory=AsyncSessionLocal, cache=EntityCache())
+    second = WorkflowEngine(bus=bus, session_factory=AsyncSessionLocal, cache=EntityCache())
+    goal_id = await first.initialize_goal("Race", "Desc")
+    async with AsyncSessionLocal() as session:
+        second.cache.put(await session.get(Goal, goal_id))
+
+    results = await asyncio.gather(
+        first.transition_phase(goal_id, WorkflowState.TASK_DECOMPOSITION),
+        second.transition_phase(goal_id, WorkflowState.TASK_DECOMPOSITION),
+        return_exceptions=True
+    )
+
+    assert sum(r is True for r in results) == 1
+    assert sum(isinstance(r, TransitionError) for r in results) == 1
+    async with AsyncSessionLocal() as session:
+        goal = await session.get(Goal, goal_id)
+    assert goal.status == WorkflowState.TASK_DECOMPOSITION.value and goal.version == 2
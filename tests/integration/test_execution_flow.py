@@ -4,7 +4,8 @@ import asyncio
 from httpx import AsyncClient, ASGITransport
 from src.api.main import app, lifespan
 from src.core.db.session import AsyncSessionLocal
-from src.core.db.models import Task
+from src.core.db.models import Goal, Task
+from src.core.workflow.state import WorkflowState
 from uuid import UUID
 from sqlalchemy import select
 from src.shared.models import TaskState
@@ -24,12 +25,17 @@ async def test_execution_flow():
                 response = await ac.post("/api/v1/workflow/goals", json=payload)
                 goal_id = response.json()["id"]
             
-            # 2. Wait for Workflow (Director (2s initial) + Lyra (1s) + Director(Assign) + GPTASe (2-4s))
-            # Safe wait: 10s
+            # 2. Wait for Workflow: Director advances each phase as soon as its tasks are done,
+            #    so the goal completes after Lyra (1s) + GPTASe (2-4s) without any /advance call
             print("Waiting for workflow execution...")
-            for i in range(10):
-                await asyncio.sleep(1)
-                # print(f"Tick {i}")
+            goal_status = None
+            for _ in range(100):
+                await asyncio.sleep(0.1)
+                async with AsyncSessionLocal() as session:
+                    goal_status = (await session.get(Goal, UUID(goal_id))).status
+                if goal_status == WorkflowState.COMPLETED.value:
+                    break
+            assert goal_status == WorkflowState.COMPLETED.value
 
             # 3. Verify Tasks Completed
             async with AsyncSessionLocal() as session: